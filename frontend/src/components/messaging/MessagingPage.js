@@ -12,6 +12,8 @@ const MessagingPage = () => {
   const [messages, setMessages] = useState([]);
   const [messagesLoading, setMessagesLoading] = useState(false);
   const [messagesError, setMessagesError] = useState(null);
+  const [hasEarlierMessages, setHasEarlierMessages] = useState(false);
+  const [loadingEarlier, setLoadingEarlier] = useState(false);
 
   const [searchQuery, setSearchQuery] = useState('');
   const [searchResults, setSearchResults] = useState([]);
@@ -21,12 +23,18 @@ const MessagingPage = () => {
   const [newMessage, setNewMessage] = useState('');
   const { user } = useAuth();
   const messagesEndRef = useRef(null);
+  // Earlier pages are prepended; only new messages scroll to the bottom.
+  const keepScrollRef = useRef(false);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   };
 
   useEffect(() => {
+    if (keepScrollRef.current) {
+      keepScrollRef.current = false;
+      return;
+    }
     scrollToBottom();
   }, [messages]);
 
@@ -63,11 +71,13 @@ const MessagingPage = () => {
     try {
       setMessagesLoading(true);
       const response = await messagingService.getMessages(convo.user.id);
-      setMessages(response.data);
+      setMessages(response.data.results);
+      setHasEarlierMessages(response.data.has_more);
       setMessagesError(null);
     } catch (err) {
       setMessagesError('Failed to load messages.');
       setMessages([]);
+      setHasEarlierMessages(false);
     } finally {
       setMessagesLoading(false);
     }
@@ -103,6 +113,23 @@ const MessagingPage = () => {
     setSocket(newSocket);
   };
 
+  const handleLoadEarlier = async () => {
+    if (!messages.length) return;
+    try {
+      setLoadingEarlier(true);
+      const response = await messagingService.getMessages(
+        selectedConversation.user.id, messages[0].conversation_seq
+      );
+      keepScrollRef.current = true;
+      setMessages(prevMessages => [...response.data.results, ...prevMessages]);
+      setHasEarlierMessages(response.data.has_more);
+    } catch (err) {
+      setMessagesError('Failed to load earlier messages.');
+    } finally {
+      setLoadingEarlier(false);
+    }
+  };
+
   const handleSendMessage = (e) => {
     e.preventDefault();
     if (newMessage.trim() && socket && socket.readyState === WebSocket.OPEN) {
@@ -195,13 +222,22 @@ const MessagingPage = () => {
                 <Alert variant="danger">{messagesError}</Alert>
               ) : selectedConversation ? (
                 messages.length > 0 ? (
-                  messages.map(msg => (
-                    <div key={msg.id} className={`mb-2 d-flex ${msg.sender === user.id ? 'justify-content-end' : ''}`}>
-                      <div className={`p-2 rounded ${msg.sender === user.id ? 'bg-primary text-white' : 'bg-light'}`}>
-                        <strong>{msg.sender_name}:</strong> {msg.content}
+                  <>
+                    {hasEarlierMessages && (
+                      <div className="text-center mb-2">
+                        <Button variant="link" size="sm" onClick={handleLoadEarlier} disabled={loadingEarlier}>
+                          {loadingEarlier ? 'Loading...' : 'Load earlier messages'}
+                        </Button>
                       </div>
-                    </div>
-                  ))
+                    )}
+                    {messages.map(msg => (
+                      <div key={msg.id} className={`mb-2 d-flex ${msg.sender === user.id ? 'justify-content-end' : ''}`}>
+                        <div className={`p-2 rounded ${msg.sender === user.id ? 'bg-primary text-white' : 'bg-light'}`}>
+                          <strong>{msg.sender_name}:</strong> {msg.content}
+                        </div>
+                      </div>
+                    ))}
+                  </>
                 ) : (
                   <p>No messages yet. Start the conversation!</p>
                 )
@@ -315,8 +315,11 @@ export const messagingService = {
   getConversations: () => {
     return api.get('/api/conversations/');
   },
-  getMessages: (userId) => {
-    return api.get(`/api/messages/${userId}/`);
+  // The newest page of a conversation; pass the conversation_seq of the
+  // oldest message shown to page back: { results, has_more, hot_horizon }
+  getMessages: (userId, beforeSeq) => {
+    const params = beforeSeq ? `?before_seq=${beforeSeq}` : '';
+    return api.get(`/api/messages/${userId}/${params}`);
   },
 };
 
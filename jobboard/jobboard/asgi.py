@@ -10,8 +10,9 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 import os
 from django.core.asgi import get_asgi_application
 from users.middleware import TokenAuthMiddleware
-from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.routing import ChannelNameRouter, ProtocolTypeRouter, URLRouter
 import users.routing
+from users.fanout import FANOUT_CHANNEL, NotificationFanoutConsumer
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobboard.settings')
 
@@ -22,4 +23,8 @@ application = ProtocolTypeRouter({
             users.routing.websocket_urlpatterns
         )
     ),
+    # Background work, served by `manage.py runworker notification-fanout`.
+    "channel": ChannelNameRouter({
+        FANOUT_CHANNEL: NotificationFanoutConsumer.as_asgi(),
+    }),
 })
@@ -13,6 +13,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -29,6 +31,9 @@ DEBUG = True
 ALLOWED_HOSTS = []
 
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'if-match', 'if-none-match')
+# Response headers the frontend, on another origin, must be able to read.
+CORS_EXPOSE_HEADERS = ['Sync-Cursor', 'ETag', 'Idempotent-Replayed']
 
 # Application definition
 
@@ -56,6 +61,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'users.middleware.RequestMetricsMiddleware',
+    'users.middleware.CompressionMiddleware',
+    'users.middleware.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -85,13 +93,31 @@ TEMPLATES = [
 
 ASGI_APPLICATION = 'jobboard.asgi.application'
 
-CHANNEL_LAYERS = {
-    'default': {
+# Pick with the CHANNEL_LAYER environment variable. 'redis' is needed as
+# soon as more than one process serves sockets, and for the background
+# worker; 'memory' keeps everything in one process, for single-node
+# deployments without the worker, tests and benchmarks.
+CHANNEL_LAYER_BACKENDS = {
+    'redis': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
         'CONFIG': {
             "hosts": [('127.0.0.1', 6379)],
         },
     },
+    'memory': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
+CHANNEL_LAYERS = {
+    'default': CHANNEL_LAYER_BACKENDS[os.environ.get('CHANNEL_LAYER', 'redis')],
+}
+
+# Shared by every worker: throttle buckets, replica pins and search caches.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    },
 }
 
 
@@ -112,6 +138,22 @@ DATABASES = {
     }
 }
 
+# Read replica. When a 'replica' alias is configured, reads made while
+# serving GET/HEAD/OPTIONS requests go to it; writes, and reads after a
+# write by the same client, stay on 'default'. See users/db_router.py.
+# DATABASES['replica'] = {
+#     **DATABASES['default'],
+#     'HOST': 'replica.example.internal',
+#     'TEST': {'MIRROR': 'default'},
+# }
+DATABASE_ROUTERS = ['users.db_router.PrimaryReplicaRouter']
+DATABASE_REPLICA_READS = True
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+# Log the query fingerprints of any request running more queries than this
+# (see users.metrics). None disables the check.
+METRICS_QUERY_BUDGET = None
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -164,8 +206,50 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # orjson-backed when installed, DRF's json otherwise; see users/renderers.py.
+    'DEFAULT_RENDERER_CLASSES': [
+        'users.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'users.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Sliding-window limits per endpoint class, per user and per client
+    # address; see users/throttling.py. Counts live in the default cache.
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '10/min',
+        'register_ip': '10/hour',
+        'job_search_user': '60/min',
+        'job_search_ip': '120/min',
+        'user_search_user': '120/min',
+        'user_search_ip': '240/min',
+        'message_create_user': '30/min',
+        'message_create_ip': '60/min',
+    },
 }
 
+# In-flight login, registration and search requests per worker process
+# before further ones are shed with 503 and Retry-After (seconds).
+EXPENSIVE_REQUEST_CONCURRENCY = 16
+EXPENSIVE_REQUEST_RETRY_AFTER = 2
+
+# Responses at least this many bytes long are brotli (if installed) or gzip
+# compressed for clients that accept it.
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+
+# Retention for `manage.py prune_history`, in days; None keeps rows forever.
+# Activity past retention is rolled up into monthly ActivityRollup counts.
+RETENTION_READ_NOTIFICATION_DAYS = 90
+RETENTION_UNREAD_NOTIFICATION_DAYS = None
+RETENTION_ACTIVITY_DAYS = 365
+
+# `manage.py archive_messages` moves read messages older than this many days
+# into compressed MessageArchive blocks of CHAT_ARCHIVE_BLOCK_SIZE messages.
+CHAT_ARCHIVE_DAYS = 365
+CHAT_ARCHIVE_BLOCK_SIZE = 200
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
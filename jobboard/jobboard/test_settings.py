@@ -0,0 +1,40 @@
+"""
+Settings for running the test suite locally without MySQL or Redis.
+
+    python manage.py test --settings=jobboard.test_settings
+
+Two SQLite databases stand in for the primary and the read replica. Reads
+are only routed to the replica in tests that enable DATABASE_REPLICA_READS,
+since nothing replicates between the two files.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import CHANNEL_LAYER_BACKENDS
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+    },
+}
+
+DATABASE_REPLICA_READS = False
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+CHANNEL_LAYERS = {
+    'default': CHANNEL_LAYER_BACKENDS['memory'],
+}
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
@@ -0,0 +1,90 @@
+"""
+Recent activity for the dashboards, kept in the cache.
+
+Each user has a ring buffer of their ``RECENT_ACTIVITY_SIZE`` most recent
+activities, stored already serialized under
+``recent_activity:<source>:<id>:<version>``. Logging an activity pushes it
+onto the buffer once the transaction commits (see signals.py), so a
+dashboard load reads the cache and never the activity tables. A missing
+buffer is rebuilt from the table on the next read.
+
+Buffers are never updated in place: a push writes the new buffer under the
+next version. It only writes when its ``incr`` of the version moved it by
+exactly one, i.e. no other push or invalidation happened since it read the
+buffer. Otherwise, and whenever there is no buffer to push onto, it leaves
+the new version empty for the next read to rebuild. A rebuild that read the
+table before a write committed can only store its stale list under the
+version it started with, which that write has already retired.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import EmployerActivity, JobSeekerActivity
+from .serializers import EmployerActivitySerializer, JobSeekerActivitySerializer
+
+RECENT_ACTIVITY_SIZE = 5
+RECENT_ACTIVITY_TIMEOUT = 24 * 60 * 60
+
+# source: (model, user field, serializer)
+FEEDS = {
+    'employer': (EmployerActivity, 'employer_id', EmployerActivitySerializer),
+    'job_seeker': (JobSeekerActivity, 'user_id', JobSeekerActivitySerializer),
+}
+SOURCES = {model: source for source, (model, _, _) in FEEDS.items()}
+
+
+def version_key(source, user_id):
+    return f'recent_activity:{source}:{user_id}:version'
+
+
+def feed_key(source, user_id, version):
+    return f'recent_activity:{source}:{user_id}:{version}'
+
+
+def feed_version(source, user_id):
+    # Seeded from the clock, so a version key that was evicted does not
+    # restart at a number whose buffer may still be cached.
+    return cache.get_or_set(version_key(source, user_id), time.time_ns, None)
+
+
+def rebuild(source, user_id, version):
+    model, user_field, serializer = FEEDS[source]
+    rows = model.objects.filter(**{user_field: user_id}).order_by('-timestamp', '-pk')[:RECENT_ACTIVITY_SIZE]
+    entries = [dict(entry) for entry in serializer(rows, many=True).data]
+    cache.set(feed_key(source, user_id, version), entries, RECENT_ACTIVITY_TIMEOUT)
+    return entries
+
+
+def recent_activities(source, user_id):
+    """The serialized recent activities of ``user_id``, newest first."""
+    version = feed_version(source, user_id)
+    entries = cache.get(feed_key(source, user_id, version))
+    if entries is None:
+        entries = rebuild(source, user_id, version)
+    return entries
+
+
+def push_activity(activity):
+    """Add a newly logged ``activity`` to its user's buffer, without querying the table."""
+    source = SOURCES[type(activity)]
+    _, user_field, serializer = FEEDS[source]
+    user_id = getattr(activity, user_field)
+    key = version_key(source, user_id)
+    version = cache.get(key)
+    if version is None:
+        # No reader has started on this user yet; the first one sees the row.
+        return
+    entries = cache.get(feed_key(source, user_id, version))
+    try:
+        new_version = cache.incr(key)
+    except ValueError:
+        return
+    if entries is not None and new_version == version + 1:
+        entries = [dict(serializer(activity).data), *entries][:RECENT_ACTIVITY_SIZE]
+        cache.set(feed_key(source, user_id, new_version), entries, RECENT_ACTIVITY_TIMEOUT)
+
+
+def push_activity_on_commit(activity):
+    transaction.on_commit(lambda: push_activity(activity))
@@ -0,0 +1,68 @@
+"""
+The apply path: one short transaction per job application.
+
+The deadline check, the INSERT and the employer's notification commit
+together; the job's ``updated_at`` bump (signals.py) runs inside the same
+transaction. Duplicates are rejected by the ``unique_job_application``
+constraint rather than a read before the insert, so two concurrent
+submissions cannot both get through.
+
+Clients may send an ``Idempotency-Key`` header, which is stored with the
+application. A retry carrying the same key gets the original application
+back (``Idempotent-Replayed: true``) instead of a duplicate error; reusing a
+key for a different job is answered with 422.
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, PermissionDenied, ValidationError
+
+from .models import JobApplication, Notification
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was already used for a different application.'
+    default_code = 'idempotency_key_reused'
+
+
+def idempotency_key(request):
+    key = request.headers.get(IDEMPOTENCY_HEADER, '').strip()
+    if len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise ValidationError({IDEMPOTENCY_HEADER: [
+            f"Ensure this header has no more than {MAX_IDEMPOTENCY_KEY_LENGTH} characters."
+        ]})
+    return key or None
+
+
+def apply_for_job(serializer, user, key=None):
+    """Save the application validated by ``serializer``; returns ``(application, replayed)``."""
+    if user.role != 'job_seeker':
+        raise PermissionDenied("Only job seekers can apply for jobs.")
+    job = serializer.validated_data['job']
+    try:
+        with transaction.atomic():
+            if job.application_deadline and job.application_deadline < timezone.now().date():
+                raise ValidationError("The application deadline for this job has passed.")
+            application = serializer.save(user=user, idempotency_key=key)
+            Notification.objects.create(
+                user=job.employer,
+                message=f"You have a new application from {user.full_name} for the job '{job.title}'.",
+                link=f"/employer/jobs/{job.id}/applications",
+            )
+    except IntegrityError:
+        # Read outside the failed transaction, so a concurrent insert that
+        # has just committed is visible.
+        existing = JobApplication.objects.filter(job=job, user=user).first()
+        if existing is None:
+            if key is None:
+                raise
+            raise IdempotencyKeyReused()
+        if key is not None and existing.idempotency_key == key:
+            return existing, True
+        raise ValidationError("You have already applied for this job.")
+    return application, False
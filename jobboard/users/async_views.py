@@ -0,0 +1,215 @@
+"""
+Native async versions of the highest-traffic read endpoints.
+
+Under ASGI every synchronous DRF view is run through asgiref's thread
+executor. The views here answer their GET requests on the event loop with
+the async ORM instead, and hand any other method to the original DRF view.
+"""
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .conditional import alist_validators, check_preconditions, object_validators, set_validators
+from .fieldsets import slim_queryset, sparse_options
+from .filters import JobFilter
+from .models import Job, Message, Notification, User
+from .renderers import FastJSONRenderer
+from .serializers import JobSerializer, NotificationSerializer
+from .sync import CURSOR_HEADER, acurrent_cursor
+from .views import (
+    JobListCreateAPIView,
+    JobRetrieveUpdateDestroyAPIView,
+    NotificationListAPIView,
+    UnreadMessageCountAPIView,
+    UnreadNotificationCountAPIView,
+    job_etag_parts,
+    with_application_count,
+)
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication whose user lookup uses the async ORM."""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        try:
+            user = await User.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise exceptions.AuthenticationFailed("User not found", code='user_not_found')
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise exceptions.AuthenticationFailed("User is inactive", code='user_inactive')
+        return user
+
+
+class AsyncAPIView(View):
+    """Minimal async counterpart of DRF's APIView.
+
+    Authentication, permission checks and error bodies follow DRF, so clients
+    see the same responses. The permission classes are the regular DRF ones;
+    their ``has_permission`` checks only look at ``request.user`` and run on
+    the event loop. Methods without an async handler are served by
+    ``fallback_view``, the synchronous DRF view for the same route.
+    """
+    permission_classes = [IsAuthenticated]
+    fallback_view = None
+    authentication = AsyncJWTAuthentication()
+    renderer = FastJSONRenderer()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.fallback_view is not None:
+            cls.fallback = staticmethod(sync_to_async(cls.fallback_view.as_view()))
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Token authenticated like the DRF views, which are CSRF exempt too.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if handler is None or not self.handles(request):
+            if self.fallback_view is None:
+                return self.respond({'detail': f'Method "{request.method}" not allowed.'},
+                                    status.HTTP_405_METHOD_NOT_ALLOWED)
+            return await self.fallback(request, *args, **kwargs)
+        try:
+            request.user = await self.authentication.aauthenticate(request) or AnonymousUser()
+            self.check_permissions(request)
+            return await handler(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            response = self.respond(
+                exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail},
+                exc.status_code,
+            )
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response['WWW-Authenticate'] = self.authentication.authenticate_header(request)
+            return response
+
+    def handles(self, request):
+        """Whether this request can be answered natively; hook for subclasses."""
+        return True
+
+    def check_permissions(self, request):
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+    def respond(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(
+            self.renderer.render(data),
+            status=status_code,
+            content_type='application/json',
+        )
+
+
+class AsyncUnreadMessageCountView(AsyncAPIView):
+    fallback_view = UnreadMessageCountAPIView
+
+    async def get(self, request):
+        unread_count = await Message.objects.filter(recipient=request.user, is_read=False).acount()
+        return self.respond({'unread_count': unread_count})
+
+
+class AsyncUnreadNotificationCountView(AsyncAPIView):
+    fallback_view = UnreadNotificationCountAPIView
+
+    async def get(self, request):
+        unread_count = await Notification.objects.filter(user=request.user, is_read=False).acount()
+        return self.respond({'unread_count': unread_count})
+
+
+class AsyncNotificationListView(AsyncAPIView):
+    fallback_view = NotificationListAPIView
+
+    def handles(self, request):
+        # Delta sync (?since=) is served by the DRF view.
+        return 'since' not in request.GET
+
+    async def get(self, request):
+        options = sparse_options(request, NotificationSerializer.Meta.compact_fields)
+        queryset = Notification.objects.filter(user=request.user).order_by('-created_at')
+        etag, _ = await alist_validators(queryset, request.get_full_path(), request.user.pk)
+        response = check_preconditions(request, etag, None)
+        if response is not None:
+            return response
+        cursor = await acurrent_cursor(Notification.change_stream_for(request.user.pk))
+        queryset = slim_queryset(queryset, NotificationSerializer(**options))
+        notifications = [notification async for notification in queryset]
+        response = self.respond(NotificationSerializer(notifications, many=True, **options).data)
+        response[CURSOR_HEADER] = str(cursor)
+        return set_validators(response, etag, None)
+
+
+class AsyncJobDetailView(AsyncAPIView):
+    fallback_view = JobRetrieveUpdateDestroyAPIView
+
+    async def get(self, request, pk):
+        options = sparse_options(request)
+        serializer = JobSerializer(context={'request': request}, **options)
+        queryset = Job.objects.all()
+        if 'application_count' in serializer.fields:
+            queryset = with_application_count(queryset)
+        try:
+            job = await slim_queryset(queryset, serializer, ('updated_at',)).aget(pk=pk)
+        except Job.DoesNotExist:
+            raise exceptions.NotFound("No Job matches the given query.")
+        etag, last_modified = object_validators(job, date.today())
+        response = check_preconditions(request, etag, last_modified)
+        if response is not None:
+            return response
+        data = JobSerializer(job, context={'request': request}, **options).data
+        return set_validators(self.respond(data), etag, last_modified)
+
+
+class AsyncJobListView(AsyncAPIView):
+    """Anonymous job browsing.
+
+    ``location`` and ``near`` resolve place names against the gazetteer and
+    ``facets`` aggregates synchronously, so those requests stay on the DRF
+    view; everything else in JobFilter is built without touching the DB.
+    """
+    permission_classes = [AllowAny]
+    fallback_view = JobListCreateAPIView
+    sync_only_params = {'location', 'near', 'facets'}
+
+    def handles(self, request):
+        return not self.sync_only_params.intersection(request.GET)
+
+    async def get(self, request):
+        filterset = JobFilter(request.GET, queryset=Job.objects.all(), request=request)
+        if not filterset.is_valid():
+            raise exceptions.ValidationError(filterset.errors)
+        options = sparse_options(request, JobSerializer.Meta.compact_fields)
+        serializer = JobSerializer(context={'request': request}, **options)
+        queryset = filterset.qs
+        if 'application_count' in serializer.fields:
+            queryset = with_application_count(queryset)
+        etag, _ = await alist_validators(queryset, *job_etag_parts(request))
+        response = check_preconditions(request, etag, None)
+        if response is not None:
+            return response
+        jobs = [job async for job in slim_queryset(queryset, serializer)]
+        data = JobSerializer(jobs, many=True, context={'request': request}, **options).data
+        return set_validators(self.respond(data), etag, None)
@@ -0,0 +1,166 @@
+"""
+Cold storage for old chat history.
+
+``manage.py archive_messages`` moves the oldest messages of each
+conversation out of the ``Message`` table into ``MessageArchive`` blocks of
+``CHAT_ARCHIVE_BLOCK_SIZE`` messages, stored as zlib-compressed JSON. Only
+whole blocks of read messages older than ``CHAT_ARCHIVE_DAYS`` are closed
+out, always starting from the oldest message still in the table, so a
+conversation is archived up to some sequence number (its hot horizon) and
+everything after it is live. The newest message of a conversation always
+stays live, so the conversation list and unread counts never need the
+archive.
+
+Each block is written and its messages deleted in one transaction, with
+the messages locked while it runs. Message lists return the newest page
+and page back with ``?before_seq=<conversation_seq>``:
+
+    {"results": [...], "has_more": true, "hot_horizon": 412}
+
+Pages past the hot horizon (the oldest live ``conversation_seq``) are
+filled from the archive blocks, so clients see one history. Socket replay
+and delta sync only cover live messages; deletions are not reported.
+"""
+import json
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .models import Message, MessageArchive, User, conversation_key
+
+MESSAGE_PAGE_SIZE = 50
+ARCHIVED_FIELDS = [
+    'id', 'sender_id', 'recipient_id', 'content', 'timestamp', 'is_read', 'change_seq', 'conversation_seq',
+]
+
+
+def pack(messages):
+    rows = [
+        {**{field: getattr(message, field) for field in ARCHIVED_FIELDS}, 'timestamp': message.timestamp.isoformat()}
+        for message in messages
+    ]
+    return zlib.compress(json.dumps(rows, separators=(',', ':')).encode(), 9)
+
+
+def unpack(block):
+    """The messages of ``block`` as unsaved ``Message`` instances, oldest first."""
+    return [
+        Message(**{**row, 'timestamp': datetime.fromisoformat(row['timestamp'])},
+                conversation_key=block.conversation_key)
+        for row in json.loads(zlib.decompress(block.data))
+    ]
+
+
+def archive_cutoff(now=None):
+    return (now or timezone.now()) - timedelta(days=settings.CHAT_ARCHIVE_DAYS)
+
+
+def archivable_conversations(cutoff):
+    """Keys of the conversations with read messages older than ``cutoff``."""
+    return (
+        Message.objects.filter(timestamp__lt=cutoff, is_read=True)
+        .order_by('conversation_key').values_list('conversation_key', flat=True).distinct()
+    )
+
+
+def archive_conversation(key, cutoff, block_size=None, sleep=0.0):
+    """Close out the old blocks of conversation ``key``; yields the size of each block."""
+    block_size = block_size or settings.CHAT_ARCHIVE_BLOCK_SIZE
+    while True:
+        with transaction.atomic():
+            # One more than a block, so the newest message is never taken.
+            messages = list(
+                Message.objects.select_for_update().filter(conversation_key=key)
+                .order_by('conversation_seq')[:block_size + 1]
+            )
+            block = messages[:block_size]
+            if len(messages) <= block_size or any(
+                not message.is_read or message.timestamp >= cutoff for message in block
+            ):
+                return
+            MessageArchive.objects.create(
+                conversation_key=key,
+                first_seq=block[0].conversation_seq,
+                last_seq=block[-1].conversation_seq,
+                first_timestamp=block[0].timestamp,
+                last_timestamp=block[-1].timestamp,
+                message_count=len(block),
+                data=pack(block),
+            )
+            Message.objects.filter(pk__in=[message.pk for message in block]).delete()
+        yield len(block)
+        if sleep:
+            time.sleep(sleep)
+
+
+def messages_before(queryset, key, before_seq=None, limit=MESSAGE_PAGE_SIZE):
+    """``(messages, has_more)``: the ``limit`` messages of ``key`` numbered below ``before_seq``.
+
+    ``queryset`` holds the conversation's live messages; the page continues
+    into the archive once they run out. Without ``before_seq`` the page is
+    the newest one. Messages come oldest first.
+    """
+    if before_seq is not None:
+        queryset = queryset.filter(conversation_seq__lt=before_seq)
+    page = list(queryset.order_by('-conversation_seq')[:limit + 1])
+    if len(page) <= limit:
+        blocks = MessageArchive.objects.filter(conversation_key=key)
+        if before_seq is not None:
+            blocks = blocks.filter(first_seq__lt=before_seq)
+        archived = []
+        for block in blocks.order_by('-last_seq').iterator(chunk_size=4):
+            archived.extend(
+                message for message in reversed(unpack(block))
+                if before_seq is None or message.conversation_seq < before_seq
+            )
+            if len(page) + len(archived) > limit:
+                break
+        if archived:
+            users = User.objects.in_bulk({archived[0].sender_id, archived[0].recipient_id})
+            for message in archived:
+                message.sender, message.recipient = users[message.sender_id], users[message.recipient_id]
+            page.extend(archived)
+    has_more = len(page) > limit
+    return page[:limit][::-1], has_more
+
+
+def delete_user_archive(user_id):
+    """Drop the archived conversations of a deleted user, whose live messages cascade."""
+    MessageArchive.objects.filter(
+        Q(conversation_key__startswith=f'{user_id}_') | Q(conversation_key__endswith=f'_{user_id}')
+    ).delete()
+
+
+def hot_horizon(queryset):
+    """The oldest live ``conversation_seq`` in ``queryset``, or None once nothing is live."""
+    return queryset.order_by('conversation_seq').values_list('conversation_seq', flat=True).first()
+
+
+class ArchivedHistoryMixin:
+    """Pages of the message list of the conversation with ``user_id``, reaching into the archive."""
+    history_page_size = MESSAGE_PAGE_SIZE
+
+    def get_conversation_key(self):
+        return conversation_key(self.request.user.pk, self.kwargs['user_id'])
+
+    def list(self, request, *args, **kwargs):
+        before_seq = request.query_params.get('before_seq')
+        if before_seq is not None:
+            try:
+                before_seq = int(before_seq)
+            except ValueError:
+                raise ValidationError({'before_seq': ['Expected the conversation_seq of a message.']})
+        queryset = self.filter_queryset(self.get_queryset())
+        messages, has_more = messages_before(queryset, self.get_conversation_key(), before_seq, self.history_page_size)
+        return Response({
+            'results': self.get_serializer(messages, many=True).data,
+            'has_more': has_more,
+            'hot_horizon': hot_horizon(queryset),
+        })
@@ -0,0 +1,118 @@
+"""
+Conditional requests (ETag / Last-Modified) for jobs, profiles and lists.
+
+Validators are derived from ``updated_at`` without serializing anything:
+an object's ETag hashes its primary key and ``updated_at``; a list's hashes
+the row count and the newest ``updated_at`` of the filtered queryset, plus
+whatever else shapes the response (the query string, the requesting user).
+``django.utils.cache.get_conditional_response`` then answers ``304 Not
+Modified`` to matching GETs and ``412 Precondition Failed`` to writes whose
+``If-Match`` no longer matches. Writes check and save under a row lock.
+"""
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """Strong ETag over ``parts``; they only need a stable ``repr``."""
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def object_validators(instance, *extra):
+    etag = make_etag(instance._meta.label, instance.pk, instance.updated_at, *extra)
+    return etag, instance.updated_at
+
+
+def _list_validators(aggregate, queryset, extra):
+    etag = make_etag(queryset.model._meta.label, aggregate['row_count'], aggregate['last_updated'], *extra)
+    return etag, aggregate['last_updated']
+
+
+def _list_aggregate(queryset):
+    return queryset.order_by().aggregate(row_count=Count('pk'), last_updated=Max('updated_at'))
+
+
+def list_validators(queryset, *extra):
+    """Validators for the rows of ``queryset``; one aggregate query."""
+    return _list_validators(_list_aggregate(queryset), queryset, extra)
+
+
+async def alist_validators(queryset, *extra):
+    aggregate = await queryset.order_by().aaggregate(row_count=Count('pk'), last_updated=Max('updated_at'))
+    return _list_validators(aggregate, queryset, extra)
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def check_preconditions(request, etag, last_modified):
+    """Return the 304/412 response the request's conditions call for, or ``None``."""
+    response = get_conditional_response(
+        request, etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified is not None else None,
+    )
+    if response is not None and response.status_code == 304:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalRetrieveUpdateMixin:
+    """ETag / Last-Modified on retrieve, ``If-Match`` on PUT and PATCH."""
+
+    def get_validators(self, instance):
+        return object_validators(instance)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_validators(instance)
+        response = check_preconditions(request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(Response(self.get_serializer(instance).data), etag, last_modified)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            instance = self.get_object()
+            # Compare against the row as it is once locked: a write committed
+            # after the read above would otherwise slip past If-Match, and two
+            # requests holding the same ETag could both succeed.
+            instance.updated_at = (
+                type(instance)._default_manager.select_for_update()
+                .values_list('updated_at', flat=True).get(pk=instance.pk)
+            )
+            response = check_preconditions(request, *self.get_validators(instance))
+            if response is not None:
+                return response
+            response = super().update(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, *self.get_validators(self.get_object()))
+        return response
+
+
+class ConditionalListMixin:
+    """ETag for list endpoints, from count and max(updated_at).
+
+    The ETag covers the full query string and the requesting user, since
+    both change what the list contains. Lists send no Last-Modified: after
+    a deletion the newest ``updated_at`` can move backwards.
+    """
+
+    def get_etag_parts(self, request):
+        return (request.get_full_path(), request.user.pk)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, _ = list_validators(queryset, *self.get_etag_parts(request))
+        response = check_preconditions(request, etag, None)
+        if response is not None:
+            return response
+        return set_validators(super().list(request, *args, **kwargs), etag, None)
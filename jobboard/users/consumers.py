@@ -1,16 +1,165 @@
+import asyncio
 import json
 import logging
+import time
+from urllib.parse import parse_qs
 
 logger = logging.getLogger(__name__)
 from channels.generic.websocket import AsyncWebsocketConsumer
 from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
-from .models import Message
+from . import presence
+from .fanout import user_group
+from .models import Message, conversation_key
 from .serializers import MessageSerializer
 
 User = get_user_model()
 
-class ChatConsumer(AsyncWebsocketConsumer):
+# Conversations one multiplexed socket may follow at once.
+MAX_SUBSCRIPTIONS = 100
+# Messages per frame when replaying what a reconnecting client missed.
+REPLAY_BATCH_SIZE = 100
+# Read receipts of one conversation within this many seconds become one UPDATE.
+READ_RECEIPT_WINDOW = 1.0
+
+
+def chat_group(user_id, other_user_id):
+    """Channel-layer group of the conversation between two users."""
+    return f'chat_{conversation_key(user_id, other_user_id)}'
+
+
+def parse_seq(value):
+    try:
+        seq = int(value)
+    except (TypeError, ValueError):
+        return None
+    return seq if seq >= 0 else None
+
+
+class ChatSocketMixin:
+    """Presence, typing, replay and message relaying shared by the chat sockets."""
+
+    async def send_frame(self, payload):
+        await self.send(text_data=json.dumps(payload))
+
+    async def start_presence(self):
+        self.presence_refreshed = time.monotonic()
+        if await presence.join(self.user.id, self.channel_name):
+            await self.announce_presence(True)
+
+    async def stop_presence(self):
+        if await presence.leave(self.user.id, self.channel_name):
+            await self.announce_presence(False)
+
+    async def heartbeat(self):
+        # Clients ping every few seconds; the cache only hears about it
+        # once per refresh interval.
+        now = time.monotonic()
+        if now - self.presence_refreshed < presence.PRESENCE_REFRESH_INTERVAL:
+            return
+        self.presence_refreshed = now
+        if await presence.join(self.user.id, self.channel_name):
+            await self.announce_presence(True)
+
+    async def read_up_to(self, other_user_id, message_id):
+        """Record that the messages of ``other_user_id`` up to ``message_id`` were read.
+
+        Receipts are held for ``READ_RECEIPT_WINDOW`` and only the highest one
+        is written, so scrolling through a thread costs one UPDATE.
+        """
+        self.read_marks[other_user_id] = max(self.read_marks.get(other_user_id, 0), message_id)
+        if other_user_id not in self.read_flushes:
+            self.read_flushes[other_user_id] = asyncio.create_task(self.flush_read_later(other_user_id))
+
+    async def flush_read_later(self, other_user_id):
+        await asyncio.sleep(READ_RECEIPT_WINDOW)
+        self.read_flushes.pop(other_user_id, None)
+        await self.flush_read(other_user_id)
+
+    async def flush_read(self, other_user_id):
+        message_id = self.read_marks.pop(other_user_id, None)
+        if message_id is None:
+            return
+        await self.save_read(other_user_id, message_id)
+        await self.channel_layer.group_send(chat_group(self.user.id, other_user_id), {
+            'type': 'chat.read',
+            'user_id': self.user.id,
+            'up_to': message_id,
+        })
+
+    async def flush_all_reads(self):
+        for task in self.read_flushes.values():
+            task.cancel()
+        self.read_flushes.clear()
+        for other_user_id in list(self.read_marks):
+            await self.flush_read(other_user_id)
+
+    @sync_to_async
+    def save_read(self, other_user_id, message_id):
+        return Message.objects.filter(sender=other_user_id, recipient=self.user.id, id__lte=message_id).mark_read()
+
+    async def announce_presence(self, online):
+        await self.channel_layer.group_send(
+            presence.presence_group(self.user.id), presence.presence_event(self.user.id, online),
+        )
+
+    async def replay(self, other_user_id, last_seq):
+        """Send the messages of the conversation numbered after ``last_seq``.
+
+        Runs after joining the conversation's group, so nothing falls between
+        the replay and live traffic; live messages it already covered are
+        dropped by ``chat_message``.
+        """
+        while True:
+            messages = await self.messages_after(other_user_id, last_seq)
+            has_more = len(messages) > REPLAY_BATCH_SIZE
+            messages = messages[:REPLAY_BATCH_SIZE]
+            if messages:
+                last_seq = messages[-1]['conversation_seq']
+            self.replayed[conversation_key(self.user.id, other_user_id)] = last_seq
+            await self.send_frame({
+                'type': 'replay',
+                'user_id': other_user_id,
+                'messages': messages,
+                'has_more': has_more,
+            })
+            if not has_more:
+                return
+
+    @sync_to_async
+    def messages_after(self, other_user_id, last_seq):
+        messages = Message.objects.filter(
+            conversation_key=conversation_key(self.user.id, other_user_id), conversation_seq__gt=last_seq,
+        ).select_related('sender', 'recipient').order_by('conversation_seq')
+        return MessageSerializer(messages[:REPLAY_BATCH_SIZE + 1], many=True).data
+
+    async def chat_message(self, event):
+        message = event['message']
+        key = conversation_key(message['sender'], message['recipient'])
+        if message.get('conversation_seq', 0) <= self.replayed.get(key, 0):
+            return
+        logger.info(f"Sending message to client {self.user.username}: {message}")
+        await self.send_frame({
+            'type': 'chat_message',
+            'message': message
+        })
+
+    async def chat_read(self, event):
+        await self.send_frame({'type': 'read', 'user_id': event['user_id'], 'up_to': event['up_to']})
+
+    async def chat_typing(self, event):
+        if event['user_id'] != self.user.id:
+            await self.send_frame({'type': 'typing', 'user_id': event['user_id']})
+
+    async def presence_changed(self, event):
+        await self.send_frame({
+            'type': 'presence',
+            'user_id': event['user_id'],
+            'online': event['online'],
+        })
+
+
+class ChatConsumer(ChatSocketMixin, AsyncWebsocketConsumer):
     async def connect(self):
         try:
             self.user = self.scope['user']
@@ -27,21 +176,34 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 await self.close()
                 return
 
-            # Create a unique room name for the pair of users
-            if self.user.id < self.other_user.id:
-                self.room_name = f'{self.user.id}_{self.other_user.id}'
-            else:
-                self.room_name = f'{self.other_user.id}_{self.user.id}'
-            
-            self.room_group_name = f'chat_{self.room_name}'
+            # A unique room for the pair of users
+            self.room_group_name = chat_group(self.user.id, self.other_user.id)
 
             # Join room group
             await self.channel_layer.group_add(
                 self.room_group_name,
                 self.channel_name
             )
+            await self.channel_layer.group_add(presence.presence_group(self.other_user.id), self.channel_name)
             await self.accept()
             logger.info(f"User {self.user.username} connected to chat room {self.room_group_name}.")
+
+            self.last_typing = 0
+            self.replayed = {}
+            self.read_marks = {}
+            self.read_flushes = {}
+            await self.start_presence()
+            await self.send_frame({
+                'type': 'presence',
+                'user_id': self.other_user.id,
+                'online': await presence.is_online(self.other_user.id),
+            })
+
+            # A reconnecting client passes the last sequence number it saw.
+            query = parse_qs(self.scope.get('query_string', b'').decode())
+            last_seq = parse_seq(query.get('last_seq', [None])[0])
+            if last_seq is not None:
+                await self.replay(self.other_user.id, last_seq)
         except Exception as e:
             logger.error(f"Error in ChatConsumer.connect: {e}")
             await self.close()
@@ -53,11 +215,23 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 self.room_group_name,
                 self.channel_name
             )
+            await self.channel_layer.group_discard(presence.presence_group(self.other_user.id), self.channel_name)
+            await self.flush_all_reads()
+            await self.stop_presence()
 
     async def receive(self, text_data):
         logger.info(f"Received message from {self.user.username}: {text_data}")
         try:
             text_data_json = json.loads(text_data)
+            await self.heartbeat()
+            if text_data_json.get('type') == 'heartbeat':
+                return
+            if text_data_json.get('type') == 'typing':
+                await self.typing()
+                return
+            if text_data_json.get('type') == 'read':
+                await self.read_up_to(self.other_user.id, int(text_data_json['up_to']))
+                return
             message_content = text_data_json['message']
 
             if not message_content.strip():
@@ -78,17 +252,18 @@ class ChatConsumer(AsyncWebsocketConsumer):
                     'message': message_data,
                 }
             )
-        except (KeyError, json.JSONDecodeError) as e:
+        except (KeyError, AttributeError, TypeError, ValueError) as e:
             logger.error(f"Error processing received message: {e}")
 
-    async def chat_message(self, event):
-        message = event['message']
-        logger.info(f"Sending message to client {self.user.username}: {message}")
-
-        await self.send(text_data=json.dumps({
-            'type': 'chat_message',
-            'message': message
-        }))
+    async def typing(self):
+        now = time.monotonic()
+        if now - self.last_typing < presence.TYPING_INTERVAL:
+            return
+        self.last_typing = now
+        await self.channel_layer.group_send(self.room_group_name, {
+            'type': 'chat.typing',
+            'user_id': self.user.id,
+        })
 
     @sync_to_async
     def save_message(self, message_content):
@@ -101,3 +276,146 @@ class ChatConsumer(AsyncWebsocketConsumer):
     @sync_to_async
     def serialize_message(self, message):
         return MessageSerializer(message).data
+
+
+class UserSocketConsumer(ChatSocketMixin, AsyncWebsocketConsumer):
+    """One socket per user for all of their conversations: ``ws/user/``.
+
+    Authentication happens once, in the handshake. The client then follows
+    conversations with control frames, each of which joins or leaves the
+    conversation's channel-layer group (the same group ``ChatConsumer``
+    uses, so both kinds of socket talk to each other):
+
+        {"type": "subscribe", "user_id": 7}      -> {"type": "subscribed", "user_id": 7, "online": true}
+        {"type": "subscribe", "user_id": 7, "last_seq": 41}   (also replays what came after 41)
+        {"type": "unsubscribe", "user_id": 7}    -> {"type": "unsubscribed", "user_id": 7}
+        {"type": "message", "user_id": 7, "message": "Hi"}
+        {"type": "typing", "user_id": 7}
+        {"type": "read", "user_id": 7, "up_to": 1043}   (messages from 7 up to id 1043 were read)
+        {"type": "heartbeat"}
+
+    Messages, typing and presence arrive as on ``ws/chat/<user_id>/``, and
+    the user's notifications as ``{"type": "notification", ...}``.
+    Partners are only looked up when a message is first sent to them.
+    """
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if not self.user.is_authenticated:
+            logger.warning("UserSocketConsumer: Unauthenticated user connection attempt.")
+            await self.close()
+            return
+        self.subscriptions = set()
+        self.partners = {}
+        self.last_typing = {}
+        self.replayed = {}
+        self.read_marks = {}
+        self.read_flushes = {}
+        await self.channel_layer.group_add(user_group(self.user.id), self.channel_name)
+        await self.accept()
+        await self.start_presence()
+
+    async def disconnect(self, close_code):
+        if not hasattr(self, 'subscriptions'):
+            return
+        await self.flush_all_reads()
+        for other_user_id in list(self.subscriptions):
+            await self.unsubscribe(other_user_id)
+        await self.channel_layer.group_discard(user_group(self.user.id), self.channel_name)
+        await self.stop_presence()
+
+    async def receive(self, text_data):
+        await self.heartbeat()
+        try:
+            frame = json.loads(text_data)
+            kind = frame.get('type')
+            if kind == 'heartbeat':
+                return
+            if kind not in ('subscribe', 'unsubscribe', 'message', 'typing', 'read'):
+                await self.send_error(f"Unknown frame type: {kind}.")
+                return
+            other_user_id = int(frame['user_id'])
+            up_to = int(frame['up_to']) if kind == 'read' else None
+        except (KeyError, TypeError, ValueError, AttributeError):
+            await self.send_error("Malformed frame.")
+            return
+
+        if kind == 'unsubscribe':
+            await self.unsubscribe(other_user_id)
+            await self.send_frame({'type': 'unsubscribed', 'user_id': other_user_id})
+        elif kind == 'subscribe':
+            await self.subscribe(other_user_id, parse_seq(frame.get('last_seq')))
+        elif other_user_id not in self.subscriptions:
+            await self.send_error(f"Not subscribed to user {other_user_id}.")
+        elif kind == 'typing':
+            await self.typing(other_user_id)
+        elif kind == 'read':
+            await self.read_up_to(other_user_id, up_to)
+        else:
+            await self.send_message(other_user_id, frame.get('message'))
+
+    async def subscribe(self, other_user_id, last_seq=None):
+        if other_user_id == self.user.id:
+            await self.send_error("Cannot subscribe to yourself.")
+            return
+        if other_user_id not in self.subscriptions:
+            if len(self.subscriptions) >= MAX_SUBSCRIPTIONS:
+                await self.send_error(f"At most {MAX_SUBSCRIPTIONS} subscriptions per socket.")
+                return
+            self.subscriptions.add(other_user_id)
+            await self.channel_layer.group_add(chat_group(self.user.id, other_user_id), self.channel_name)
+            await self.channel_layer.group_add(presence.presence_group(other_user_id), self.channel_name)
+        await self.send_frame({
+            'type': 'subscribed',
+            'user_id': other_user_id,
+            'online': await presence.is_online(other_user_id),
+        })
+        if last_seq is not None:
+            await self.replay(other_user_id, last_seq)
+
+    async def unsubscribe(self, other_user_id):
+        if other_user_id not in self.subscriptions:
+            return
+        self.subscriptions.discard(other_user_id)
+        self.last_typing.pop(other_user_id, None)
+        self.replayed.pop(conversation_key(self.user.id, other_user_id), None)
+        await self.channel_layer.group_discard(chat_group(self.user.id, other_user_id), self.channel_name)
+        await self.channel_layer.group_discard(presence.presence_group(other_user_id), self.channel_name)
+
+    async def typing(self, other_user_id):
+        now = time.monotonic()
+        if now - self.last_typing.get(other_user_id, 0) < presence.TYPING_INTERVAL:
+            return
+        self.last_typing[other_user_id] = now
+        await self.channel_layer.group_send(chat_group(self.user.id, other_user_id), {
+            'type': 'chat.typing',
+            'user_id': self.user.id,
+        })
+
+    async def send_message(self, other_user_id, content):
+        if not isinstance(content, str) or not content.strip():
+            await self.send_error("Empty message.")
+            return
+        try:
+            message_data = await self.save_message(other_user_id, content)
+        except User.DoesNotExist:
+            await self.send_error(f"User {other_user_id} does not exist.")
+            return
+        message_data['sender_name'] = self.user.full_name or self.user.username
+        await self.channel_layer.group_send(chat_group(self.user.id, other_user_id), {
+            'type': 'chat_message',
+            'message': message_data,
+        })
+
+    async def notification_created(self, event):
+        await self.send_frame({'type': 'notification', 'notification': event['notification']})
+
+    async def send_error(self, detail):
+        await self.send_frame({'type': 'error', 'detail': detail})
+
+    @sync_to_async
+    def save_message(self, other_user_id, content):
+        if other_user_id not in self.partners:
+            self.partners[other_user_id] = User.objects.get(id=other_user_id)
+        message = Message.objects.create(sender=self.user, recipient=self.partners[other_user_id], content=content)
+        return MessageSerializer(message).data
@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_DB_ALIAS = getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+
+
+class RoutingState:
+    """Per-request routing decision, shared by the router and the middleware.
+
+    The object is mutated in place rather than replaced, so a write made in a
+    ``sync_to_async`` thread is still visible to the request that spawned it.
+    """
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def replica_configured():
+    return (
+        REPLICA_DB_ALIAS in settings.DATABASES
+        and getattr(settings, 'DATABASE_REPLICA_READS', True)
+    )
+
+
+def begin_request(use_replica):
+    return _state.set(RoutingState(use_replica and replica_configured()))
+
+
+def end_request(token):
+    """Reset the routing state; returns whether the request wrote anything."""
+    state = _state.get()
+    _state.reset(token)
+    return bool(state and state.wrote)
+
+
+def pin_to_primary():
+    """Send every further read of the current request to the primary."""
+    state = _state.get()
+    if state is not None:
+        state.wrote = True
+
+
+@contextmanager
+def read_from_replica(use_replica=True):
+    """Route reads of the enclosed block, e.g. in tests or scripts."""
+    token = begin_request(use_replica)
+    try:
+        yield
+    finally:
+        end_request(token)
+
+
+class PrimaryReplicaRouter:
+    """Send reads of safe requests to the replica, everything else to primary.
+
+    A request reads from ``replica`` only if the middleware marked it as
+    read-only and it has not written yet. The first write pins the rest of
+    the request (and, via the middleware, the client's next requests for a
+    few seconds) to ``default`` so users always read their own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Follow relations on the database the instance came from.
+            return instance._state.db
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
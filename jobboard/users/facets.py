@@ -0,0 +1,187 @@
+import hashlib
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, F, Value, When
+from django.utils import timezone
+from rest_framework.response import Response
+
+FACET_NAMES = ('job_type', 'location', 'salary', 'posted')
+
+# (label, lower bound inclusive, upper bound exclusive) on the normalized
+# yearly minimum salary. The labels use the same "min-max" / "min+" syntax
+# that ?salary= accepts, so a bucket can be turned straight into a filter.
+SALARY_BANDS = [
+    ('0-300000', 0, 300000),
+    ('300000-600000', 300000, 600000),
+    ('600000-1200000', 600000, 1200000),
+    ('1200000-2400000', 1200000, 2400000),
+    ('2400000+', 2400000, None),
+]
+
+# Posting age buckets in days. Counts are cumulative: a job posted today is
+# also counted in the 7 and 30 day buckets.
+POSTED_BANDS = [
+    ('last_24_hours', 1),
+    ('last_7_days', 7),
+    ('last_30_days', 30),
+]
+
+LOCATION_FACET_LIMIT = 20
+FACET_CACHE_TIMEOUT = 300
+JOBS_GENERATION_KEY = 'jobs:generation'
+
+
+def parse_facets(value):
+    requested = [name.strip() for name in (value or '').split(',')]
+    return sorted({name for name in requested if name in FACET_NAMES})
+
+
+def jobs_generation():
+    return cache.get_or_set(JOBS_GENERATION_KEY, 1, None)
+
+
+def bump_jobs_generation():
+    """Invalidate every cached job search result; called when a job or its applications change."""
+    try:
+        cache.incr(JOBS_GENERATION_KEY)
+    except ValueError:
+        cache.set(JOBS_GENERATION_KEY, 1, None)
+
+
+def response_cache_key(request):
+    """Cache key for the faceted response to ``request``.
+
+    Every query parameter counts, since paging, sorting and fieldsets all
+    change the body. So does the date: ``current_status`` flips when a
+    deadline passes, without a save.
+    """
+    params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+    digest = hashlib.md5(repr((request.path, params)).encode()).hexdigest()
+    return f'jobs:search:{jobs_generation()}:{date.today().isoformat()}:{digest}'
+
+
+def _salary_band():
+    whens = [When(salary_annual_min__isnull=True, then=Value('unspecified'))]
+    for label, low, high in SALARY_BANDS:
+        if high is None:
+            whens.append(When(salary_annual_min__gte=low, then=Value(label)))
+        else:
+            whens.append(When(salary_annual_min__lt=high, then=Value(label)))
+    return Case(*whens, default=Value('unspecified'), output_field=CharField())
+
+
+def _posted_band(now):
+    whens = [
+        When(created_at__gte=now - timedelta(days=days), then=Value(label))
+        for label, days in POSTED_BANDS
+    ]
+    return Case(*whens, default=Value('older'), output_field=CharField())
+
+
+def compute_facets(queryset, facets):
+    """Count the filtered jobs per bucket of each requested facet.
+
+    All facets come from one ``GROUP BY`` over the filtered set; each row of
+    the result is a combination of buckets, which is then rolled up per facet.
+    Jobs linked to the gazetteer are counted under their place, as
+    ``filter_by_place`` matches them; only unlinked jobs fall back to their
+    free-text city and state.
+    """
+    annotations = {}
+    group_by = []
+    if 'job_type' in facets:
+        group_by.append('job_type')
+    if 'location' in facets:
+        annotations['unlinked_city'] = Case(When(location__isnull=True, then=F('location_city')), default=Value(''))
+        annotations['unlinked_state'] = Case(When(location__isnull=True, then=F('location_state')), default=Value(''))
+        group_by += ['location_id', 'location__name', 'location__state', 'unlinked_city', 'unlinked_state']
+    if 'salary' in facets:
+        annotations['salary_band'] = _salary_band()
+        group_by.append('salary_band')
+    if 'posted' in facets:
+        annotations['posted_band'] = _posted_band(timezone.now())
+        group_by.append('posted_band')
+
+    rows = (
+        queryset.order_by()
+        .annotate(**annotations)
+        .values(*group_by)
+        .annotate(facet_count=Count('id'))
+    )
+
+    counts = {name: {} for name in facets}
+
+    def add(name, bucket, n):
+        counts[name][bucket] = counts[name].get(bucket, 0) + n
+
+    for row in rows:
+        n = row['facet_count']
+        if 'job_type' in facets:
+            add('job_type', row['job_type'], n)
+        if 'location' in facets:
+            if row['location_id'] is None:
+                add('location', f"{row['unlinked_city']}, {row['unlinked_state']}", n)
+            else:
+                add('location', f"{row['location__name']}, {row['location__state']}", n)
+        if 'salary' in facets:
+            add('salary', row['salary_band'], n)
+        if 'posted' in facets:
+            add('posted', row['posted_band'], n)
+
+    result = {}
+    if 'job_type' in facets:
+        result['job_type'] = counts['job_type']
+    if 'location' in facets:
+        top = sorted(counts['location'].items(), key=lambda item: (-item[1], item[0]))
+        result['location'] = dict(top[:LOCATION_FACET_LIMIT])
+    if 'salary' in facets:
+        result['salary'] = {
+            label: counts['salary'].get(label, 0)
+            for label in [band[0] for band in SALARY_BANDS] + ['unspecified']
+        }
+    if 'posted' in facets:
+        # Exclusive buckets from SQL become cumulative "last N days" counts.
+        posted = {}
+        running = 0
+        for label, _ in POSTED_BANDS:
+            running += counts['posted'].get(label, 0)
+            posted[label] = running
+        posted['older'] = counts['posted'].get('older', 0)
+        result['posted'] = posted
+    return result
+
+
+class FacetedListMixin:
+    """List views that answer ``?facets=job_type,location,salary,posted``.
+
+    Without ``facets`` the response is unchanged. With it, the response
+    becomes ``{"results": [...], "facets": {...}}``, and the whole body is
+    cached under ``response_cache_key`` until a job or an application
+    changes. View counts in a cached body may lag by up to
+    ``FACET_CACHE_TIMEOUT``.
+    """
+
+    def list(self, request, *args, **kwargs):
+        facets = parse_facets(request.query_params.get('facets'))
+        if not facets:
+            return super().list(request, *args, **kwargs)
+
+        key = response_cache_key(request)
+        data = cache.get(key)
+        if data is None:
+            data = self.get_faceted_data(facets)
+            cache.set(key, data, FACET_CACHE_TIMEOUT)
+        return Response(data)
+
+    def get_faceted_data(self, facets):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            data = self.get_paginated_response(self.get_serializer(page, many=True).data).data
+            data['facets'] = compute_facets(queryset, facets)
+            return data
+        return {
+            'results': self.get_serializer(queryset, many=True).data,
+            'facets': compute_facets(queryset, facets),
+        }
@@ -0,0 +1,144 @@
+"""
+Notification fan-out to every applicant of a job, off the request path.
+
+Views write a ``NotificationOutbox`` row in the same transaction as the
+change that triggers it, and once that commits send a wake-up on the
+``notification-fanout`` channel. A Channels worker
+(``python manage.py runworker notification-fanout``) then drains the
+outbox. It writes the ``Notification`` rows with one ``bulk_create`` per
+chunk and pushes each chunk to the recipients' ``user_<id>`` groups
+concurrently, so a job with 50k applicants costs a few dozen INSERTs rather
+than 50k.
+
+The channel itself is lossy: wake-ups expire, and are dropped outright
+when no worker is listening. The outbox is what makes a fan-out durable.
+Any wake-up drains everything still pending, and
+``manage.py drain_fanout`` does the same from cron. Each chunk's
+notifications are written in one transaction with the outbox row's
+progress (``last_user_id``), which is held locked, so a worker that dies
+part-way is resumed from the next recipient. No one is notified twice.
+Socket pushes are live-only and best-effort; clients that miss one catch
+up from the notification list.
+
+A job that is being deleted takes its applications with it, so the view
+collects the applicant ids first and stores them in the outbox row.
+"""
+import asyncio
+
+from asgiref.sync import async_to_sync
+from channels.consumer import SyncConsumer
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from .models import JobApplication, Notification, NotificationOutbox
+from .serializers import NotificationSerializer
+
+FANOUT_CHANNEL = 'notification-fanout'
+FANOUT_CHUNK_SIZE = 1000
+
+
+def user_group(user_id):
+    """Channel-layer group of every socket ``user_id`` has open."""
+    return f'user_{user_id}'
+
+
+def next_recipients(entry, chunk_size=FANOUT_CHUNK_SIZE):
+    """The next ``chunk_size`` user ids of outbox ``entry``, ascending."""
+    if entry.user_ids is not None:
+        return sorted(user_id for user_id in entry.user_ids if user_id > entry.last_user_id)[:chunk_size]
+    return list(
+        JobApplication.objects.filter(job_id=entry.job_id, user_id__gt=entry.last_user_id)
+        .order_by('user_id').values_list('user_id', flat=True).distinct()[:chunk_size]
+    )
+
+
+async def push_notifications(channel_layer, notifications):
+    await asyncio.gather(*(
+        channel_layer.group_send(user_group(notification['user']), {
+            'type': 'notification.created',
+            'notification': notification,
+        })
+        for notification in notifications
+    ))
+
+
+def create_notifications(user_ids, message, link=''):
+    """Create one notification per user id; returns them serialized."""
+    created = Notification.objects.bulk_create(
+        Notification(user_id=user_id, message=message, link=link) for user_id in user_ids
+    )
+    if created and created[0].pk is None:
+        # Backends that cannot return ids from bulk INSERTs (MySQL): each row
+        # is its user's change number, so read them back by (user, change_seq),
+        # which the notification_user_seq_idx index covers.
+        numbers = {notification.user_id: notification.change_seq for notification in created}
+        created = [
+            notification for notification in Notification.objects.filter(
+                user_id__in=numbers,
+                change_seq__gte=min(numbers.values()), change_seq__lte=max(numbers.values()),
+            )
+            if numbers[notification.user_id] == notification.change_seq
+        ]
+    return NotificationSerializer(created, many=True).data
+
+
+def push(notifications, channel_layer=None):
+    channel_layer = channel_layer or get_channel_layer()
+    if channel_layer is not None and notifications:
+        async_to_sync(push_notifications)(channel_layer, notifications)
+
+
+def notify_users(user_ids, message, link='', channel_layer=None):
+    """Create one notification per user id and push them; returns the number created."""
+    push(create_notifications(user_ids, message, link), channel_layer)
+    return len(user_ids)
+
+
+def drain_outbox(chunk_size=FANOUT_CHUNK_SIZE, channel_layer=None):
+    """Work through every pending fan-out; returns the number of notifications created."""
+    total = 0
+    for pk in list(NotificationOutbox.objects.order_by('pk').values_list('pk', flat=True)):
+        while True:
+            with transaction.atomic():
+                # Another worker holding the row is already on it.
+                entry = NotificationOutbox.objects.select_for_update(skip_locked=True).filter(pk=pk).first()
+                if entry is None:
+                    break
+                user_ids = next_recipients(entry, chunk_size)
+                if not user_ids:
+                    entry.delete()
+                    break
+                created = create_notifications(user_ids, entry.message, entry.link)
+                entry.last_user_id = user_ids[-1]
+                entry.save(update_fields=['last_user_id'])
+            push(created, channel_layer)
+            total += len(user_ids)
+    return total
+
+
+def _wake():
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(channel_layer.send)(FANOUT_CHANNEL, {'type': 'fanout.pending'})
+
+
+def enqueue_applicant_fanout(job, message, link=''):
+    """Notify the applicants of ``job`` once the current transaction commits."""
+    NotificationOutbox.objects.create(job_id=job.pk, message=message, link=link)
+    transaction.on_commit(_wake)
+
+
+def enqueue_user_fanout(user_ids, message, link=''):
+    """Notify ``user_ids`` once the current transaction commits."""
+    user_ids = sorted(set(user_ids))
+    if user_ids:
+        NotificationOutbox.objects.create(user_ids=user_ids, message=message, link=link)
+        transaction.on_commit(_wake)
+
+
+class NotificationFanoutConsumer(SyncConsumer):
+    """Worker for the ``notification-fanout`` channel."""
+    chunk_size = FANOUT_CHUNK_SIZE
+
+    def fanout_pending(self, event):
+        drain_outbox(self.chunk_size)
@@ -0,0 +1,127 @@
+"""
+Sparse fieldsets: ``?fields=`` and ``?omit=`` on GET responses.
+
+``?fields=title,salary_min`` renders only those fields (plus ``id``),
+``?omit=description`` renders everything else, and ``?fields=*`` asks for
+the full representation. List views that set ``compact_list`` default to the
+serializer's ``Meta.compact_fields`` when no ``fields`` are given.
+
+The selected fields also shape the query: model columns no rendered field
+reads are deferred, and ``select_related`` joins nobody renders are dropped.
+Fields that read something other than their own source (method fields,
+properties) declare the columns they need in ``Meta.field_sources``; any
+other field that is not a plain model field disables the deferral.
+"""
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+ALL_FIELDS = '*'
+
+
+def parse_field_list(value):
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def sparse_options(request, compact_fields=None):
+    """Serializer keyword arguments for the fieldset ``request`` asks for."""
+    if request.method not in SAFE_METHODS:
+        return {}
+    fields = parse_field_list(request.GET.get('fields'))
+    if fields is None:
+        fields = compact_fields
+    elif ALL_FIELDS in fields:
+        fields = None
+    return {'fields': fields, 'omit': parse_field_list(request.GET.get('omit'))}
+
+
+class SparseFieldsetSerializerMixin:
+    """ModelSerializer taking ``fields`` and ``omit`` keyword arguments."""
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        self.requested_fields = fields
+        self.omitted_fields = omit or ()
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for param, names in (('fields', self.requested_fields or ()), ('omit', self.omitted_fields)):
+            unknown = sorted(set(names) - set(fields))
+            if unknown:
+                raise ValidationError({param: [f"Unknown field: {name}." for name in unknown]})
+        keep = set(fields) if self.requested_fields is None else {'id', *self.requested_fields}
+        keep.difference_update(self.omitted_fields)
+        return {name: field for name, field in fields.items() if name in keep}
+
+
+def read_columns(serializer):
+    """Names of the model fields ``serializer`` reads, or ``None`` if unknown."""
+    if isinstance(serializer, ListSerializer):
+        serializer = serializer.child
+    sources = getattr(serializer.Meta, 'field_sources', {})
+    concrete = {field.name for field in serializer.Meta.model._meta.concrete_fields}
+    columns = set()
+    for name, field in serializer.fields.items():
+        root = field.source.split('.')[0]
+        if name in sources:
+            columns.update(sources[name])
+        elif root in concrete:
+            columns.add(root)
+        else:
+            return None
+    return columns
+
+
+def _select_related_paths(tree, prefix=''):
+    for name, subtree in tree.items():
+        yield prefix + name
+        yield from _select_related_paths(subtree, f'{prefix}{name}__')
+
+
+def slim_queryset(queryset, serializer, required=()):
+    """Defer the columns and drop the joins ``serializer`` does not render.
+
+    ``required`` names columns the view itself reads, such as ``updated_at``
+    for validators.
+    """
+    columns = read_columns(serializer)
+    if columns is None:
+        return queryset
+    columns.update(required)
+    related = queryset.query.select_related
+    if isinstance(related, dict):
+        kept = [path for path in _select_related_paths(related) if path.split('__')[0] in columns]
+        queryset = queryset.select_related(None).select_related(*kept)
+    deferred = [
+        field.name for field in queryset.model._meta.concrete_fields
+        if not field.primary_key and field.name not in columns
+    ]
+    return queryset.defer(*deferred) if deferred else queryset
+
+
+class SparseFieldsetMixin:
+    """Generic view support for ``?fields=`` / ``?omit=`` on GET requests.
+
+    ``compact_list`` makes the serializer's ``Meta.compact_fields`` the
+    default fieldset; ``required_columns`` are never deferred.
+    """
+    compact_list = False
+    required_columns = ()
+
+    def get_sparse_options(self):
+        compact = self.get_serializer_class().Meta.compact_fields if self.compact_list else None
+        return sparse_options(self.request, compact)
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(*args, **{**self.get_sparse_options(), **kwargs})
+
+    def renders_field(self, name):
+        return name in self.get_serializer().fields
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in SAFE_METHODS:
+            queryset = slim_queryset(queryset, self.get_serializer(), self.required_columns)
+        return queryset
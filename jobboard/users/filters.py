@@ -1,11 +1,15 @@
 import django_filters
 from django.db.models import Q
 from .models import Job
+from .locations import filter_by_place, parse_point, parse_radius, within_radius
+from .salary import filter_by_salary
 
 class JobFilter(django_filters.FilterSet):
     keyword = django_filters.CharFilter(method='filter_by_keyword', label="Keyword")
     location = django_filters.CharFilter(method='filter_by_location', label="Location")
     salary = django_filters.CharFilter(method='filter_by_salary', label="Salary")
+    near = django_filters.CharFilter(method='filter_by_distance', label="Near (place or lat,lng)")
+    radius_km = django_filters.NumberFilter(method='filter_noop', label="Radius (km)")
 
     class Meta:
         model = Job
@@ -17,19 +21,22 @@ class JobFilter(django_filters.FilterSet):
         )
 
     def filter_by_location(self, queryset, name, value):
-        return queryset.filter(
-            Q(location_city__icontains=value) | Q(location_state__icontains=value)
-        )
+        return filter_by_place(queryset, value)
+
+    def filter_by_distance(self, queryset, name, value):
+        point = parse_point(value)
+        if point is None:
+            return queryset.none()
+        return within_radius(queryset, *point, parse_radius(self.data.get('radius_km')))
+
+    def filter_noop(self, queryset, name, value):
+        # radius_km is read by filter_by_distance
+        return queryset
 
     def filter_by_salary(self, queryset, name, value):
-        try:
-            if '-' in value:
-                min_salary, max_salary = value.split('-')
-                return queryset.filter(salary_min__gte=int(min_salary), salary_max__lte=int(max_salary))
-            elif value.endswith('+'):
-                min_salary = value[:-1]
-                return queryset.filter(salary_min__gte=int(min_salary))
-            else:
-                return queryset
-        except (ValueError, TypeError):
-            return queryset
+        return filter_by_salary(
+            queryset, value,
+            mode=self.data.get('salary_mode'),
+            currency=self.data.get('salary_currency'),
+            period=self.data.get('salary_period'),
+        )
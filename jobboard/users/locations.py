@@ -0,0 +1,182 @@
+import csv
+import math
+from pathlib import Path
+
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+from .models import Location
+from .search import normalize
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LATITUDE = 111.045
+
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 500
+
+# Places found by _lookup, per process. Misses are not kept: another worker
+# may load the gazetteer at any time, and a cached miss would outlive it.
+LOOKUP_CACHE_SIZE = 4096
+_found = {}
+
+
+def location_key(text):
+    return ' '.join(normalize(text))
+
+
+def load_gazetteer(path=GAZETTEER_PATH, location_model=Location, using=None):
+    """Insert the places in the gazetteer CSV that are not loaded yet.
+
+    ``location_model`` and ``using`` let data migrations pass their
+    historical model and database. Returns the number of rows in the file.
+    """
+    rows = []
+    with open(path, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            rows.append(location_model(
+                name=row['name'],
+                state=row['state'],
+                country=row['country'],
+                name_key=location_key(row['name']),
+                state_key=location_key(row['state']),
+                country_key=location_key(row['country']),
+                latitude=float(row['latitude']),
+                longitude=float(row['longitude']),
+            ))
+    location_model.objects.db_manager(using).bulk_create(rows, batch_size=500, ignore_conflicts=True)
+    _found.clear()
+    return len(rows)
+
+
+def _lookup(name_key, state_key, country_key):
+    key = (name_key, state_key, country_key)
+    if key in _found:
+        return _found[key]
+    queryset = Location.objects.filter(name_key=name_key)
+    if state_key:
+        queryset = queryset.filter(state_key=state_key)
+    if country_key:
+        queryset = queryset.filter(country_key=country_key)
+    resolved = queryset.values_list('id', 'latitude', 'longitude').first()
+    if resolved is not None:
+        if len(_found) >= LOOKUP_CACHE_SIZE:
+            _found.clear()
+        _found[key] = resolved
+    return resolved
+
+
+def resolve_location(city, state='', country=''):
+    """Return ``(location_id, latitude, longitude)`` for a place, or ``None``."""
+    name_key = location_key(city)
+    if not name_key:
+        return None
+    return _lookup(name_key, location_key(state), location_key(country))
+
+
+def assign_location(instance, city, state='', country=''):
+    """Point ``instance.location`` and its coordinates at the matching place."""
+    resolved = resolve_location(city, state, country)
+    if resolved is None:
+        instance.location_id = instance.latitude = instance.longitude = None
+    else:
+        instance.location_id, instance.latitude, instance.longitude = resolved
+
+
+def filter_by_place(queryset, value):
+    """Restrict jobs to a city or state name.
+
+    Jobs linked to the gazetteer match through an indexed
+    ``location_id IN (...)`` on the places the name is known as. Jobs whose
+    place is not in the gazetteer keep matching by substring on their free
+    text.
+    """
+    key = location_key(value)
+    location_ids = list(
+        Location.objects.filter(Q(name_key=key) | Q(state_key=key)).values_list('id', flat=True)
+    ) if key else []
+    unlinked = Q(location__isnull=True) & (Q(location_city__icontains=value) | Q(location_state__icontains=value))
+    if location_ids:
+        return queryset.filter(Q(location_id__in=location_ids) | unlinked)
+    return queryset.filter(unlinked)
+
+
+def parse_point(value):
+    """Turn ``"lat,lng"`` or a place name into ``(latitude, longitude)``."""
+    parts = [part.strip() for part in (value or '').split(',')]
+    if len(parts) == 2:
+        try:
+            latitude, longitude = float(parts[0]), float(parts[1])
+        except ValueError:
+            pass
+        else:
+            if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+                return latitude, longitude
+    resolved = resolve_location(*parts[:3])
+    if resolved is None:
+        return None
+    return resolved[1], resolved[2]
+
+
+def parse_radius(value):
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RADIUS_KM
+    return max(0.0, min(radius, MAX_RADIUS_KM))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Return ``(min_lat, max_lat, min_lng, max_lng)`` enclosing the circle."""
+    lat_delta = radius_km / KM_PER_DEGREE_LATITUDE
+    cos_lat = math.cos(math.radians(latitude))
+    if cos_lat < 1e-6 or radius_km / (KM_PER_DEGREE_LATITUDE * cos_lat) >= 180:
+        lng_delta = 180.0
+    else:
+        lng_delta = radius_km / (KM_PER_DEGREE_LATITUDE * cos_lat)
+    return (
+        max(-90.0, latitude - lat_delta),
+        min(90.0, latitude + lat_delta),
+        longitude - lng_delta,
+        longitude + lng_delta,
+    )
+
+
+def haversine_km(latitude, longitude):
+    """Great-circle distance in km from a point to the row's coordinates."""
+    d_lat = Radians(F('latitude') - Value(latitude))
+    d_lng = Radians(F('longitude') - Value(longitude))
+    a = (
+        Power(Sin(d_lat / 2), 2)
+        + Value(math.cos(math.radians(latitude))) * Cos(Radians(F('latitude'))) * Power(Sin(d_lng / 2), 2)
+    )
+    return ExpressionWrapper(
+        Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a)),
+        output_field=FloatField(),
+    )
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """Rows within ``radius_km`` of a point, annotated with ``distance_km``.
+
+    A bounding box on the indexed ``(latitude, longitude)`` columns narrows
+    the candidates first; the exact haversine distance is then evaluated
+    set-wise in the database over those candidates only.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    queryset = queryset.filter(latitude__gte=min_lat, latitude__lte=max_lat)
+    if max_lng - min_lng >= 360:
+        pass  # Near a pole every longitude is in range.
+    elif min_lng < -180 or max_lng > 180:
+        # The box straddles the antimeridian: split the longitude range.
+        queryset = queryset.filter(
+            Q(longitude__gte=(min_lng + 540) % 360 - 180) | Q(longitude__lte=(max_lng + 540) % 360 - 180)
+        )
+    else:
+        queryset = queryset.filter(longitude__gte=min_lng, longitude__lte=max_lng)
+    return (
+        queryset
+        .annotate(distance_km=haversine_km(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+    )
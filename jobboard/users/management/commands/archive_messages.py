@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.chat_archive import archivable_conversations, archive_conversation, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Move read chat messages older than CHAT_ARCHIVE_DAYS out of the message "
+        "table into compressed archive blocks, one block of --block-size messages "
+        "per transaction. Message lists keep serving them through ?before_seq=."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--block-size', type=int, default=settings.CHAT_ARCHIVE_BLOCK_SIZE,
+            help="Messages per archive block.",
+        )
+        parser.add_argument('--sleep', type=float, default=0.1, help="Seconds to pause between blocks.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many conversations qualify.")
+
+    def handle(self, *args, **options):
+        if options['block_size'] < 1:
+            raise CommandError("--block-size must be positive.")
+        cutoff = archive_cutoff()
+        keys = list(archivable_conversations(cutoff))
+        if options['dry_run']:
+            self.stdout.write(f"{len(keys)} conversations have read messages older than {settings.CHAT_ARCHIVE_DAYS} days")
+            return
+
+        started = time.perf_counter()
+        blocks = messages = 0
+        for key in keys:
+            for size in archive_conversation(key, cutoff, options['block_size'], options['sleep']):
+                blocks += 1
+                messages += size
+        self.stdout.write(
+            f"{messages} messages archived in {blocks} blocks from {len(keys)} conversations "
+            f"{time.perf_counter() - started:.1f}s"
+        )
@@ -0,0 +1,239 @@
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.urls import URLPattern, reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users import urls as api_urls
+from users.models import Job, JobApplication, Message, User
+
+# GET requests benchmarked per URL name: (label suffix, role, kwargs, query).
+# Kwargs values name entries of the sample context built after seeding. URL
+# names without a case are reported as skipped, so new endpoints show up.
+CASES = {
+    'user-search': [('', 'seeker', {}, 'search=ara')],
+    'api_profile': [('', 'seeker', {}, '')],
+    'api_employer_only': [('', 'employer', {}, '')],
+    'api_jobseeker_only': [('', 'seeker', {}, '')],
+    'api_admin_only': [('', 'admin', {}, '')],
+    'api_jobseeker_profile': [('', 'seeker', {}, '')],
+    'api_jobs_list_create': [
+        ('', None, {}, ''),
+        ('filtered', None, {}, 'job_type=Remote&salary=600000-1200000'),
+        ('facets', None, {}, 'job_type=Full-Time&facets=job_type,location,salary,posted'),
+    ],
+    'api_job_rud': [('', 'seeker', {'pk': 'job'}, '')],
+    'api_job_salary_histogram': [('', None, {}, '')],
+    'api_employer_jobs_list': [('', 'employer', {}, '')],
+    'api_company_profile': [('', 'employer', {}, '')],
+    'api_applications_list_create': [('', 'seeker', {}, ''), ('employer', 'employer', {}, '')],
+    'api_applications_rud': [('', 'seeker', {'pk': 'application'}, '')],
+    'api_job_applications_list': [('', 'employer', {'job_id': 'job'}, '')],
+    'api_job_search': [
+        ('', 'seeker', {}, 'keyword=python'),
+        ('near', 'seeker', {}, 'near=Pune&radius_km=200&sort_by=distance'),
+    ],
+    'api_conversations_list': [('', 'seeker', {}, '')],
+    'api_messages_list': [('', 'seeker', {'user_id': 'counterpart'}, '')],
+    'api_messages_unread_count': [('', 'seeker', {}, '')],
+    'api_notifications_list': [('', 'seeker', {}, '')],
+    'api_notifications_unread_count': [('', 'seeker', {}, '')],
+    'api_employer_dashboard': [('', 'employer', {}, '')],
+    'api_jobseeker_dashboard': [('', 'seeker', {}, '')],
+    'api_admin_dashboard': [('', 'admin', {}, '')],
+    'api_metrics': [('', 'admin', {}, '')],
+}
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every GET endpoint in users/urls.py against synthetic datasets "
+        "generated by seed_scale, and record the results as JSON. Each scale is "
+        "seeded into a throwaway test database; use --settings=jobboard.test_settings "
+        "to benchmark on SQLite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', type=int, action='append',
+            help="Number of users to seed (other tables scale with it). Repeatable; default 1000.",
+        )
+        parser.add_argument('--repeat', type=int, default=10, help="Timed requests per endpoint.")
+        parser.add_argument('--endpoint', action='append', help="Only benchmark these URL names.")
+        parser.add_argument(
+            '--output', default='bench_results/api-{timestamp}.json',
+            help="Where to write the JSON results; {timestamp} is filled in.",
+        )
+        parser.add_argument('--compare', help="Earlier results file to compare p50 latencies against.")
+
+    def handle(self, *args, **options):
+        names = [
+            pattern.name for pattern in api_urls.urlpatterns
+            if isinstance(pattern, URLPattern) and pattern.name
+        ]
+        names = list(dict.fromkeys(names))
+        if options['endpoint']:
+            unknown = set(options['endpoint']) - set(names)
+            if unknown:
+                raise CommandError(f"Unknown URL names: {', '.join(sorted(unknown))}")
+            names = [name for name in names if name in options['endpoint']]
+
+        started_at = datetime.now(timezone.utc)
+        report = {
+            'generated_at': started_at.isoformat(),
+            'git_revision': git_revision(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'skipped': [name for name in names if name not in CASES],
+            'scales': [],
+        }
+        for users in options['scale'] or [1000]:
+            report['scales'].append(self.run_scale(users, names, options))
+
+        output = Path(options['output'].format(timestamp=started_at.strftime('%Y%m%d-%H%M%S')))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(f"Skipped (no GET case): {', '.join(report['skipped']) or '-'}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output}"))
+        if options['compare']:
+            self.compare(report, json.loads(Path(options['compare']).read_text()))
+
+    def run_scale(self, users, names, options):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            # Replica reads would hit an empty test replica; keep them on
+            # default. Throttling and load shedding would skew the timings.
+            with override_settings(
+                DEBUG=False, ALLOWED_HOSTS=['*'], DATABASE_REPLICA_READS=False,
+                REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}},
+                EXPENSIVE_REQUEST_CONCURRENCY=None,
+            ):
+                cache.clear()
+                self.stdout.write(f"Seeding {users} users...")
+                call_command('seed_scale', users=users, stdout=self.stdout)
+                rows = {
+                    model.__name__: model.objects.count()
+                    for model in (User, Job, JobApplication, Message)
+                }
+                context = self.sample_context()
+                results = []
+                self.stdout.write(f"{'endpoint':<44}{'status':>7}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'bytes':>11}")
+                for name in names:
+                    for label, role, kwargs, query in CASES.get(name, []):
+                        result = self.run_case(name, label, role, kwargs, query, context, options['repeat'])
+                        results.append(result)
+                        self.stdout.write(
+                            f"{result['endpoint']:<44}{result['status']:>7}{result['p50_ms']:>10.2f}"
+                            f"{result['p95_ms']:>10.2f}{result['queries']:>9}{result['bytes']:>11}"
+                        )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+        return {'users': users, 'rows': rows, 'endpoints': results}
+
+    def sample_context(self):
+        """Pick representative rows: the busiest employer, job and applicant."""
+        employer_id = (
+            Job.objects.values('employer').annotate(jobs=Count('id')).order_by('-jobs')
+            .values_list('employer', flat=True).first()
+        )
+        job = (
+            Job.objects.filter(employer_id=employer_id).annotate(applicants=Count('applications'))
+            .order_by('-applicants').first()
+        )
+        application = JobApplication.objects.filter(job=job).first()
+        seeker = application.user if application else User.objects.filter(role='job_seeker').first()
+        message = Message.objects.filter(recipient=seeker).first()
+        admin = User.objects.create_user('bench_admin', 'bench_admin@example.com', 'x', role='admin')
+        return {
+            'users': {
+                'employer': User.objects.get(pk=employer_id),
+                'seeker': seeker,
+                'admin': admin,
+            },
+            'job': job.pk,
+            'application': application.pk if application else 0,
+            'counterpart': message.sender_id if message else employer_id,
+        }
+
+    def run_case(self, name, label, role, kwargs, query, context, repeat):
+        client = Client()
+        headers = {}
+        if role:
+            token = RefreshToken.for_user(context['users'][role]).access_token
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        url = reverse(name, kwargs={key: context[value] for key, value in kwargs.items()})
+        if query:
+            url = f'{url}?{query}'
+
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        response = client.get(url, **headers)  # warm up
+        timings = []
+        for _ in range(repeat):
+            queries.clear()
+            with connection.execute_wrapper(count_queries):
+                started = time.perf_counter()
+                response = client.get(url, **headers)
+                timings.append(time.perf_counter() - started)
+        timings.sort()
+        return {
+            'endpoint': f'{name}[{label}]' if label else name,
+            'url': url,
+            'role': role,
+            'status': response.status_code,
+            'p50_ms': statistics.median(timings) * 1000,
+            'p95_ms': percentile(timings, 0.95) * 1000,
+            'mean_ms': statistics.fmean(timings) * 1000,
+            'queries': len(queries),
+            'bytes': len(response.content) if not response.streaming else None,
+        }
+
+    def compare(self, report, previous):
+        previous_results = {
+            (scale['users'], row['endpoint']): row
+            for scale in previous.get('scales', []) for row in scale['endpoints']
+        }
+        self.stdout.write(f"\nCompared with {previous.get('git_revision') or 'previous run'}:")
+        for scale in report['scales']:
+            for row in scale['endpoints']:
+                before = previous_results.get((scale['users'], row['endpoint']))
+                if before is None:
+                    continue
+                change = (row['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+                line = (
+                    f"{scale['users']:>9} {row['endpoint']:<44}{before['p50_ms']:>10.2f} -> "
+                    f"{row['p50_ms']:>8.2f} ms ({change:+.0f}%)  queries {before['queries']} -> {row['queries']}"
+                )
+                regressed = change > 20 or row['queries'] > before['queries']
+                self.stdout.write(self.style.WARNING(line) if regressed else line)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import statistics
+import time
+
+from asgiref.testing import ApplicationCommunicator
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.urls import path
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users import async_views, views
+from users.models import Job, Message, Notification, User
+
+# Both generations of each endpoint, mounted side by side while the
+# benchmark runs (this module is used as ROOT_URLCONF).
+urlpatterns = [
+    path('sync/jobs/', views.JobListCreateAPIView.as_view()),
+    path('sync/jobs/<int:pk>/', views.JobRetrieveUpdateDestroyAPIView.as_view()),
+    path('sync/notifications/', views.NotificationListAPIView.as_view()),
+    path('sync/notifications/unread-count/', views.UnreadNotificationCountAPIView.as_view()),
+    path('sync/messages/unread-count/', views.UnreadMessageCountAPIView.as_view()),
+    path('async/jobs/', async_views.AsyncJobListView.as_view()),
+    path('async/jobs/<int:pk>/', async_views.AsyncJobDetailView.as_view()),
+    path('async/notifications/', async_views.AsyncNotificationListView.as_view()),
+    path('async/notifications/unread-count/', async_views.AsyncUnreadNotificationCountView.as_view()),
+    path('async/messages/unread-count/', async_views.AsyncUnreadMessageCountView.as_view()),
+]
+
+ENDPOINTS = {
+    'jobs': 'jobs/',
+    'job_detail': 'jobs/{job_id}/',
+    'notifications': 'notifications/',
+    'notification_unread_count': 'notifications/unread-count/',
+    'message_unread_count': 'messages/unread-count/',
+}
+
+
+async def asgi_get(application, url, headers, timeout=60):
+    """Issue one GET against an ASGI app in-process; returns (status, body)."""
+    path, _, query_string = url.partition('?')
+    communicator = ApplicationCommunicator(application, {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'headers': headers,
+        'server': ('localhost', 80),
+    })
+    await communicator.send_input({'type': 'http.request', 'body': b'', 'more_body': False})
+    start = await communicator.receive_output(timeout)
+    body = b''
+    while True:
+        message = await communicator.receive_output(timeout)
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    await communicator.wait(timeout)
+    return start['status'], body
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure ASGI throughput of the synchronous DRF read endpoints against "
+        "their native async versions. Runs against a throwaway test database; "
+        "use --settings=jobboard.test_settings to benchmark on SQLite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help="Requests per endpoint and variant.")
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--jobs', type=int, default=50, help="Jobs to seed.")
+        parser.add_argument('--notifications', type=int, default=50, help="Notifications to seed.")
+        parser.add_argument('--endpoint', action='append', choices=sorted(ENDPOINTS), help="Limit to these endpoints.")
+        parser.add_argument('--json', dest='json_path', help="Also write the results to this file.")
+
+    def handle(self, *args, **options):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(ROOT_URLCONF=__name__, DEBUG=False, ALLOWED_HOSTS=['*']):
+                context = self.seed(options)
+                results = asyncio.run(self.run_all(context, options))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        self.stdout.write(f"{'endpoint':<28}{'variant':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for row in results:
+            self.stdout.write(
+                f"{row['endpoint']:<28}{row['variant']:<8}{row['requests_per_second']:>10.1f}"
+                f"{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+            )
+        if options['json_path']:
+            with open(options['json_path'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+
+    def seed(self, options):
+        employer = User.objects.create_user('bench_employer', 'bench_employer@example.com', 'x', role='employer')
+        seeker = User.objects.create_user('bench_seeker', 'bench_seeker@example.com', 'x', role='job_seeker')
+        jobs = Job.objects.bulk_create([
+            Job(
+                employer=employer, title=f'Job {i}', description='Benchmark job ' * 20,
+                skills_required='python, django', location_city='Pune', location_state='Maharashtra',
+                job_type='Full-Time', salary_min=300000, salary_max=600000,
+            )
+            for i in range(options['jobs'])
+        ])
+        Notification.objects.bulk_create([
+            Notification(user=seeker, message=f'Notification {i}', is_read=i % 2 == 0)
+            for i in range(options['notifications'])
+        ])
+        Message.objects.bulk_create([
+            Message(sender=employer, recipient=seeker, content=f'Message {i}')
+            for i in range(20)
+        ])
+        token = RefreshToken.for_user(seeker).access_token
+        return {'job_id': jobs[0].pk, 'authorization': f'Bearer {token}'.encode()}
+
+    async def run_all(self, context, options):
+        application = ASGIHandler()
+        results = []
+        for name in options['endpoint'] or ENDPOINTS:
+            route = ENDPOINTS[name].format(**context)
+            for variant in ('sync', 'async'):
+                results.append(await self.run_one(application, name, variant, f'/{variant}/{route}', context, options))
+        return results
+
+    async def run_one(self, application, name, variant, url, context, options):
+        headers = [(b'authorization', context['authorization']), (b'host', b'localhost')]
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        latencies = []
+
+        async def request():
+            async with semaphore:
+                started = time.perf_counter()
+                response_status, body = await asgi_get(application, url, headers)
+                latencies.append(time.perf_counter() - started)
+                if response_status != 200:
+                    raise RuntimeError(f"{url} returned {response_status}: {body[:200]}")
+
+        await request()  # warm up
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return {
+            'endpoint': name,
+            'variant': variant,
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'requests_per_second': options['requests'] / elapsed,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        }
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+
+from .bench_api import git_revision, percentile
+
+try:
+    from channels.testing import WebsocketCommunicator
+except ImportError:  # pragma: no cover - channels.testing imports daphne
+    from asgiref.testing import ApplicationCommunicator
+
+    class WebsocketCommunicator(ApplicationCommunicator):
+        """The part of channels' WebsocketCommunicator this benchmark uses."""
+
+        def __init__(self, application, path):
+            route, _, query = path.partition('?')
+            super().__init__(application, {
+                'type': 'websocket', 'path': route, 'query_string': query.encode(),
+                'headers': [], 'subprotocols': [],
+            })
+
+        async def connect(self, timeout=1):
+            await self.send_input({'type': 'websocket.connect'})
+            response = await self.receive_output(timeout)
+            if response['type'] == 'websocket.close':
+                return False, response.get('code', 1000)
+            return True, response.get('subprotocol')
+
+        async def send_to(self, text_data):
+            await self.send_input({'type': 'websocket.receive', 'text': text_data})
+
+        async def receive_from(self, timeout=1):
+            return (await self.receive_output(timeout))['text']
+
+        async def disconnect(self, code=1000, timeout=1):
+            await self.send_input({'type': 'websocket.disconnect', 'code': code})
+            await self.wait(timeout)
+
+
+class Command(BaseCommand):
+    help = (
+        "Open --pairs concurrent authenticated chat conversations through the ASGI "
+        "application and the configured channel layer, send --messages messages one "
+        "after the other in each, and report end-to-end delivery latency and "
+        "throughput. Runs in a throwaway test database; "
+        "--settings=jobboard.test_settings (in-memory channel layer, SQLite) needs no "
+        "server at all."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pairs', type=int, default=50, help="Concurrent employer/job seeker conversations.")
+        parser.add_argument('--messages', type=int, default=20, help="Messages sent in each conversation.")
+        parser.add_argument('--timeout', type=float, default=10, help="Seconds to wait for any one delivery.")
+        parser.add_argument(
+            '--output', default='bench_results/chat-{timestamp}.json',
+            help="Where to write the JSON results; {timestamp} is filled in.",
+        )
+
+    def handle(self, *args, **options):
+        if options['pairs'] < 1 or options['messages'] < 1:
+            raise CommandError("--pairs and --messages must be positive.")
+        started_at = datetime.now(timezone.utc)
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            pairs = self.create_pairs(options['pairs'])
+            latencies, elapsed = async_to_sync(self.run)(pairs, options['messages'], options['timeout'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        latencies.sort()
+        report = {
+            'generated_at': started_at.isoformat(),
+            'git_revision': git_revision(),
+            'channel_layer': settings.CHANNEL_LAYERS['default']['BACKEND'],
+            'database': settings.DATABASES['default']['ENGINE'],
+            'pairs': options['pairs'],
+            'messages_per_pair': options['messages'],
+            'delivered': len(latencies),
+            'elapsed_s': elapsed,
+            'messages_per_s': len(latencies) / elapsed,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000,
+        }
+        self.stdout.write(
+            f"{report['channel_layer']}: {report['delivered']} messages over {report['pairs']} pairs "
+            f"in {elapsed:.2f}s, {report['messages_per_s']:.0f} msg/s, "
+            f"p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms"
+        )
+
+        output = Path(options['output'].format(timestamp=started_at.strftime('%Y%m%d-%H%M%S')))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output}"))
+
+    def create_pairs(self, count):
+        pairs = []
+        for i in range(count):
+            employer, seeker = (
+                User.objects.create_user(f'bench_{role}_{i}', f'bench_{role}_{i}@example.com', 'password', role=role)
+                for role in ('employer', 'job_seeker')
+            )
+            pairs.append((
+                (employer, str(RefreshToken.for_user(employer).access_token)),
+                (seeker, str(RefreshToken.for_user(seeker).access_token)),
+            ))
+        return pairs
+
+    async def run(self, pairs, messages, timeout):
+        from jobboard.asgi import application
+
+        async def open_socket(user, token, other):
+            socket = WebsocketCommunicator(application, f'/ws/chat/{other.pk}/?token={token}')
+            connected, _ = await socket.connect(timeout)
+            if not connected:
+                raise CommandError(f"Chat socket for {user.username} was refused.")
+            return socket
+
+        sockets = await asyncio.gather(*(
+            open_socket(user, token, other)
+            for (employer, employer_token), (seeker, seeker_token) in pairs
+            for user, token, other in ((employer, employer_token, seeker), (seeker, seeker_token, employer))
+        ))
+
+        async def converse(sender, recipient):
+            latencies = []
+            for i in range(messages):
+                sent = time.perf_counter()
+                await sender.send_to(json.dumps({'message': f'benchmark message {i}'}))
+                # Skip presence frames until the message arrives.
+                while json.loads(await recipient.receive_from(timeout))['type'] != 'chat_message':
+                    pass
+                latencies.append(time.perf_counter() - sent)
+            return latencies
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            converse(sockets[i], sockets[i + 1]) for i in range(0, len(sockets), 2)
+        ))
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*(socket.disconnect() for socket in sockets))
+        return [latency for latencies in results for latency in latencies], elapsed
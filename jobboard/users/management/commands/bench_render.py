@@ -0,0 +1,137 @@
+import gzip
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.test.utils import setup_databases, teardown_databases
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from users.middleware import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from users.models import Job, Message, User
+from users.renderers import FastJSONRenderer, orjson
+from users.serializers import JobSerializer, MessageSerializer
+from users.views import with_application_count
+
+from .bench_api import git_revision
+from .seed_scale import SKILLS, TITLES
+
+PARAGRAPH = (
+    "You will design, build and operate services used by thousands of candidates and "
+    "employers every day, review code, mentor junior engineers and work closely with "
+    "product and design on what we ship next. "
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare render time and response bytes of the job list and message history "
+        "payloads under DRF's JSONRenderer and FastJSONRenderer, uncompressed and with "
+        "gzip and brotli. Data is generated in a throwaway test database; use "
+        "--settings=jobboard.test_settings to run on SQLite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=500, help="Jobs in the list payload.")
+        parser.add_argument('--messages', type=int, default=1000, help="Messages in the conversation history.")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed renders per payload and renderer.")
+        parser.add_argument(
+            '--output', default='bench_results/render-{timestamp}.json',
+            help="Where to write the JSON results; {timestamp} is filled in.",
+        )
+
+    def handle(self, *args, **options):
+        started_at = datetime.now(timezone.utc)
+        report = {
+            'generated_at': started_at.isoformat(),
+            'git_revision': git_revision(),
+            'orjson': orjson.__version__ if orjson is not None else None,
+            'brotli': brotli.__version__ if brotli is not None else None,
+            'repeat': options['repeat'],
+            'payloads': [],
+        }
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            payloads = self.build_payloads(options['jobs'], options['messages'])
+            self.stdout.write(
+                f"{'payload':<18}{'renderer':<10}{'p50 ms':>9}{'bytes':>11}"
+                f"{'gzip':>10}{'gzip ms':>9}{'br':>10}{'br ms':>8}"
+            )
+            for name, data in payloads:
+                for result in self.run_payload(name, data, options['repeat']):
+                    report['payloads'].append(result)
+                    self.stdout.write(
+                        f"{name:<18}{result['renderer']:<10}{result['render_p50_ms']:>9.2f}{result['bytes']:>11}"
+                        f"{result['gzip_bytes']:>10}{result['gzip_ms']:>9.2f}"
+                        + (f"{result['br_bytes']:>10}{result['br_ms']:>8.2f}" if brotli else f"{'-':>10}{'-':>8}")
+                    )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        output = Path(options['output'].format(timestamp=started_at.strftime('%Y%m%d-%H%M%S')))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output}"))
+
+    def build_payloads(self, jobs, messages):
+        """Serialize the data the two endpoints return, as their views do."""
+        rng = random.Random(0)
+        employer = User.objects.create_user('bench_employer', 'bench_employer@example.com', 'x', role='employer')
+        seeker = User.objects.create_user('bench_seeker', 'bench_seeker@example.com', 'x', role='job_seeker')
+        Job.objects.bulk_create(
+            Job(
+                employer=employer, title=rng.choice(TITLES),
+                description=PARAGRAPH * rng.randint(3, 8),
+                skills_required=', '.join(rng.sample(SKILLS, 4)),
+                location_city='Pune', location_state='Maharashtra', job_type='Full-Time',
+                salary_min=600000, salary_max=1200000, salary_currency='INR', salary_period='year',
+            )
+            for _ in range(jobs)
+        )
+        Message.objects.bulk_create(
+            Message(
+                sender=pair[0], recipient=pair[1],
+                content=f'Following up on the {rng.choice(TITLES)} role, are you free on day {i % 28 + 1}?',
+            )
+            for i, pair in enumerate([(employer, seeker), (seeker, employer)] * (messages // 2))
+        )
+        request = Request(APIRequestFactory().get('/'))
+        job_list = JobSerializer(
+            with_application_count(Job.objects.all()), many=True, context={'request': request},
+        ).data
+        history = MessageSerializer(
+            Message.objects.filter(Q(sender=seeker) | Q(recipient=seeker))
+            .select_related('sender', 'recipient').order_by('timestamp'),
+            many=True, context={'request': request},
+        ).data
+        return [('job_list', job_list), ('message_history', history)]
+
+    def run_payload(self, name, data, repeat):
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            body = renderer.render(data)
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                renderer.render(data)
+                timings.append(time.perf_counter() - started)
+            result = {
+                'payload': name,
+                'renderer': 'orjson' if isinstance(renderer, FastJSONRenderer) and orjson else 'json',
+                'render_p50_ms': statistics.median(timings) * 1000,
+                'bytes': len(body),
+            }
+            result['gzip_bytes'], result['gzip_ms'] = self.time_compression(lambda: gzip.compress(body, GZIP_LEVEL))
+            if brotli is not None:
+                result['br_bytes'], result['br_ms'] = self.time_compression(lambda: brotli.compress(body, quality=BROTLI_QUALITY))
+            yield result
+
+    def time_compression(self, compress):
+        started = time.perf_counter()
+        size = len(compress())
+        return size, (time.perf_counter() - started) * 1000
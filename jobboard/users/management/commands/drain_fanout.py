@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.fanout import FANOUT_CHUNK_SIZE, drain_outbox
+from users.models import NotificationOutbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Run every pending notification fan-out in the outbox. The worker does this on "
+        "each wake-up; schedule this as well so a fan-out whose wake-up was lost still runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=FANOUT_CHUNK_SIZE, help="Notifications per INSERT.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many fan-outs are pending.")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        if options['dry_run']:
+            self.stdout.write(f"{NotificationOutbox.objects.count()} fan-outs pending")
+            return
+        self.stdout.write(f"{drain_outbox(options['chunk_size'])} notifications created")
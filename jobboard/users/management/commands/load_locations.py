@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.locations import GAZETTEER_PATH, assign_location, load_gazetteer
+from users.models import CompanyProfile, Job, User
+
+
+class Command(BaseCommand):
+    help = "Load the offline gazetteer into Location and re-link jobs, companies and users."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=str(GAZETTEER_PATH), help="Gazetteer CSV to load.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--skip-relink', action='store_true', help="Only load places, do not re-link rows.")
+
+    def handle(self, *args, **options):
+        count = load_gazetteer(options['file'])
+        self.stdout.write(f"Loaded {count} places from {options['file']}.")
+        if options['skip_relink']:
+            return
+
+        batch_size = options['batch_size']
+        relinked = self.relink(Job, ('location_city', 'location_state'), batch_size)
+        relinked += self.relink(CompanyProfile, ('location_city', 'location_state'), batch_size)
+        relinked += self.relink(User, ('city', 'state', 'country'), batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Re-linked {relinked} rows."))
+
+    def relink(self, model, fields, batch_size):
+        changed = ['location', 'latitude', 'longitude']
+        if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+            changed.append('updated_at')
+        queryset = model.objects.only('id', *fields).order_by('id')
+        last_id = 0
+        total = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                return total
+            now = timezone.now()
+            for obj in batch:
+                assign_location(obj, *(getattr(obj, field) for field in fields))
+                if 'updated_at' in changed:
+                    # bulk_update skips auto_now; ETags must still change.
+                    obj.updated_at = now
+            model.objects.bulk_update(batch, changed)
+            total += len(batch)
+            last_id = batch[-1].id
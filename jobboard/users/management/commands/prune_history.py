@@ -0,0 +1,56 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from users.retention import POLICIES, open_archive, prune
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete notifications and activity rows past their retention period "
+        "(RETENTION_* settings), in small primary-key-range batches. Activity is "
+        "rolled up into monthly counts first unless --no-rollup is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policy', action='append', choices=[policy.name for policy in POLICIES],
+            help="Only apply these policies. Repeatable; default all.",
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows deleted per transaction.")
+        parser.add_argument('--sleep', type=float, default=0.1, help="Seconds to pause between batches.")
+        parser.add_argument('--archive-dir', help="Write deleted rows to gzipped JSON lines files here first.")
+        parser.add_argument('--no-rollup', action='store_true', help="Delete activity without rolling it up.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many rows would go.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive.")
+        now = timezone.now()
+        for policy in POLICIES:
+            if options['policy'] and policy.name not in options['policy']:
+                continue
+            queryset = policy.expired(now)
+            if queryset is None:
+                self.stdout.write(f"{policy.name:<22}{'kept (no ' + policy.setting + ')':>40}")
+                continue
+            if options['dry_run']:
+                self.stdout.write(f"{policy.name:<22}{queryset.count():>12} rows older than {policy.days} days")
+                continue
+
+            started = time.perf_counter()
+            archive = open_archive(Path(options['archive_dir']), policy, now) if options['archive_dir'] else None
+            try:
+                batches = list(prune(
+                    policy, queryset, options['batch_size'], options['sleep'], archive,
+                    rollup=not options['no_rollup'],
+                ))
+            finally:
+                if archive is not None:
+                    archive.close()
+            self.stdout.write(
+                f"{policy.name:<22}{sum(batches):>12} rows deleted in {len(batches)} batches "
+                f"{time.perf_counter() - started:>8.1f}s"
+            )
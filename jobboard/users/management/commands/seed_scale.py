@@ -0,0 +1,271 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from users.facets import bump_jobs_generation
+from users.locations import assign_location
+from users.models import (
+    CompanyProfile,
+    Job,
+    JobApplication,
+    Location,
+    Message,
+    Notification,
+    User,
+)
+from users.salary import normalize_job_salary
+from users.search import index_users
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Ananya', 'Arjun', 'Divya', 'Ishaan', 'Kavya', 'Meera', 'Neha', 'Nikhil',
+    'Priya', 'Rahul', 'Riya', 'Rohan', 'Sanjay', 'Sneha', 'Tanvi', 'Varun', 'Vikram', 'Zoya',
+]
+LAST_NAMES = [
+    'Agarwal', 'Bose', 'Chopra', 'Das', 'Gupta', 'Iyer', 'Joshi', 'Kapoor', 'Khan', 'Kumar',
+    'Mehta', 'Menon', 'Nair', 'Patel', 'Rao', 'Reddy', 'Shah', 'Sharma', 'Singh', 'Verma',
+]
+COMPANY_WORDS = ['Tech', 'Soft', 'Data', 'Cloud', 'Logic', 'Works', 'Labs', 'Systems', 'Digital', 'Nexus']
+INDUSTRIES = ['Software', 'Finance', 'Healthcare', 'Education', 'Retail', 'Manufacturing', 'Consulting']
+COMPANY_SIZES = ['1-10', '11-50', '51-200', '201-500', '500+']
+TITLES = [
+    'Backend Developer', 'Frontend Developer', 'Full Stack Engineer', 'Data Analyst', 'Data Scientist',
+    'DevOps Engineer', 'QA Engineer', 'Product Manager', 'UI/UX Designer', 'Mobile Developer',
+    'Machine Learning Engineer', 'Business Analyst', 'Technical Writer', 'Support Engineer',
+]
+SENIORITY = ['Junior', '', 'Senior', 'Lead']
+SKILLS = [
+    'python', 'django', 'react', 'javascript', 'sql', 'aws', 'docker', 'kubernetes', 'java',
+    'spring', 'figma', 'excel', 'tableau', 'go', 'typescript', 'node', 'pandas', 'git',
+]
+# Salary ranges per posting currency/period: (currency, period, low, high).
+SALARY_PROFILES = [
+    ('INR', 'year', 300000, 3000000),
+    ('INR', 'year', 300000, 3000000),
+    ('INR', 'month', 25000, 250000),
+    ('USD', 'year', 40000, 200000),
+    ('USD', 'hour', 15, 120),
+]
+APPLICATION_STATUSES = [choice for choice, _ in JobApplication.STATUS_CHOICES]
+JOB_TYPES = [choice for choice, _ in Job.JOB_TYPE_CHOICES]
+DEFAULT_PASSWORD = 'password'
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset of users, company profiles, jobs, applications, "
+        "messages and notifications for load and scale testing. Row counts not given "
+        "explicitly are derived from --users."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--employer-ratio', type=float, default=0.1, help="Share of users that are employers.")
+        parser.add_argument('--jobs', type=int, help="Default: users / 2.")
+        parser.add_argument('--applications', type=int, help="Default: users * 3.")
+        parser.add_argument('--messages', type=int, help="Default: users * 5.")
+        parser.add_argument('--notifications', type=int, help="Default: users * 5.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for reproducible datasets.")
+        parser.add_argument('--prefix', default='seed', help="Username/email prefix of generated users.")
+        parser.add_argument(
+            '--password', default=DEFAULT_PASSWORD,
+            help="Password of every generated user; it is hashed once and shared.",
+        )
+
+    def handle(self, *args, **options):
+        users = options['users']
+        if users < 2:
+            raise CommandError("--users must be at least 2.")
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{self.prefix}_').exists():
+            raise CommandError(f"Users prefixed {self.prefix!r} already exist; pass another --prefix.")
+
+        employers = max(1, int(users * options['employer_ratio']))
+        counts = {
+            'jobs': options['jobs'] if options['jobs'] is not None else users // 2,
+            'applications': options['applications'] if options['applications'] is not None else users * 3,
+            'messages': options['messages'] if options['messages'] is not None else users * 5,
+            'notifications': options['notifications'] if options['notifications'] is not None else users * 5,
+        }
+        self.places = list(Location.objects.values_list('name', 'state', 'country')) or [('Pune', 'Maharashtra', 'India')]
+
+        started = time.perf_counter()
+        self.step('users', lambda: self.create_users(users, employers, options['password']))
+        employer_ids, seeker_ids = self.user_ids()
+        self.step('search index', lambda: self.index_search())
+        self.step('company profiles', lambda: self.create_company_profiles(employer_ids))
+        last_job = Job.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        self.step('jobs', lambda: self.create_jobs(counts['jobs'], employer_ids))
+        job_ids = list(Job.objects.filter(id__gt=last_job).values_list('id', flat=True))
+        self.step('applications', lambda: self.create_applications(counts['applications'], job_ids, seeker_ids))
+        self.step('messages', lambda: self.create_messages(counts['messages'], employer_ids, seeker_ids))
+        self.step('notifications', lambda: self.create_notifications(counts['notifications'], employer_ids + seeker_ids))
+        bump_jobs_generation()
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.perf_counter() - started:.1f}s."))
+
+    def step(self, label, create):
+        started = time.perf_counter()
+        created = create()
+        self.stdout.write(f"{label:<18}{created:>12} rows {time.perf_counter() - started:>8.1f}s")
+
+    def insert(self, model, objects):
+        total = 0
+        for batch in batched(objects, self.batch_size):
+            model.objects.bulk_create(batch)
+            total += len(batch)
+        return total
+
+    def place(self):
+        return self.random.choice(self.places)
+
+    def create_users(self, count, employers, password):
+        # Hashing once keeps generation I/O bound; every user shares it.
+        password_hash = make_password(password)
+
+        def users():
+            for i in range(count):
+                role = 'employer' if i < employers else 'job_seeker'
+                first, last = self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+                city, state, country = self.place()
+                user = User(
+                    username=f'{self.prefix}_{i}', email=f'{self.prefix}_{i}@example.com',
+                    password=password_hash, role=role, full_name=f'{first} {last}',
+                    first_name=first, last_name=last,
+                    gender=self.random.choice(('male', 'female', 'other')),
+                    phone=f'9{self.random.randrange(10 ** 9):09d}',
+                    city=city, state=state, country=country,
+                    is_employer=role == 'employer', is_jobseeker=role == 'job_seeker',
+                )
+                # bulk_create skips the pre_save receivers that link places.
+                assign_location(user, city, state, country)
+                yield user
+
+        return self.insert(User, users())
+
+    def user_ids(self):
+        employer_ids, seeker_ids = [], []
+        rows = User.objects.filter(username__startswith=f'{self.prefix}_').values_list('id', 'role')
+        for user_id, role in rows.iterator(chunk_size=self.batch_size):
+            (employer_ids if role == 'employer' else seeker_ids).append(user_id)
+        return employer_ids, seeker_ids
+
+    def index_search(self):
+        users = User.objects.filter(username__startswith=f'{self.prefix}_').only('id', 'username', 'full_name')
+        total = 0
+        for batch in batched(users.iterator(chunk_size=self.batch_size), self.batch_size):
+            index_users(batch, batch_size=self.batch_size)
+            total += len(batch)
+        return total
+
+    def create_company_profiles(self, employer_ids):
+        def profiles():
+            for employer_id in employer_ids:
+                name = f'{self.random.choice(COMPANY_WORDS)}{self.random.choice(COMPANY_WORDS)} {employer_id}'
+                city, state, country = self.place()
+                profile = CompanyProfile(
+                    employer_id=employer_id, company_name=name,
+                    website=f'https://company{employer_id}.example.com',
+                    description=f'{name} builds products for the {self.random.choice(INDUSTRIES).lower()} sector.',
+                    location_city=city, location_state=state,
+                    industry=self.random.choice(INDUSTRIES), company_size=self.random.choice(COMPANY_SIZES),
+                    contact_email=f'hr{employer_id}@example.com',
+                )
+                assign_location(profile, city, state)
+                yield profile
+
+        return self.insert(CompanyProfile, profiles())
+
+    def create_jobs(self, count, employer_ids):
+        def jobs():
+            for _ in range(count):
+                title = ' '.join(filter(None, (self.random.choice(SENIORITY), self.random.choice(TITLES))))
+                skills = self.random.sample(SKILLS, self.random.randint(2, 5))
+                city, state, _country = self.place()
+                job = Job(
+                    employer_id=self.random.choice(employer_ids), title=title,
+                    description=f'We are hiring a {title} with experience in {", ".join(skills)}.',
+                    skills_required=', '.join(skills), location_city=city, location_state=state,
+                    job_type=self.random.choice(JOB_TYPES),
+                    status='active' if self.random.random() < 0.9 else 'inactive',
+                    views=self.random.randrange(500),
+                )
+                if self.random.random() < 0.8:
+                    currency, period, low, high = self.random.choice(SALARY_PROFILES)
+                    job.salary_min = self.random.randint(low, high)
+                    job.salary_max = job.salary_min + self.random.randint(0, high - low)
+                    job.salary_currency, job.salary_period = currency, period
+                assign_location(job, city, state)
+                normalize_job_salary(job)
+                yield job
+
+        return self.insert(Job, jobs())
+
+    def create_applications(self, count, job_ids, seeker_ids):
+        if not job_ids or not seeker_ids:
+            return 0
+
+        # One application per (job, applicant), as the unique constraint demands.
+        count = min(count, len(job_ids) * len(seeker_ids))
+
+        def applications():
+            seen = set()
+            while len(seen) < count:
+                pair = (self.random.choice(job_ids), self.random.choice(seeker_ids))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                yield JobApplication(
+                    job_id=pair[0], user_id=pair[1],
+                    cover_letter='I would like to apply for this role.',
+                    education_level=self.random.choice(('Bachelors', 'Masters', 'PhD')),
+                    gpa=round(self.random.uniform(6, 10), 2),
+                    status=self.random.choice(APPLICATION_STATUSES),
+                )
+
+        return self.insert(JobApplication, applications())
+
+    def create_messages(self, count, employer_ids, seeker_ids):
+        if not employer_ids or not seeker_ids:
+            return 0
+
+        def messages():
+            for _ in range(count):
+                pair = [self.random.choice(employer_ids), self.random.choice(seeker_ids)]
+                self.random.shuffle(pair)
+                yield Message(
+                    sender_id=pair[0], recipient_id=pair[1],
+                    content=f'Message about role {self.random.randrange(10000)}',
+                    is_read=self.random.random() < 0.7,
+                )
+
+        return self.insert(Message, messages())
+
+    def create_notifications(self, count, user_ids):
+        def notifications():
+            for _ in range(count):
+                yield Notification(
+                    user_id=self.random.choice(user_ids),
+                    message=self.random.choice((
+                        'Your application status changed.', 'New job matching your skills.',
+                        'You have a new message.', 'A candidate applied to your job.',
+                    )),
+                    link='/notifications',
+                    is_read=self.random.random() < 0.6,
+                )
+
+        return self.insert(Notification, notifications())
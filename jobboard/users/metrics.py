@@ -0,0 +1,230 @@
+"""
+In-process request metrics, exposed in the Prometheus text format.
+
+Each worker process keeps its own histograms; Prometheus scrapes every
+worker and sums them. Database queries are counted by an execute wrapper
+installed on each connection as it is opened, which charges them to the
+request that is currently being served.
+"""
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            snapshot = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket', labels + (('le', format_value(bound)),), cumulative
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, count
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            snapshot = dict(self._series)
+        for labels, value in sorted(snapshot.items()):
+            yield f'{self.name}_total', labels, value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_pairs(metric, labels):
+    # Histogram buckets append ('le', bound) after the plain label values.
+    pairs = list(zip(metric.labelnames, labels[:len(metric.labelnames)]))
+    pairs.extend(labels[len(metric.labelnames):])
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+REQUEST_DURATION = Histogram(
+    'jobboard_http_request_duration_seconds', "Wall time spent serving a request.",
+    ('view', 'method'), DURATION_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    'jobboard_http_request_db_queries', "Database queries run while serving a request.",
+    ('view', 'method'), QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    'jobboard_http_request_db_duration_seconds', "Time spent in the database while serving a request.",
+    ('view', 'method'), DURATION_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'jobboard_http_response_size_bytes', "Size of the response body as sent, after compression.",
+    ('view', 'method'), RESPONSE_SIZE_BUCKETS,
+)
+RESPONSES = Counter(
+    'jobboard_http_responses', "Responses sent, by status code.",
+    ('view', 'method', 'status'),
+)
+REGISTRY = [REQUEST_DURATION, REQUEST_DB_QUERIES, REQUEST_DB_DURATION, RESPONSE_SIZE, RESPONSES]
+
+
+def render_prometheus():
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{{{_label_pairs(metric, labels)}}} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    for metric in REGISTRY:
+        metric.clear()
+
+
+class RequestStats:
+    """Database work charged to one request.
+
+    Mutated in place, like ``db_router.RoutingState``, so queries run in a
+    ``sync_to_async`` thread are counted against the request that awaited them.
+    """
+
+    def __init__(self, record_sql):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.record_sql = record_sql
+        self.statements = []
+
+
+_stats = ContextVar('request_metrics', default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    stats = _stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+        if stats.record_sql:
+            stats.statements.append(sql)
+
+
+def install_query_counter(sender=None, connection=None, **kwargs):
+    """``connection_created`` receiver adding ``count_queries`` to the connection."""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+def query_budget():
+    """Query count above which a request's statements are logged, or ``None``."""
+    return getattr(settings, 'METRICS_QUERY_BUDGET', None)
+
+
+def begin_request():
+    return _stats.set(RequestStats(record_sql=query_budget() is not None))
+
+
+def end_request(token, request, response, duration):
+    stats = _stats.get()
+    _stats.reset(token)
+    match = getattr(request, 'resolver_match', None)
+    view = (match.view_name if match else None) or UNRESOLVED_VIEW
+    labels = (view, request.method)
+    REQUEST_DURATION.observe(labels, duration)
+    REQUEST_DB_QUERIES.observe(labels, stats.queries)
+    REQUEST_DB_DURATION.observe(labels, stats.db_seconds)
+    if not response.streaming:
+        RESPONSE_SIZE.observe(labels, len(response.content))
+    RESPONSES.inc(labels + (str(response.status_code),))
+
+    budget = query_budget()
+    if budget is not None and stats.queries > budget:
+        log_query_fingerprints(view, request, stats, budget)
+
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+
+
+def fingerprint(sql):
+    """Collapse literals, placeholders and IN lists so repeated statements group together."""
+    sql = _LITERAL_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(...)', sql)
+    return ' '.join(sql.split())
+
+
+def log_query_fingerprints(view, request, stats, budget):
+    counts = {}
+    for sql in stats.statements:
+        key = fingerprint(sql)
+        counts[key] = counts.get(key, 0) + 1
+    top = sorted(counts.items(), key=lambda item: -item[1])
+    logger.warning(
+        "%s %s (%s) ran %d queries, over the budget of %d:\n%s",
+        request.method, request.path, view, stats.queries, budget,
+        '\n'.join(f'{count:>5} x {sql}' for sql, count in top),
+    )
@@ -1,8 +1,29 @@
+import gzip
+import hashlib
+import re
+import time
+
 import jwt
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
+from django.utils.cache import patch_vary_headers
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
+from rest_framework.permissions import SAFE_METHODS
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+from . import metrics
+from .db_router import begin_request, end_request, replica_configured
+
+# Mid-range levels: most of the size win for a fraction of the CPU of the maximum.
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 6
 
 User = get_user_model()
 
@@ -39,3 +60,204 @@ class TokenAuthMiddleware(BaseMiddleware):
             scope['user'] = AnonymousUser()
         
         return await super().__call__(scope, receive, send)
+
+
+class ReplicaRoutingMiddleware:
+    """Mark safe requests as replica readers and pin writers to the primary.
+
+    After a request writes, the client (identified by its Authorization
+    header or session cookie) keeps reading from the primary for
+    ``DATABASE_REPLICA_PIN_SECONDS`` so replication lag never hides its own
+    writes from it.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        pin_key = self.pin_key(request)
+        pinned = bool(pin_key and cache.get(pin_key))
+        token = begin_request(use_replica=request.method in SAFE_METHODS and not pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = end_request(token)
+        if wrote and pin_key:
+            cache.set(pin_key, True, self.pin_seconds)
+        return response
+
+    async def __acall__(self, request):
+        pin_key = self.pin_key(request)
+        pinned = bool(pin_key and await cache.aget(pin_key))
+        token = begin_request(use_replica=request.method in SAFE_METHODS and not pinned)
+        try:
+            response = await self.get_response(request)
+        finally:
+            wrote = end_request(token)
+        if wrote and pin_key:
+            await cache.aset(pin_key, True, self.pin_seconds)
+        return response
+
+    @property
+    def pin_seconds(self):
+        return getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 10)
+
+    def pin_key(self, request):
+        credential = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if not credential or not replica_configured():
+            return None
+        return 'db-pin:' + hashlib.sha256(credential.encode()).hexdigest()
+
+
+class RequestMetricsMiddleware:
+    """Record wall time, DB queries, response size and status per URL name.
+
+    Meant to be the outermost middleware so the timings cover the whole
+    stack. See ``users.metrics`` for the histograms and the query budget log.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = metrics.begin_request()
+        started = time.perf_counter()
+        response = self.get_response(request)
+        metrics.end_request(token, request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        token = metrics.begin_request()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        metrics.end_request(token, request, response, time.perf_counter() - started)
+        return response
+
+
+def parse_accept_encoding(header):
+    """``"gzip;q=0.5, br"`` -> ``{'gzip': 0.5, 'br': 1.0}``; malformed weights count as 0."""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        accepted[coding] = weight
+    return accepted
+
+
+ETAG_CODING_RE = re.compile(r'-(br|gzip)"')
+CONDITIONAL_HEADERS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MATCH')
+
+
+def etag_with_coding(etag, coding):
+    return f'{etag[:-1]}-{coding}"' if etag.endswith('"') else etag
+
+
+def strip_etag_codings(request):
+    """Drop the coding suffixes from the request's entity tags.
+
+    Returns the coding of the tags the client sent, if any, so that a 304
+    can repeat the validator of the representation the client holds.
+    """
+    coding = None
+    for header in CONDITIONAL_HEADERS:
+        value = request.META.get(header)
+        if value:
+            match = ETAG_CODING_RE.search(value)
+            if match:
+                coding = coding or match.group(1)
+                request.META[header] = ETAG_CODING_RE.sub('"', value)
+    return coding
+
+
+class CompressionMiddleware:
+    """Brotli or gzip response bodies, negotiated from ``Accept-Encoding``.
+
+    Bodies shorter than ``RESPONSE_COMPRESSION_MIN_SIZE`` bytes are sent as
+    they are: below a kilobyte or so the encoding overhead eats the gain.
+    Brotli is offered only when the ``brotli`` package is installed and wins
+    ties, since it compresses JSON noticeably better at a similar cost.
+
+    Each content-coding is its own representation (RFC 9110 8.8.3), so a
+    compressed response's strong ETag gets a ``-br`` or ``-gzip`` suffix.
+    The suffix is stripped from ``If-None-Match`` and ``If-Match`` before
+    the view compares them, and a 304 sends back the tag the client sent.
+    Streaming responses are left alone.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        coding = strip_etag_codings(request)
+        return self.compress(request, self.get_response(request), coding)
+
+    async def __acall__(self, request):
+        coding = strip_etag_codings(request)
+        return self.compress(request, await self.get_response(request), coding)
+
+    @property
+    def min_size(self):
+        return getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 1024)
+
+    def choose_encoding(self, request):
+        accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        wildcard = accepted.get('*', 0.0)
+        candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+        weights = [(accepted.get(coding, wildcard), coding) for coding in candidates]
+        weight, coding = max(weights, key=lambda pair: pair[0])
+        return coding if weight > 0 else None
+
+    def compress(self, request, response, matched_coding=None):
+        if response.status_code == 304:
+            if matched_coding is not None and response.has_header('ETag'):
+                response['ETag'] = etag_with_coding(response['ETag'], matched_coding)
+            return response
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < self.min_size:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+        content = response.content
+        if encoding == 'br':
+            compressed = brotli.compress(content, quality=BROTLI_QUALITY)
+        else:
+            compressed = gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(compressed) >= len(content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        if response.has_header('ETag'):
+            response['ETag'] = etag_with_coding(response['ETag'], encoding)
+        return response
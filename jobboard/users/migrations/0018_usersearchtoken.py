@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_search_tokens(apps, schema_editor):
+    from users.search import user_tokens
+
+    User = apps.get_model('users', 'User')
+    UserSearchToken = apps.get_model('users', 'UserSearchToken')
+    db_alias = schema_editor.connection.alias
+    users = User.objects.using(db_alias).only('id', 'username', 'full_name').order_by('id')
+    last_id = 0
+    while True:
+        batch = list(users.filter(id__gt=last_id)[:1000])
+        if not batch:
+            break
+        UserSearchToken.objects.using(db_alias).bulk_create([
+            UserSearchToken(user_id=user.id, token=token, weight=weight)
+            for user in batch
+            for token, weight in user_tokens(user.username, user.full_name).items()
+        ])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0017_job_job_description_pdf_alter_job_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=20)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', '-weight'], name='user_search_token_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'token'), name='unique_user_search_token')],
+            },
+        ),
+        migrations.RunPython(backfill_search_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def load_locations(apps, schema_editor):
+    from users.locations import load_gazetteer, location_key
+
+    Location = apps.get_model('users', 'Location')
+    db_alias = schema_editor.connection.alias
+    load_gazetteer(location_model=Location, using=db_alias)
+    places = {}
+    for location in Location.objects.using(db_alias):
+        places.setdefault((location.name_key, location.state_key), location)
+        places.setdefault((location.name_key, ''), location)
+
+    def relink(model_name, city_field, state_field):
+        model = apps.get_model('users', model_name)
+        batch = []
+        for obj in model.objects.using(db_alias).only('id', city_field, state_field).iterator(chunk_size=1000):
+            city_key = location_key(getattr(obj, city_field))
+            location = places.get((city_key, location_key(getattr(obj, state_field)))) or places.get((city_key, ''))
+            if location is None:
+                continue
+            obj.location_id, obj.latitude, obj.longitude = location.id, location.latitude, location.longitude
+            batch.append(obj)
+        model.objects.using(db_alias).bulk_update(batch, ['location', 'latitude', 'longitude'], batch_size=1000)
+
+    relink('Job', 'location_city', 'location_state')
+    relink('CompanyProfile', 'location_city', 'location_state')
+    relink('User', 'city', 'state')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0018_usersearchtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companyprofile',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='companyprofile',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('state', models.CharField(max_length=100)),
+                ('country', models.CharField(max_length=100)),
+                ('name_key', models.CharField(db_index=True, max_length=100)),
+                ('state_key', models.CharField(db_index=True, max_length=100)),
+                ('country_key', models.CharField(max_length=100)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['latitude', 'longitude'], name='location_coords_idx')],
+                'constraints': [models.UniqueConstraint(fields=('name_key', 'state_key', 'country_key'), name='unique_location')],
+            },
+        ),
+        migrations.AddField(
+            model_name='companyprofile',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='companies', to='users.location'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='users.location'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='users', to='users.location'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['latitude', 'longitude'], name='job_coords_idx'),
+        ),
+        migrations.RunPython(load_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:24
+
+from django.db import migrations, models
+
+
+def backfill_annual_salary(apps, schema_editor):
+    # Existing rows default to INR per year, which is the base unit as is.
+    Job = apps.get_model('users', 'Job')
+    Job.objects.using(schema_editor.connection.alias).update(
+        salary_annual_min=models.F('salary_min'),
+        salary_annual_max=models.F('salary_max'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0019_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='salary_annual_max',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_annual_min',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_currency',
+            field=models.CharField(choices=[('INR', 'Indian Rupee'), ('USD', 'US Dollar'), ('EUR', 'Euro'), ('GBP', 'British Pound'), ('CAD', 'Canadian Dollar'), ('AUD', 'Australian Dollar')], default='INR', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_period',
+            field=models.CharField(choices=[('hour', 'Per Hour'), ('month', 'Per Month'), ('year', 'Per Year')], default='year', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['salary_annual_min', 'salary_annual_max'], name='job_salary_range_idx'),
+        ),
+        migrations.RunPython(backfill_annual_salary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:41
+
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Rows that were never edited since creation; profiles keep the
+    # migration time, as they have no creation timestamp.
+    db_alias = schema_editor.connection.alias
+    for model_name in ('Job', 'Notification'):
+        model = apps.get_model('users', model_name)
+        model.objects.using(db_alias).update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0020_job_salary_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companyprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:51
+
+from django.db import migrations, models
+
+
+def backfill_change_seq(apps, schema_editor):
+    # Existing rows are numbered in creation order, and each stream's
+    # counter starts after its highest number.
+    db_alias = schema_editor.connection.alias
+    ChangeCounter = apps.get_model('users', 'ChangeCounter')
+    for model_name, stream in (('Message', 'messages'), ('Notification', 'notifications')):
+        model = apps.get_model('users', model_name)
+        model.objects.using(db_alias).update(change_seq=models.F('id'))
+        last = model.objects.using(db_alias).aggregate(last=models.Max('id'))['last'] or 0
+        ChangeCounter.objects.using(db_alias).create(stream=stream, value=last)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0021_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('stream', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', 'change_seq'], name='message_sender_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['recipient', 'change_seq'], name='message_recipient_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'change_seq'], name='notification_user_seq_idx'),
+        ),
+        migrations.RunPython(backfill_change_seq, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0022_change_seq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('employer', 'Employer activity'), ('job_seeker', 'Job seeker activity')], max_length=20)),
+                ('activity_type', models.CharField(max_length=100)),
+                ('month', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'source', 'activity_type', 'month'), name='unique_activity_rollup')],
+            },
+        ),
+    ]
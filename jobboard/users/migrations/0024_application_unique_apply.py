@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:58
+
+from django.db import migrations, models
+
+
+def remove_duplicate_applications(apps, schema_editor):
+    # The racy duplicate check let some users apply twice; keep the first.
+    db_alias = schema_editor.connection.alias
+    JobApplication = apps.get_model('users', 'JobApplication')
+    applications = JobApplication.objects.using(db_alias)
+    duplicates = (
+        applications.values('job', 'user')
+        .annotate(copies=models.Count('id'), first=models.Min('id'))
+        .filter(copies__gt=1)
+    )
+    for duplicate in duplicates:
+        applications.filter(job=duplicate['job'], user=duplicate['user']).exclude(id=duplicate['first']).delete()
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0023_activity_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_applications, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='jobapplication',
+            constraint=models.UniqueConstraint(fields=('job', 'user'), name='unique_job_application'),
+        ),
+        migrations.AddConstraint(
+            model_name='jobapplication',
+            constraint=models.UniqueConstraint(fields=('user', 'idempotency_key'), name='unique_application_idempotency_key'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-19 20:06
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_conversation_seq(apps, schema_editor):
+    # Number each conversation's existing messages in creation order and
+    # start its counter after the last one.
+    db_alias = schema_editor.connection.alias
+    Message = apps.get_model('users', 'Message')
+    ChangeCounter = apps.get_model('users', 'ChangeCounter')
+    messages = Message.objects.using(db_alias)
+    last = {}
+    batch = []
+    rows = messages.order_by('id').values_list('id', 'sender_id', 'recipient_id').iterator(chunk_size=BATCH_SIZE)
+    for pk, sender_id, recipient_id in rows:
+        low, high = sorted((sender_id, recipient_id))
+        stream = f'chat:{low}_{high}'
+        last[stream] = last.get(stream, 0) + 1
+        batch.append(Message(id=pk, conversation_seq=last[stream]))
+        if len(batch) == BATCH_SIZE:
+            messages.bulk_update(batch, ['conversation_seq'])
+            batch = []
+    messages.bulk_update(batch, ['conversation_seq'])
+    ChangeCounter.objects.using(db_alias).bulk_create(
+        [ChangeCounter(stream=stream, value=value) for stream, value in last.items()], batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0024_application_unique_apply'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='conversation_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_conversation_seq, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', 'recipient', 'conversation_seq'], name='message_conversation_seq_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-19 20:09
+
+from django.db import migrations, models, transaction
+from django.db.models.functions import Cast, Concat, Greatest, Least
+
+BATCH_SIZE = 5000
+
+
+def backfill_conversation_key(apps, schema_editor):
+    # One UPDATE per primary-key range, each committed on its own, so the
+    # table is never locked for the whole backfill.
+    db_alias = schema_editor.connection.alias
+    Message = apps.get_model('users', 'Message')
+    messages = Message.objects.using(db_alias)
+    key = Concat(
+        Cast(Least('sender_id', 'recipient_id'), models.CharField()),
+        models.Value('_'),
+        Cast(Greatest('sender_id', 'recipient_id'), models.CharField()),
+        output_field=models.CharField(),
+    )
+    last = messages.aggregate(last=models.Max('id'))['last'] or 0
+    for start in range(0, last, BATCH_SIZE):
+        with transaction.atomic(using=db_alias):
+            messages.filter(id__gt=start, id__lte=start + BATCH_SIZE).update(conversation_key=key)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('users', '0025_message_conversation_seq'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='message',
+            name='message_conversation_seq_idx',
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='conversation_key',
+            field=models.CharField(default='', editable=False, max_length=41),
+        ),
+        migrations.RunPython(backfill_conversation_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation_key', 'timestamp'], name='message_conversation_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation_key', 'conversation_seq'], name='message_conversation_seq_idx'),
+        ),
+    ]
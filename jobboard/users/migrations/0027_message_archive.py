@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 20:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0026_message_conversation_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('conversation_key', models.CharField(max_length=41)),
+                ('first_seq', models.BigIntegerField()),
+                ('last_seq', models.BigIntegerField()),
+                ('first_timestamp', models.DateTimeField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('message_count', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('conversation_key', 'last_seq'), name='unique_message_archive_block')],
+            },
+        ),
+    ]
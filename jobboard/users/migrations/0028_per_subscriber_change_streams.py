@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-19 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0027_message_archive'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='message',
+            name='message_sender_seq_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='message',
+            name='message_recipient_seq_idx',
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation_key', 'change_seq'], name='message_change_seq_idx'),
+        ),
+    ]
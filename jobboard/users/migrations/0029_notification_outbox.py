@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-19 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0028_per_subscriber_change_streams'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.BigIntegerField(blank=True, null=True)),
+                ('user_ids', models.JSONField(blank=True, help_text='Recipients, when not the applicants of job_id', null=True)),
+                ('message', models.CharField(max_length=255)),
+                ('link', models.CharField(blank=True, max_length=255)),
+                ('last_user_id', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
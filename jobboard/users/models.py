@@ -1,9 +1,36 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Cast, Concat, Greatest, Least
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from datetime import date  
 from django.contrib.auth import get_user_model
 
 
+class Location(models.Model):
+    """A gazetteer place, loaded from ``users/data/gazetteer.csv``."""
+    name = models.CharField(max_length=100)
+    state = models.CharField(max_length=100)
+    country = models.CharField(max_length=100)
+    # Normalized (lowercased, accent-stripped) copies used for exact lookups.
+    name_key = models.CharField(max_length=100, db_index=True)
+    state_key = models.CharField(max_length=100, db_index=True)
+    country_key = models.CharField(max_length=100)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name_key', 'state_key', 'country_key'], name='unique_location'),
+        ]
+        indexes = [
+            models.Index(fields=['latitude', 'longitude'], name='location_coords_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name}, {self.state}, {self.country}"
+
+
 class User(AbstractUser):
     ROLE_CHOICES = (
         ('admin', 'Admin'),
@@ -29,6 +56,9 @@ class User(AbstractUser):
     country = models.CharField(max_length=100, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
     resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True, related_name='users')
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
 
     is_employer = models.BooleanField(default=False)
     is_jobseeker = models.BooleanField(default=False)
@@ -55,13 +85,38 @@ class Job(models.Model):
     description = models.TextField(help_text="A brief summary of the job.")
     job_description_pdf = models.FileField(upload_to='job_descriptions/', null=True, blank=True)
     skills_required = models.CharField(max_length=300)
+    SALARY_CURRENCY_CHOICES = [
+        ('INR', 'Indian Rupee'),
+        ('USD', 'US Dollar'),
+        ('EUR', 'Euro'),
+        ('GBP', 'British Pound'),
+        ('CAD', 'Canadian Dollar'),
+        ('AUD', 'Australian Dollar'),
+    ]
+    SALARY_PERIOD_CHOICES = [
+        ('hour', 'Per Hour'),
+        ('month', 'Per Month'),
+        ('year', 'Per Year'),
+    ]
+
     salary_min = models.PositiveIntegerField(null=True, blank=True)
     salary_max = models.PositiveIntegerField(null=True, blank=True)
+    salary_currency = models.CharField(max_length=3, choices=SALARY_CURRENCY_CHOICES, default='INR')
+    salary_period = models.CharField(max_length=10, choices=SALARY_PERIOD_CHOICES, default='year')
+    # Yearly amounts in the base currency, derived on save; see users/salary.py
+    salary_annual_min = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    salary_annual_max = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
     location_city = models.CharField(max_length=100)
     location_state = models.CharField(max_length=100)
+    location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
     job_type = models.CharField(max_length=50, choices=JOB_TYPE_CHOICES)
     application_deadline = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Also touched when an application is added or removed, since the
+    # serialized job carries its application count; used for ETags.
+    updated_at = models.DateTimeField(auto_now=True)
 
     STATUS_CHOICES = [
         ('active', 'Active'),
@@ -70,6 +125,12 @@ class Job(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
     views = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['latitude', 'longitude'], name='job_coords_idx'),
+            models.Index(fields=['salary_annual_min', 'salary_annual_max'], name='job_salary_range_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -107,6 +168,14 @@ class JobApplication(models.Model):
     gpa = models.FloatField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='applied')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Idempotency-Key header of the request that created the application.
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'user'], name='unique_job_application'),
+            models.UniqueConstraint(fields=['user', 'idempotency_key'], name='unique_application_idempotency_key'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} -> {self.job.title}"
@@ -126,12 +195,16 @@ class CompanyProfile(models.Model):
     description = models.TextField(blank=True)
     location_city = models.CharField(max_length=100)
     location_state = models.CharField(max_length=100)
+    location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True, related_name='companies')
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
     industry = models.CharField(max_length=100, blank=True)
     company_size = models.CharField(max_length=50, blank=True)
     contact_email = models.EmailField()
     contact_phone = models.CharField(max_length=20, blank=True)
     linkedin = models.URLField(blank=True)
     twitter = models.URLField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.company_name
@@ -165,6 +238,7 @@ class JobSeekerProfile(models.Model):
     skills = models.TextField(blank=True)
     experience = models.TextField(blank=True)
     portfolio_url = models.URLField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
@@ -181,28 +255,327 @@ class JobSeekerActivity(models.Model):
         return f"{self.user.username} - {self.activity_type} at {self.timestamp}"
 
 
-class Message(models.Model):
+class ActivityRollup(models.Model):
+    """Monthly count of activity rows removed by ``prune_history``; see users/retention.py."""
+    SOURCE_CHOICES = [
+        ('employer', 'Employer activity'),
+        ('job_seeker', 'Job seeker activity'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='activity_rollups')
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    activity_type = models.CharField(max_length=100)
+    month = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'source', 'activity_type', 'month'], name='unique_activity_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.activity_type} {self.month:%Y-%m}: {self.count}"
+
+
+class ChangeCounter(models.Model):
+    """Last change sequence number handed out for a stream; see ``next_change_seq``."""
+    stream = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.stream}: {self.value}"
+
+
+def stream_floor(stream, using=None):
+    """The value a new counter for ``stream`` starts from.
+
+    Change streams used to be site-wide (``messages``, ``notifications``).
+    Those counters are kept, frozen, and a per-subscriber stream
+    (``messages:<conversation>``) starts at its kind's old value, so cursors
+    clients got before the split never run ahead of new numbers.
+    """
+    using = using or router.db_for_write(ChangeCounter)
+    kind = stream.partition(':')[0]
+    return ChangeCounter.objects.using(using).filter(stream=kind).values_list('value', flat=True).first() or 0
+
+
+def next_change_seq(stream, count=1, using=None):
+    """Reserve ``count`` sequence numbers of ``stream``; returns the last one.
+
+    Must run inside the transaction that writes the change. The counter row
+    stays locked until that transaction commits, so changes commit in
+    sequence order and a reader that has seen number N has seen every
+    change numbered below N. The price is that writers of one stream
+    serialize on the counter for the rest of their transaction, which is
+    why streams are per subscriber (a user's notifications, a conversation)
+    rather than site-wide.
+    """
+    using = using or router.db_for_write(ChangeCounter)
+    counters = ChangeCounter.objects.using(using)
+    if not counters.filter(stream=stream).update(value=F('value') + count):
+        counters.get_or_create(stream=stream, defaults={'value': stream_floor(stream, using)})
+        counters.filter(stream=stream).update(value=F('value') + count)
+    return counters.values_list('value', flat=True).get(stream=stream)
+
+
+def next_change_seqs(counts, using=None):
+    """``next_change_seq`` for many streams at once: ``{stream: count}`` to ``{stream: last}``."""
+    using = using or router.db_for_write(ChangeCounter)
+    counters = ChangeCounter.objects.using(using)
+    kinds = {stream: stream.partition(':')[0] for stream in counts}
+    floors = dict(counters.filter(stream__in=set(kinds.values())).values_list('stream', 'value'))
+    counters.bulk_create(
+        [ChangeCounter(stream=stream, value=floors.get(kind, 0)) for stream, kind in kinds.items()],
+        ignore_conflicts=True,
+    )
+    # Locked in key order, so concurrent callers cannot deadlock each other.
+    locked = list(counters.select_for_update().filter(stream__in=list(counts)).order_by('stream'))
+    for counter in locked:
+        counter.value += counts[counter.stream]
+    counters.bulk_update(locked, ['value'])
+    return {counter.stream: counter.value for counter in locked}
+
+
+class ChangeSequencedQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if not objs:
+            return objs
+        with transaction.atomic(using=self.db):
+            counts = {}
+            for obj in objs:
+                stream = obj.get_change_stream()
+                counts[stream] = counts.get(stream, 0) + 1
+            last = next_change_seqs(counts, using=self.db)
+            # Hand out each stream's block in order of appearance.
+            nxt = {stream: last[stream] - count + 1 for stream, count in counts.items()}
+            for obj in objs:
+                stream = obj.get_change_stream()
+                obj.change_seq = nxt[stream]
+                nxt[stream] += 1
+            return super().bulk_create(objs, *args, **kwargs)
+
+    def mark_read(self):
+        """Mark the unread rows read under one new change number per stream."""
+        changes = {'is_read': True}
+        if any(field.name == 'updated_at' for field in self.model._meta.concrete_fields):
+            changes['updated_at'] = timezone.now()
+        field = self.model.change_stream_field
+        with transaction.atomic(using=self.db):
+            unread = self.filter(is_read=False)
+            subscribers = list(unread.order_by().values_list(field, flat=True).distinct())
+            if not subscribers:
+                return 0
+            last = next_change_seqs(
+                {self.model.change_stream_for(subscriber): 1 for subscriber in subscribers}, using=self.db,
+            )
+            return sum(
+                unread.filter(**{field: subscriber}).update(
+                    change_seq=last[self.model.change_stream_for(subscriber)], **changes,
+                )
+                for subscriber in subscribers
+            )
+
+
+class ChangeSequencedModel(models.Model):
+    """Rows numbered with their stream's sequence on every save, for delta sync.
+
+    Each subscriber has its own stream, ``<change_stream>:<value of
+    change_stream_field>``, numbering the rows one client syncs.
+    ``QuerySet.update`` bypasses ``save``; changes that clients sync must go
+    through ``mark_read`` or allocate a number with ``next_change_seq``.
+    """
+    change_stream = None
+    change_stream_field = None
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    objects = ChangeSequencedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def change_stream_for(cls, subscriber):
+        return f'{cls.change_stream}:{subscriber}'
+
+    def get_change_stream(self):
+        return self.change_stream_for(getattr(self, self.change_stream_field))
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'change_seq'}
+        with transaction.atomic(using=using):
+            self.change_seq = next_change_seq(self.get_change_stream(), using=using)
+            super().save(*args, **kwargs)
+
+
+def conversation_key(user_id, other_user_id):
+    """``<lower id>_<higher id>``: the same for both directions of a conversation."""
+    low, high = sorted((int(user_id), int(other_user_id)))
+    return f'{low}_{high}'
+
+
+def conversation_key_expression(user, other_user):
+    """``conversation_key`` computed in SQL from two user id expressions."""
+    return Concat(
+        Cast(Least(user, other_user), CharField()), Value('_'), Cast(Greatest(user, other_user), CharField()),
+        output_field=CharField(),
+    )
+
+
+def conversation_stream(user_id, other_user_id):
+    """Counter stream numbering the messages of one conversation."""
+    return f'chat:{conversation_key(user_id, other_user_id)}'
+
+
+class MessageQuerySet(ChangeSequencedQuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if not objs:
+            return objs
+        with transaction.atomic(using=self.db):
+            for obj in objs:
+                obj.conversation_key = conversation_key(obj.sender_id, obj.recipient_id)
+            unnumbered = [obj for obj in objs if not obj.conversation_seq]
+            counts = {}
+            for obj in unnumbered:
+                stream = f'chat:{obj.conversation_key}'
+                counts[stream] = counts.get(stream, 0) + 1
+            if counts:
+                last = next_change_seqs(counts, using=self.db)
+                # Hand out each stream's block in order of appearance.
+                nxt = {stream: last[stream] - count + 1 for stream, count in counts.items()}
+                for obj in unnumbered:
+                    stream = f'chat:{obj.conversation_key}'
+                    obj.conversation_seq = nxt[stream]
+                    nxt[stream] += 1
+            return super().bulk_create(objs, *args, **kwargs)
+
+
+class Message(ChangeSequencedModel):
+    change_stream = 'messages'
+    change_stream_field = 'conversation_key'
+
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_messages')
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
+    # conversation_key(sender, recipient), so a thread is one equality match
+    # rather than an OR of both directions.
+    conversation_key = models.CharField(max_length=41, default='', editable=False)
+    # 1, 2, 3... within the conversation, in commit order; chat sockets resume from it.
+    conversation_seq = models.BigIntegerField(default=0, editable=False)
+
+    objects = MessageQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['conversation_key', 'change_seq'], name='message_change_seq_idx'),
+            models.Index(fields=['conversation_key', 'timestamp'], name='message_conversation_time_idx'),
+            models.Index(fields=['conversation_key', 'conversation_seq'], name='message_conversation_seq_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.conversation_key = conversation_key(self.sender_id, self.recipient_id)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'conversation_key'}
+        if self.conversation_seq:
+            return super().save(*args, **kwargs)
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'conversation_seq'}
+        # The conversation's counter is locked before the stream's, as in bulk_create.
+        with transaction.atomic(using=using):
+            self.conversation_seq = next_change_seq(
+                conversation_stream(self.sender_id, self.recipient_id), using=using,
+            )
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.sender.username} -> {self.recipient.username}: {self.content[:30]}"
 
-class Notification(models.Model):
+
+class MessageArchive(models.Model):
+    """A compressed block of old messages of one conversation; see users/chat_archive.py."""
+    conversation_key = models.CharField(max_length=41)
+    first_seq = models.BigIntegerField()
+    last_seq = models.BigIntegerField()
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    message_count = models.PositiveIntegerField()
+    # zlib-compressed JSON list of the messages, oldest first.
+    data = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['conversation_key', 'last_seq'], name='unique_message_archive_block'),
+        ]
+
+    def __str__(self):
+        return f"{self.conversation_key} #{self.first_seq}-{self.last_seq}"
+
+
+class Notification(ChangeSequencedModel):
+    change_stream = 'notifications'
+    change_stream_field = 'user_id'
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     message = models.CharField(max_length=255)
     link = models.CharField(max_length=255, blank=True, null=True, help_text='URL to navigate to when notification is clicked')
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'change_seq'], name='notification_user_seq_idx'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user.username}: {self.message[:30]}"
 
 
+class NotificationOutbox(models.Model):
+    """A pending notification fan-out, drained by the worker; see users/fanout.py."""
+    # Plain ids: the job may be deleted before the fan-out runs.
+    job_id = models.BigIntegerField(null=True, blank=True)
+    user_ids = models.JSONField(null=True, blank=True, help_text='Recipients, when not the applicants of job_id')
+    message = models.CharField(max_length=255)
+    link = models.CharField(max_length=255, blank=True)
+    # Recipients are notified in ascending id order; everyone up to here is done.
+    last_user_id = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Fan-out #{self.pk}: {self.message[:30]}"
+
+
+
+
+
 
 
 
+class UserSearchToken(models.Model):
+    """Typeahead index row: one normalized prefix/trigram token for a user.
 
+    Rows are rebuilt from ``username`` and ``full_name`` whenever a user is
+    saved (see ``users.search``). Email is intentionally not indexed.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=20)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'token'], name='unique_user_search_token'),
+        ]
+        indexes = [
+            models.Index(fields=['token', '-weight'], name='user_search_token_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.token} -> {self.user_id}"
@@ -0,0 +1,93 @@
+"""
+Chat presence, kept in the cache rather than the database.
+
+Every open chat socket holds a key of its own,
+``presence:<user_id>:<channel name>``, and ``presence:<user_id>`` counts
+them. Both are only changed atomically: a connection is counted in when
+``add`` creates its key and counted out when its ``delete`` succeeds, and
+the count moves with ``incr``/``decr``. So concurrent joins and leaves of
+one user (two tabs, a reconnect racing a disconnect) cannot lose each
+other, and exactly one of them sees the count go from 0 to 1 or back.
+
+Sockets refresh both keys at most once per ``PRESENCE_REFRESH_INTERVAL``
+however often the client sends heartbeats, and keys nobody refreshes for
+``PRESENCE_TTL`` seconds expire. A socket that disappears without leaving
+(a crashed server) stays counted until every socket of its user has gone
+quiet for ``PRESENCE_TTL``, when the count itself expires.
+
+Joining and leaving report whether the user went online or offline, so
+consumers push ``presence.changed`` to the ``presence_<user_id>`` group
+only on transitions. A user whose count merely expires is reported offline
+by lookups, without a push. ``online_user_ids`` answers for many users
+with one cache round trip.
+"""
+from django.core.cache import cache
+
+PRESENCE_TTL = 60
+PRESENCE_REFRESH_INTERVAL = 20
+# Minimum seconds between two typing events forwarded from one socket.
+TYPING_INTERVAL = 2
+
+
+def presence_key(user_id):
+    return f'presence:{user_id}'
+
+
+def connection_key(user_id, connection):
+    return f'presence:{user_id}:{connection}'
+
+
+def presence_group(user_id):
+    """Channel-layer group of the sockets watching ``user_id``'s presence."""
+    return f'presence_{user_id}'
+
+
+async def _count(user_id, delta):
+    key = presence_key(user_id)
+    while True:
+        try:
+            count = await cache.aincr(key, delta)
+        except ValueError:
+            # No count yet, or it expired: start one, unless another socket just did.
+            if await cache.aadd(key, delta, PRESENCE_TTL):
+                return delta
+            continue
+        await cache.atouch(key, PRESENCE_TTL)
+        return count
+
+
+async def join(user_id, connection):
+    """Add or refresh ``connection``; returns True if ``user_id`` just came online."""
+    if not await cache.aadd(connection_key(user_id, connection), True, PRESENCE_TTL):
+        # Already counted: a refresh.
+        await cache.atouch(connection_key(user_id, connection), PRESENCE_TTL)
+        await cache.atouch(presence_key(user_id), PRESENCE_TTL)
+        return False
+    return await _count(user_id, 1) == 1
+
+
+async def leave(user_id, connection):
+    """Drop ``connection``; returns True if ``user_id`` has no sockets left."""
+    if not await cache.adelete(connection_key(user_id, connection)):
+        # Expired already; its count goes when the user's count expires.
+        return False
+    try:
+        count = await cache.adecr(presence_key(user_id))
+    except ValueError:
+        return True
+    await cache.atouch(presence_key(user_id), PRESENCE_TTL)
+    return count <= 0
+
+
+async def is_online(user_id):
+    return (await cache.aget(presence_key(user_id)) or 0) > 0
+
+
+def online_user_ids(user_ids):
+    """The subset of ``user_ids`` that is online."""
+    keys = {presence_key(user_id): user_id for user_id in user_ids}
+    return {keys[key] for key, count in cache.get_many(keys).items() if count > 0}
+
+
+def presence_event(user_id, online):
+    return {'type': 'presence.changed', 'user_id': user_id, 'online': online}
@@ -0,0 +1,136 @@
+"""
+Retention for notifications and activity logs.
+
+Each policy selects the expired rows of one table from a ``RETENTION_*``
+setting (a number of days; ``None`` keeps the rows forever). ``prune``
+removes them in batches bounded by primary key: each batch is the next
+``batch_size`` expired ids, deleted with one short transaction whose
+``DELETE`` is limited to that id range, so row locks are held briefly and
+concurrent inserts at the end of the table are never blocked. Between
+batches the caller may sleep to leave room for regular traffic.
+
+Activity rows can be rolled up into monthly ``ActivityRollup`` counts in
+the same transaction that deletes them, and any table can be archived as
+gzipped JSON lines before deletion.
+"""
+import gzip
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DateField
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import ActivityRollup, EmployerActivity, JobSeekerActivity, Notification
+
+
+class RetentionPolicy:
+    def __init__(self, name, model, setting, age_field, filters=None, rollup=None):
+        self.name = name
+        self.model = model
+        self.setting = setting
+        self.age_field = age_field
+        self.filters = filters or {}
+        # (rollup source, user field) for activity tables.
+        self.rollup = rollup
+
+    @property
+    def days(self):
+        return getattr(settings, self.setting, None)
+
+    def expired(self, now=None):
+        """Queryset of the rows past retention, or ``None`` if the policy is off."""
+        if self.days is None:
+            return None
+        cutoff = (now or timezone.now()) - timedelta(days=self.days)
+        return self.model.objects.filter(**self.filters, **{f'{self.age_field}__lt': cutoff})
+
+
+POLICIES = [
+    RetentionPolicy(
+        'read_notifications', Notification, 'RETENTION_READ_NOTIFICATION_DAYS', 'created_at', {'is_read': True},
+    ),
+    RetentionPolicy(
+        'unread_notifications', Notification, 'RETENTION_UNREAD_NOTIFICATION_DAYS', 'created_at', {'is_read': False},
+    ),
+    RetentionPolicy(
+        'employer_activity', EmployerActivity, 'RETENTION_ACTIVITY_DAYS', 'timestamp',
+        rollup=('employer', 'employer'),
+    ),
+    RetentionPolicy(
+        'jobseeker_activity', JobSeekerActivity, 'RETENTION_ACTIVITY_DAYS', 'timestamp',
+        rollup=('job_seeker', 'user'),
+    ),
+]
+
+
+def roll_up(queryset, source, user_field):
+    """Add the rows of ``queryset`` to their users' monthly ``ActivityRollup`` counts."""
+    groups = (
+        queryset.order_by()
+        .annotate(month=TruncMonth('timestamp', output_field=DateField()))
+        .values(user_field, 'activity_type', 'month')
+        .annotate(total=Count('pk'))
+    )
+    counts = {(row[user_field], row['activity_type'], row['month']): row['total'] for row in groups}
+    if not counts:
+        return
+    existing = {
+        (rollup.user_id, rollup.activity_type, rollup.month): rollup
+        for rollup in ActivityRollup.objects.filter(
+            source=source,
+            user_id__in={key[0] for key in counts},
+            month__in={key[2] for key in counts},
+        )
+    }
+    updated, created = [], []
+    for (user_id, activity_type, month), total in counts.items():
+        rollup = existing.get((user_id, activity_type, month))
+        if rollup is None:
+            created.append(ActivityRollup(
+                user_id=user_id, source=source, activity_type=activity_type, month=month, count=total,
+            ))
+        else:
+            rollup.count += total
+            updated.append(rollup)
+    ActivityRollup.objects.bulk_update(updated, ['count'])
+    ActivityRollup.objects.bulk_create(created)
+
+
+def _json_default(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def prune(policy, queryset, batch_size=1000, sleep=0.0, archive=None, rollup=True):
+    """Delete the rows of ``queryset`` batch by batch; yields the size of each batch.
+
+    ``archive`` is a writable binary file receiving the deleted rows as JSON
+    lines. Deleting through ``QuerySet.delete`` keeps cascades and signals
+    intact; none of these tables has dependents, so it is a single DELETE.
+    """
+    last = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        batch = queryset.filter(pk__gte=ids[0], pk__lte=ids[-1])
+        with transaction.atomic():
+            if archive is not None:
+                for row in batch.values():
+                    archive.write(json.dumps(row, default=_json_default).encode() + b'\n')
+            if rollup and policy.rollup is not None:
+                roll_up(batch, *policy.rollup)
+            deleted, _ = batch.delete()
+        yield deleted
+        last = ids[-1]
+        if sleep:
+            time.sleep(sleep)
+
+
+def open_archive(directory, policy, now=None):
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = (now or timezone.now()).strftime('%Y%m%d-%H%M%S')
+    return gzip.open(directory / f'{policy.name}-{stamp}.jsonl.gz', 'ab')
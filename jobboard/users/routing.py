@@ -4,4 +4,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/chat/(?P<user_id>\d+)/$', consumers.ChatConsumer.as_asgi()),
+    re_path(r'ws/user/$', consumers.UserSocketConsumer.as_asgi()),
 ]
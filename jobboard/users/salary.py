@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.db.models import Count, F, Q
+from django.db.models.functions import Coalesce, Floor
+
+# Every posted salary is also stored as a yearly amount in the base currency
+# (Job.salary_annual_min / salary_annual_max), so ranges posted in different
+# currencies and periods can be compared with one indexed range predicate.
+BASE_CURRENCY = getattr(settings, 'SALARY_BASE_CURRENCY', 'INR')
+
+# Units of the base currency per unit of each currency.
+EXCHANGE_RATES = getattr(settings, 'SALARY_EXCHANGE_RATES', {
+    'INR': 1.0,
+    'USD': 83.0,
+    'EUR': 90.0,
+    'GBP': 105.0,
+    'CAD': 61.0,
+    'AUD': 55.0,
+})
+
+PERIODS_PER_YEAR = {
+    'hour': 2080,
+    'month': 12,
+    'year': 1,
+}
+
+MODE_OVERLAP = 'overlap'
+MODE_CONTAINS = 'contains'
+QUERY_MODES = (MODE_OVERLAP, MODE_CONTAINS)
+
+DEFAULT_BUCKET_SIZE = 300000
+MAX_BUCKETS = 50
+
+
+def to_annual(amount, currency=BASE_CURRENCY, period='year'):
+    """Convert ``amount`` per ``period`` in ``currency`` to base currency per year."""
+    if amount is None:
+        return None
+    rate = EXCHANGE_RATES.get(currency or BASE_CURRENCY, 1.0)
+    return int(round(amount * rate * PERIODS_PER_YEAR.get(period or 'year', 1)))
+
+
+def normalize_job_salary(job):
+    """Fill ``salary_annual_min`` / ``salary_annual_max`` from the posted values."""
+    job.salary_annual_min = to_annual(job.salary_min, job.salary_currency, job.salary_period)
+    job.salary_annual_max = to_annual(job.salary_max, job.salary_currency, job.salary_period)
+
+
+def parse_range(value):
+    """Parse ``"min-max"``, ``"min+"``, ``"-max"`` or ``"amount"`` into bounds.
+
+    Returns ``(low, high)`` with ``None`` for an open end, or ``None`` when
+    the value cannot be parsed.
+    """
+    value = (value or '').replace(',', '').strip()
+    try:
+        if value.endswith('+'):
+            return int(value[:-1]), None
+        if '-' in value:
+            low, high = value.split('-', 1)
+            low = int(low) if low.strip() else None
+            high = int(high) if high.strip() else None
+            if low is not None and high is not None and low > high:
+                low, high = high, low
+            return low, high
+        amount = int(value)
+        return amount, amount
+    except ValueError:
+        return None
+
+
+def salary_range_q(low, high, mode=MODE_OVERLAP):
+    """Predicate over the normalized yearly range of a job.
+
+    ``overlap`` keeps jobs whose range intersects ``[low, high]``; a job with
+    only a minimum is treated as open-ended upwards, one with only a maximum
+    as starting at zero. ``contains`` keeps jobs whose whole range lies
+    inside ``[low, high]``. Jobs without any salary never match.
+    """
+    q = Q(salary_annual_min__isnull=False) | Q(salary_annual_max__isnull=False)
+    if mode == MODE_CONTAINS:
+        if low is not None:
+            q &= Q(salary_annual_min__gte=low)
+        if high is not None:
+            q &= Q(salary_annual_max__lte=high) & (
+                Q(salary_annual_min__isnull=True) | Q(salary_annual_min__lte=high)
+            )
+        return q
+    if high is not None:
+        q &= Q(salary_annual_min__lte=high) | Q(salary_annual_min__isnull=True)
+    if low is not None:
+        q &= Q(salary_annual_max__gte=low) | Q(salary_annual_max__isnull=True, salary_annual_min__isnull=False)
+    return q
+
+
+def filter_by_salary(queryset, value, mode=None, currency=None, period=None):
+    """Apply a ``?salary=`` range, given in ``currency`` per ``period``."""
+    bounds = parse_range(value)
+    if bounds is None:
+        return queryset
+    low, high = (to_annual(bound, currency, period) for bound in bounds)
+    if mode not in QUERY_MODES:
+        mode = MODE_OVERLAP
+    return queryset.filter(salary_range_q(low, high, mode))
+
+
+def order_by_salary(queryset):
+    """Highest paying first, by the top of each job's normalized range."""
+    return queryset.order_by(
+        Coalesce('salary_annual_max', 'salary_annual_min').desc(nulls_last=True),
+        F('salary_annual_min').desc(nulls_last=True),
+    )
+
+
+def salary_histogram(queryset, bucket_size=DEFAULT_BUCKET_SIZE):
+    """Count jobs per fixed-width bucket of their normalized minimum salary.
+
+    Buckets past ``MAX_BUCKETS`` are folded into the last one, whose ``max``
+    is then ``None``.
+    """
+    rows = (
+        queryset.order_by()
+        .filter(salary_annual_min__isnull=False)
+        .annotate(bucket=Floor(F('salary_annual_min') / bucket_size))
+        .values('bucket')
+        .annotate(bucket_count=Count('id'))
+    )
+    counts = {}
+    for row in rows:
+        bucket = min(int(row['bucket']), MAX_BUCKETS - 1)
+        counts[bucket] = counts.get(bucket, 0) + row['bucket_count']
+    if not counts:
+        return []
+    last = max(counts)
+    return [
+        {
+            'min': bucket * bucket_size,
+            'max': None if bucket == MAX_BUCKETS - 1 else (bucket + 1) * bucket_size,
+            'count': counts.get(bucket, 0),
+        }
+        for bucket in range(last + 1)
+    ]
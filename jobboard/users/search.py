@@ -0,0 +1,137 @@
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import User, UserSearchToken
+
+# Tokens shorter than this are never stored or queried, so a single keystroke
+# does not fan out over a large slice of the user table.
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 20
+
+DEFAULT_RESULT_LIMIT = 10
+MAX_RESULT_LIMIT = 50
+
+# Score contributed by a token, depending on where it came from.
+USERNAME_PREFIX_WEIGHT = 4
+FULL_NAME_PREFIX_WEIGHT = 3
+TRIGRAM_WEIGHT = 1
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def normalize(text):
+    """Lowercase, strip accents and split ``text`` into alphanumeric words."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _WORD_RE.findall(text.casefold())
+
+
+def prefixes(word):
+    word = word[:MAX_TOKEN_LENGTH]
+    return [word[:i] for i in range(MIN_TOKEN_LENGTH, len(word) + 1)]
+
+
+def trigrams(word):
+    return [word[i:i + 3] for i in range(len(word) - 2)]
+
+
+def user_tokens(username, full_name):
+    """Return ``{token: weight}`` for the searchable fields of a user."""
+    tokens = {}
+
+    def add(token, weight):
+        tokens[token] = max(tokens.get(token, 0), weight)
+
+    for word in normalize(username):
+        for token in prefixes(word):
+            add(token, USERNAME_PREFIX_WEIGHT)
+        for token in trigrams(word):
+            add(token, TRIGRAM_WEIGHT)
+    for word in normalize(full_name):
+        for token in prefixes(word):
+            add(token, FULL_NAME_PREFIX_WEIGHT)
+        for token in trigrams(word):
+            add(token, TRIGRAM_WEIGHT)
+    return tokens
+
+
+def query_tokens(query):
+    """Tokens looked up for a search string: each word plus its trigrams."""
+    tokens = set()
+    for word in normalize(query):
+        word = word[:MAX_TOKEN_LENGTH]
+        if len(word) < MIN_TOKEN_LENGTH:
+            continue
+        tokens.add(word)
+        tokens.update(trigrams(word))
+    return tokens
+
+
+def index_user(user, using=None):
+    """Rebuild the search tokens of a single user."""
+    tokens = user_tokens(user.username, user.full_name)
+    manager = UserSearchToken.objects.db_manager(using)
+    with transaction.atomic(using=using):
+        manager.filter(user=user).delete()
+        manager.bulk_create([
+            UserSearchToken(user=user, token=token, weight=weight)
+            for token, weight in tokens.items()
+        ])
+
+
+def index_users(users, batch_size=1000):
+    """Bulk (re)index ``users``; used for backfills and bulk-created rows."""
+    rows = []
+    user_ids = []
+    for user in users:
+        user_ids.append(user.pk)
+        rows.extend(
+            UserSearchToken(user_id=user.pk, token=token, weight=weight)
+            for token, weight in user_tokens(user.username, user.full_name).items()
+        )
+    with transaction.atomic():
+        UserSearchToken.objects.filter(user_id__in=user_ids).delete()
+        UserSearchToken.objects.bulk_create(rows, batch_size=batch_size)
+
+
+def required_tokens(query):
+    """Tokens a user must have to match ``query``: those of its longest word.
+
+    A word's trigrams all match when it starts or appears inside one of the
+    user's words; a two-letter word has no trigrams, so it must match as a
+    prefix. Requiring them keeps a single shared trigram out of the results.
+    """
+    words = [word[:MAX_TOKEN_LENGTH] for word in normalize(query) if len(word) >= MIN_TOKEN_LENGTH]
+    anchor = max(words, key=len)
+    return set(trigrams(anchor)) or {anchor}
+
+
+def search_users(query, exclude_user=None, limit=DEFAULT_RESULT_LIMIT):
+    """Return the top ``limit`` users matching ``query``, best match first.
+
+    One aggregated query: the user's index rows matching the query tokens
+    are grouped per user, users without the ``required_tokens`` dropped,
+    the weights summed and the highest scoring ``limit`` rows kept. Every
+    matching user is scored; the token index keeps the scan to the rows of
+    those tokens.
+    """
+    tokens = query_tokens(query)
+    if not tokens:
+        return User.objects.none()
+    limit = max(1, min(limit, MAX_RESULT_LIMIT))
+    required = required_tokens(query)
+    queryset = User.objects.filter(search_tokens__token__in=tokens)
+    if exclude_user is not None:
+        queryset = queryset.exclude(id=exclude_user.id)
+    return (
+        queryset
+        .annotate(
+            search_score=Sum('search_tokens__weight'),
+            required_hits=Count('search_tokens', filter=Q(search_tokens__token__in=required)),
+        )
+        .filter(required_hits=len(required))
+        .order_by('-search_score', 'username')[:limit]
+    )
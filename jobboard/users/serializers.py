@@ -2,10 +2,12 @@ from rest_framework import serializers
 from django.db import models
 from .models import (
     User, Job, JobApplication, CompanyProfile, Message, Notification, 
-    EmployerActivity, JobSeekerActivity, JobSeekerProfile
+    EmployerActivity, JobSeekerActivity, JobSeekerProfile, conversation_key,
 )
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import authenticate
+from .fieldsets import SparseFieldsetSerializerMixin
+from .presence import online_user_ids
 
 class UserSearchSerializer(serializers.ModelSerializer):
     class Meta:
@@ -84,26 +86,62 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             raise serializers.ValidationError('Must include username and password.')
 
 
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     application_deadline = serializers.DateField(required=False, allow_null=True)
     job_description_pdf = serializers.FileField(required=False, allow_null=True)
     current_status = serializers.CharField(read_only=True)
-    application_count = serializers.IntegerField(source='applications.count', read_only=True)
+    application_count = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = Job
         fields = [
             'id', 'employer', 'title', 'description', 'job_description_pdf',
-            'skills_required', 'salary_min', 'salary_max', 'location_city',
-            'location_state', 'job_type', 'application_deadline', 'created_at',
+            'skills_required', 'salary_min', 'salary_max', 'salary_currency',
+            'salary_period', 'salary_annual_min', 'salary_annual_max', 'location_city',
+            'location_state', 'location', 'latitude', 'longitude', 'distance_km',
+            'job_type', 'application_deadline', 'created_at',
             'status', 'views', 'current_status', 'application_count'
         ]
-        read_only_fields = ['employer', 'current_status', 'application_count']
+        read_only_fields = [
+            'employer', 'current_status', 'application_count',
+            'location', 'latitude', 'longitude',
+            'salary_annual_min', 'salary_annual_max',
+        ]
+        # What a job card shows; see users/fieldsets.py.
+        compact_fields = [
+            'id', 'employer', 'title', 'skills_required', 'salary_min', 'salary_max',
+            'salary_currency', 'salary_period', 'location_city', 'location_state',
+            'distance_km', 'job_type', 'application_deadline', 'created_at', 'current_status',
+        ]
+        field_sources = {
+            'current_status': ('status', 'application_deadline'),
+            'application_count': (),
+            'distance_km': (),
+        }
+
+    def validate(self, attrs):
+        salary_min = attrs.get('salary_min', getattr(self.instance, 'salary_min', None))
+        salary_max = attrs.get('salary_max', getattr(self.instance, 'salary_max', None))
+        if salary_min is not None and salary_max is not None and salary_min > salary_max:
+            raise serializers.ValidationError({'salary_max': 'Maximum salary must not be below the minimum.'})
+        return attrs
+
+    def get_application_count(self, obj):
+        # Views annotate the count up front; fall back to a query otherwise.
+        count = getattr(obj, 'application_count', None)
+        return obj.applications.count() if count is None else count
+
+    def get_distance_km(self, obj):
+        # Only present when the queryset was filtered with ?near=
+        distance = getattr(obj, 'distance_km', None)
+        return round(distance, 1) if distance is not None else None
 
 class CompanyProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = CompanyProfile
         fields = '__all__'
+        read_only_fields = ['location', 'latitude', 'longitude']
 
 class JobSeekerProfileSerializer(serializers.ModelSerializer):
     class Meta:
@@ -111,7 +149,7 @@ class JobSeekerProfileSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['user']
 
-class JobApplicationSerializer(serializers.ModelSerializer):
+class JobApplicationSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     applicant_name = serializers.CharField(source='user.full_name', read_only=True)
     applicant_email = serializers.EmailField(source='user.email', read_only=True)
     class Meta:
@@ -122,15 +160,21 @@ class JobApplicationSerializer(serializers.ModelSerializer):
             'status', 'created_at', 'applicant_name', 'applicant_email'
         ]
         read_only_fields = ['user']
+        compact_fields = ['id', 'job', 'user', 'status', 'created_at', 'applicant_name', 'applicant_email']
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     sender_name = serializers.SerializerMethodField()
     recipient_name = serializers.SerializerMethodField()
     
     class Meta:
         model = Message
-        fields = ['id', 'sender', 'recipient', 'sender_name', 'recipient_name', 'content', 'timestamp', 'is_read']
-        read_only_fields = ['sender', 'timestamp']
+        fields = [
+            'id', 'sender', 'recipient', 'sender_name', 'recipient_name', 'content', 'timestamp', 'is_read',
+            'conversation_seq',
+        ]
+        read_only_fields = ['sender', 'timestamp', 'conversation_seq']
+        compact_fields = ['id', 'sender', 'recipient', 'sender_name', 'content', 'timestamp', 'is_read', 'conversation_seq']
+        field_sources = {'sender_name': ('sender',), 'recipient_name': ('recipient',)}
     
     def get_sender_name(self, obj):
         return obj.sender.full_name or obj.sender.username
@@ -138,11 +182,23 @@ class MessageSerializer(serializers.ModelSerializer):
     def get_recipient_name(self, obj):
         return obj.recipient.full_name or obj.recipient.username
 
+class ConversationListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        partners = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        # One cache round trip for the presence of every partner.
+        self.context['online_user_ids'] = online_user_ids([partner.id for partner in partners])
+        return super().to_representation(partners)
+
+
 class ConversationSerializer(serializers.Serializer):
     user = serializers.SerializerMethodField()
     last_message = serializers.SerializerMethodField()
     unread_count = serializers.SerializerMethodField()
     timestamp = serializers.SerializerMethodField()
+    online = serializers.SerializerMethodField()
+
+    class Meta:
+        list_serializer_class = ConversationListSerializer
     
     def get_user(self, obj):
         # obj is a User instance (the other user in the conversation)
@@ -157,21 +213,31 @@ class ConversationSerializer(serializers.Serializer):
     def get_last_message(self, obj):
         # Get the last message between current user and this user
         current_user = self.context['request'].user
+        if hasattr(obj, 'last_message_timestamp'):
+            # Annotated by the conversation list view
+            if obj.last_message_timestamp is None:
+                return None
+            return {
+                'content': obj.last_message_content,
+                'timestamp': obj.last_message_timestamp,
+                'is_sender': obj.last_message_sender_id == current_user.id,
+            }
         last_message = Message.objects.filter(
-            (models.Q(sender=current_user) & models.Q(recipient=obj)) | 
-            (models.Q(sender=obj) & models.Q(recipient=current_user))
+            conversation_key=conversation_key(current_user.pk, obj.pk)
         ).order_by('-timestamp').first()
         
         if last_message:
             return {
                 'content': last_message.content,
                 'timestamp': last_message.timestamp,
-                'is_sender': last_message.sender == current_user
+                'is_sender': last_message.sender_id == current_user.id
             }
         return None
     
     def get_unread_count(self, obj):
         # Count unread messages from this user to current user
+        if hasattr(obj, 'unread_message_count'):
+            return obj.unread_message_count
         current_user = self.context['request'].user
         return Message.objects.filter(
             sender=obj,
@@ -181,23 +247,26 @@ class ConversationSerializer(serializers.Serializer):
     
     def get_timestamp(self, obj):
         # Get timestamp of the last message for sorting
-        current_user = self.context['request'].user
-        last_message = Message.objects.filter(
-            (models.Q(sender=current_user) & models.Q(recipient=obj)) | 
-            (models.Q(sender=obj) & models.Q(recipient=current_user))
-        ).order_by('-timestamp').first()
-        
-        if last_message:
-            return last_message.timestamp
-        return None
+        if hasattr(obj, 'last_message_timestamp'):
+            return obj.last_message_timestamp
+        last_message = self.get_last_message(obj)
+        return last_message['timestamp'] if last_message else None
+
+    def get_online(self, obj):
+        online = self.context.get('online_user_ids')
+        if online is None:
+            online = online_user_ids([obj.id])
+        return obj.id in online
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     created_at_formatted = serializers.SerializerMethodField()
     
     class Meta:
         model = Notification
         fields = ['id', 'user', 'message', 'link', 'is_read', 'created_at', 'created_at_formatted']
         read_only_fields = ['user', 'created_at']
+        compact_fields = ['id', 'message', 'link', 'is_read', 'created_at']
+        field_sources = {'created_at_formatted': ('created_at',)}
     
     def get_created_at_formatted(self, obj):
         # Format the timestamp for display
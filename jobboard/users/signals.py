@@ -0,0 +1,87 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .activity_feed import push_activity_on_commit
+from .chat_archive import delete_user_archive
+from .facets import bump_jobs_generation
+from .locations import assign_location
+from .metrics import install_query_counter
+from .models import CompanyProfile, EmployerActivity, Job, JobApplication, JobSeekerActivity, User
+from .salary import normalize_job_salary
+from .search import index_user
+
+SEARCH_INDEXED_FIELDS = {'username', 'full_name'}
+USER_LOCATION_FIELDS = {'city', 'state', 'country'}
+JOB_LOCATION_FIELDS = {'location_city', 'location_state'}
+JOB_SALARY_FIELDS = {'salary_min', 'salary_max', 'salary_currency', 'salary_period'}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(fields.intersection(update_fields))
+
+
+@receiver(post_save, sender=User)
+def update_user_search_index(sender, instance, created, update_fields=None, raw=False, using=None, **kwargs):
+    # Partial saves such as the last_login update on every login leave the
+    # searchable fields untouched, so the index does not need rebuilding.
+    if raw or not _touches(update_fields, SEARCH_INDEXED_FIELDS):
+        return
+    index_user(instance, using=using)
+
+
+@receiver(pre_save, sender=User)
+def set_user_location(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not _touches(update_fields, USER_LOCATION_FIELDS):
+        return
+    assign_location(instance, instance.city, instance.state, instance.country)
+
+
+@receiver(pre_save, sender=Job)
+@receiver(pre_save, sender=CompanyProfile)
+def set_job_location(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not _touches(update_fields, JOB_LOCATION_FIELDS):
+        return
+    assign_location(instance, instance.location_city, instance.location_state)
+
+
+@receiver(pre_save, sender=Job)
+def set_job_salary_range(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not _touches(update_fields, JOB_SALARY_FIELDS):
+        return
+    normalize_job_salary(instance)
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def touch_job_on_application_change(sender, instance, created=True, raw=False, **kwargs):
+    # A job's representation includes its application count, so its ETag
+    # (derived from updated_at) must change when applications come and go.
+    if raw or not created:
+        return
+    Job.objects.filter(pk=instance.job_id).update(updated_at=timezone.now())
+    # The update sends no post_save, and cached search pages show the count too.
+    bump_jobs_generation()
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_search_cache(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_jobs_generation()
+
+
+@receiver(post_save, sender=EmployerActivity)
+@receiver(post_save, sender=JobSeekerActivity)
+def push_recent_activity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        push_activity_on_commit(instance)
+
+
+@receiver(post_delete, sender=User)
+def delete_archived_messages(sender, instance, **kwargs):
+    delete_user_archive(instance.pk)
+
+
+connection_created.connect(install_query_counter, dispatch_uid='users.metrics.install_query_counter')
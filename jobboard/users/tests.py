@@ -1,3 +1,1550 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, resolve, reverse
+from django.utils import timezone as django_timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import facets, locations, metrics, presence, urls as api_urls
+from . import consumers
+from .activity_feed import feed_key, feed_version, push_activity
+from .async_views import AsyncAPIView
+from .consumers import ChatConsumer, UserSocketConsumer
+from .db_router import REPLICA_DB_ALIAS, read_from_replica
+from .fanout import FANOUT_CHANNEL, NotificationFanoutConsumer, drain_outbox, notify_users, user_group
+from .middleware import brotli
+from .models import (
+    ActivityRollup, ChangeCounter, CompanyProfile, EmployerActivity, Job, JobApplication, JobSeekerActivity, Location,
+    Message, MessageArchive, Notification, NotificationOutbox, User, UserSearchToken,
+)
+from .renderers import FastJSONParser, FastJSONRenderer
+from .search import index_users, search_users
+from .serializers import JobSerializer
+from .salary import salary_range_q
+from .throttling import EXPENSIVE_REQUESTS, IPWindowThrottle
+from .views import MessageListAPIView, NotificationListAPIView
+
+
+class SalaryRangeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create_user(
+            'employer', 'employer@example.com', 'password', role='employer'
+        )
+        for title, salary_min, salary_max, currency, period in [
+            ('yearly', 300000, 500000, 'INR', 'year'),
+            ('open_ended', 600000, None, 'INR', 'year'),
+            ('capped', None, 200000, 'INR', 'year'),
+            ('monthly', 50000, 70000, 'INR', 'month'),
+            ('dollars', 10000, 20000, 'USD', 'year'),
+            ('unpaid', None, None, 'INR', 'year'),
+        ]:
+            Job.objects.create(
+                employer=cls.employer, title=title, description='-', skills_required='-',
+                location_city='Pune', location_state='Maharashtra', job_type='Full-Time',
+                salary_min=salary_min, salary_max=salary_max,
+                salary_currency=currency, salary_period=period,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def titles(self, url, **params):
+        return sorted(job['title'] for job in self.client.get(url, params).json())
+
+    def test_normalized_on_save(self):
+        job = Job.objects.get(title='monthly')
+        self.assertEqual((job.salary_annual_min, job.salary_annual_max), (600000, 840000))
+
+    def test_overlap_is_the_default_mode(self):
+        expected = ['monthly', 'open_ended', 'yearly']
+        self.assertEqual(self.titles('/api/jobs/', salary='400000-700000'), expected)
+        self.assertEqual(self.titles('/api/job-search/', salary='400000-700000'), expected)
+
+    def test_contains_mode(self):
+        self.assertEqual(
+            self.titles('/api/jobs/', salary='250000-900000', salary_mode='contains'),
+            ['monthly', 'yearly'],
+        )
+
+    def test_query_in_other_period(self):
+        self.assertEqual(self.titles('/api/jobs/', salary='-20000', salary_period='month'), ['capped'])
+
+    def test_sort_by_salary(self):
+        response = self.client.get('/api/job-search/', {'sort_by': 'salary'})
+        self.assertEqual(
+            [job['title'] for job in response.json()],
+            ['dollars', 'monthly', 'open_ended', 'yearly', 'capped', 'unpaid'],
+        )
+
+    def test_histogram(self):
+        response = self.client.get('/api/jobs/salary-histogram/', {'bucket_size': 300000})
+        self.assertEqual([bucket['count'] for bucket in response.json()['buckets']], [0, 1, 3])
+
+    @skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+    def test_range_query_uses_index(self):
+        plan = Job.objects.filter(salary_range_q(400000, 700000)).explain()
+        self.assertIn('USING INDEX job_salary_range_idx', plan)
+        self.assertNotIn('SCAN users_job', plan)
+
+
+@skipUnless(REPLICA_DB_ALIAS in settings.DATABASES, "needs a 'replica' database alias, see jobboard/test_settings.py")
+@override_settings(DATABASE_REPLICA_READS=True)
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', REPLICA_DB_ALIAS}
+
+    def setUp(self):
+        cache.clear()
+        # The same employer exists on both databases; each also holds a job
+        # the other one does not, so responses reveal where they were read.
+        for alias in ('default', REPLICA_DB_ALIAS):
+            employer = User.objects.db_manager(alias).create_user(
+                'employer', 'employer@example.com', 'password', role='employer', id=1,
+            )
+            Job.objects.using(alias).create(
+                employer=employer, title=f'on {alias}', description='-', skills_required='-',
+                location_city='Pune', location_state='Maharashtra', job_type='Full-Time',
+            )
+        self.employer = User.objects.get(id=1)
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.employer).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def job_titles(self, client=None):
+        return sorted(job['title'] for job in (client or self.client).get('/api/jobs/').json())
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.job_titles(APIClient()), [f'on {REPLICA_DB_ALIAS}'])
+        self.assertEqual(self.job_titles(), [f'on {REPLICA_DB_ALIAS}'])
+
+    def test_writes_go_to_primary_and_pin_the_client(self):
+        response = self.client.post('/api/jobs/', {
+            'title': 'new', 'description': '-', 'skills_required': '-',
+            'location_city': 'Pune', 'location_state': 'Maharashtra', 'job_type': 'Remote',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Job.objects.using(REPLICA_DB_ALIAS).filter(title='new').exists())
+        # The writer reads its own write; other clients keep using the replica.
+        self.assertEqual(self.job_titles(), ['new', 'on default'])
+        self.assertEqual(self.job_titles(APIClient()), [f'on {REPLICA_DB_ALIAS}'])
+
+    def test_reads_after_a_write_in_the_same_request_use_primary(self):
+        with read_from_replica():
+            self.assertEqual(Job.objects.get().title, f'on {REPLICA_DB_ALIAS}')
+            Job.objects.create(
+                employer=self.employer, title='new', description='-', skills_required='-',
+                location_city='Pune', location_state='Maharashtra', job_type='Remote',
+            )
+            self.assertEqual(Job.objects.count(), 2)
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'password', role='admin')
+        self.client = APIClient()
+
+    def test_requests_are_recorded_per_url_name(self):
+        self.client.get('/api/notifications/unread-count/')
+        self.client.force_authenticate(self.admin)
+        body = self.client.get('/api/metrics/').content.decode()
+        self.assertIn(
+            'jobboard_http_responses_total{view="api_notifications_unread_count",method="GET",status="401"} 1',
+            body,
+        )
+        self.assertIn('jobboard_http_request_db_queries_count{view="api_notifications_unread_count",method="GET"} 1', body)
+        self.assertIn('# TYPE jobboard_http_request_duration_seconds histogram', body)
+
+    def test_metrics_are_admin_only(self):
+        seeker = User.objects.create_user('seeker', 'seeker@example.com', 'password', role='job_seeker')
+        self.client.force_authenticate(seeker)
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+    @override_settings(METRICS_QUERY_BUDGET=0)
+    def test_requests_over_the_query_budget_are_logged(self):
+        token = RefreshToken.for_user(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertLogs('users.metrics', 'WARNING') as logs:
+            self.client.get('/api/notifications/')
+        self.assertIn('FROM "users_notification" WHERE "users_notification"."user_id" = ?', logs.output[0])
+
+
+class SeedScaleTests(TestCase):
+    def test_generates_linked_and_indexed_rows(self):
+        call_command(
+            'seed_scale', users=40, jobs=30, applications=50, messages=20, notifications=10,
+            batch_size=16, stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.filter(username__startswith='seed_').count(), 40)
+        self.assertEqual(CompanyProfile.objects.count(), 4)
+        self.assertEqual(Job.objects.count(), 30)
+        self.assertEqual(JobApplication.objects.count(), 50)
+        self.assertEqual(Message.objects.count(), 20)
+        self.assertEqual(Notification.objects.count(), 10)
+        # Work normally done by the save signals, which bulk_create skips.
+        self.assertFalse(Job.objects.filter(location__isnull=True).exists())
+        self.assertFalse(Job.objects.filter(salary_min__isnull=False, salary_annual_min__isnull=True).exists())
+        self.assertTrue(UserSearchToken.objects.exists())
+        user = User.objects.get(username='seed_7')
+        self.assertIn(user, search_users(user.full_name))
+        self.assertTrue(self.client.login(username='seed_7', password='password'))
+
+
+class QueryCountTests(TestCase):
+    """Every GET endpoint must run the same number of queries for 1 and 50 rows."""
+    # (role, URL kwargs, query string) per URL name; kwargs name attributes of
+    # the test case. Routes that only accept writes are listed in WRITE_ONLY.
+    CASES = {
+        'user-search': ('seeker', {}, 'search=match&limit=50'),
+        'api_profile': ('seeker', {}, ''),
+        'api_employer_only': ('employer', {}, ''),
+        'api_jobseeker_only': ('seeker', {}, ''),
+        'api_admin_only': ('admin', {}, ''),
+        'api_jobseeker_profile': ('seeker', {}, ''),
+        'api_jobs_list_create': (None, {}, ''),
+        'api_job_rud': ('seeker', {'pk': 'job'}, ''),
+        'api_job_salary_histogram': (None, {}, ''),
+        'api_employer_jobs_list': ('employer', {}, ''),
+        'api_company_profile': ('employer', {}, ''),
+        'api_applications_list_create': ('seeker', {}, ''),
+        'api_applications_rud': ('seeker', {'pk': 'application'}, ''),
+        'api_job_applications_list': ('employer', {'job_id': 'job'}, ''),
+        'api_download_resume': ('employer', {'application_id': 'application'}, ''),
+        'api_job_search': ('seeker', {}, 'keyword=python&facets=job_type,salary'),
+        'api_conversations_list': ('seeker', {}, ''),
+        'api_messages_list': ('seeker', {'user_id': 'employer_id'}, ''),
+        'api_messages_unread_count': ('seeker', {}, ''),
+        'api_notifications_list': ('seeker', {}, ''),
+        'api_notifications_unread_count': ('seeker', {}, ''),
+        'api_employer_dashboard': ('employer', {}, ''),
+        'api_jobseeker_dashboard': ('seeker', {}, ''),
+        'api_admin_dashboard': ('admin', {}, ''),
+        'api_metrics': ('admin', {}, ''),
+    }
+    EXTRA_CASES = [
+        ('api_jobs_list_create', None, {}, 'facets=job_type,location,salary,posted'),
+        ('api_applications_list_create', 'employer', {}, ''),
+    ]
+    WRITE_ONLY = {
+        'token_obtain_pair', 'token_refresh', 'api_register', 'api_messages_create',
+        'api_notifications_mark_read', 'api_notifications_mark_all_read',
+        'request_password_reset', 'password_reset_confirm', 'change_password',
+    }
+    SIZES = (1, 50)
+
+    def setUp(self):
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.seeker = User.objects.create_user('seeker', 'seeker@example.com', 'password', role='job_seeker')
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'password', role='admin')
+        self.employer_id = self.employer.id
+        CompanyProfile.objects.create(
+            employer=self.employer, company_name='Acme', location_city='Pune',
+            location_state='Maharashtra', contact_email='hr@acme.example.com',
+        )
+
+    def create_rows(self, size):
+        """Grow every list the endpoints return to ``size`` entries."""
+        jobs = [
+            Job.objects.create(
+                employer=self.employer, title=f'Python developer {i}', description='-',
+                skills_required='python', location_city='Pune', location_state='Maharashtra',
+                job_type='Full-Time', salary_min=500000, salary_max=900000,
+            )
+            for i in range(size)
+        ]
+        self.job = jobs[0].pk
+        self.application = JobApplication.objects.create(
+            job=jobs[0], user=self.seeker, resume=SimpleUploadedFile('resume.pdf', b'%PDF-1.4'),
+        ).pk
+        for job in jobs[1:]:
+            JobApplication.objects.create(job=job, user=self.seeker)
+        for i in range(size):
+            applicant = User.objects.create_user(
+                f'match{i}', f'match{i}@example.com', 'password', role='job_seeker', full_name=f'Match {i}',
+            )
+            JobApplication.objects.create(job=jobs[0], user=applicant)
+            Message.objects.create(sender=applicant, recipient=self.seeker, content='hello')
+            Message.objects.create(sender=self.employer, recipient=self.seeker, content=f'message {i}')
+            Notification.objects.create(user=self.seeker, message=f'notification {i}')
+
+    def query_counts(self, size):
+        counts = {}
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media), transaction.atomic():
+            cache.clear()
+            self.create_rows(size)
+            for name, role, kwargs, query in [(n, *case) for n, case in self.CASES.items()] + self.EXTRA_CASES:
+                client = APIClient()
+                if role:
+                    token = RefreshToken.for_user(getattr(self, role)).access_token
+                    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+                url = reverse(name, kwargs={key: getattr(self, value) for key, value in kwargs.items()})
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(f'{url}?{query}')
+                self.assertEqual(response.status_code, 200, url)
+                counts[f'{url}?{query} as {role}'] = [query['sql'] for query in queries.captured_queries]
+            transaction.set_rollback(True)
+        return counts
+
+    def test_every_get_route_is_covered(self):
+        names = {pattern.name for pattern in api_urls.urlpatterns if isinstance(pattern, URLPattern)}
+        self.assertEqual(names - self.WRITE_ONLY, set(self.CASES))
+
+    def test_query_count_does_not_grow_with_rows(self):
+        small, large = (self.query_counts(size) for size in self.SIZES)
+        for case, queries in large.items():
+            with self.subTest(case):
+                self.assertEqual(
+                    len(queries), len(small[case]),
+                    f"{case} ran {len(small[case])} queries for 1 row and {len(queries)} for 50:\n"
+                    + '\n'.join(queries),
+                )
+
+
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('seeker', 'seeker@example.com', 'password', role='job_seeker')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'user_search_user': '3/min', 'user_search_ip': '100/min'},
+    })
+    def test_limit_per_user(self):
+        # At the start of a window: the requests only age out after the next one.
+        with mock.patch('users.throttling.time.time', return_value=600.0):
+            statuses = [self.client.get('/api/users/search/?search=ab').status_code for _ in range(4)]
+            self.assertEqual(statuses, [200, 200, 200, 429])
+            response = self.client.get('/api/users/search/?search=ab')
+        self.assertEqual(int(response['Retry-After']), 80)
+        # Two thirds into the next window one third of them still counts.
+        with mock.patch('users.throttling.time.time', return_value=700.0):
+            statuses = [self.client.get('/api/users/search/?search=ab').status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+        # Another user from the same address has a bucket of their own.
+        other = User.objects.create_user('other', 'other@example.com', 'password', role='job_seeker')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get('/api/users/search/?search=ab').status_code, 200)
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'login_ip': '5/min'},
+    })
+    def test_concurrent_requests_cannot_exceed_the_limit(self):
+        class RoundTripCache:
+            """The default cache, with a network round trip before every call."""
+            def __getattr__(self, name):
+                method = getattr(cache, name)
+
+                def call(*args, **kwargs):
+                    time.sleep(0.005)
+                    return method(*args, **kwargs)
+                return call
+
+        throttle, view = IPWindowThrottle(), mock.Mock(throttle_scope='login')
+        throttle.cache = RoundTripCache()
+        request = mock.Mock(META={'REMOTE_ADDR': '10.0.0.1'})
+        ready = threading.Barrier(20)
+
+        def attempt(_):
+            ready.wait()
+            return throttle.allow_request(request, view)
+
+        with ThreadPoolExecutor(20) as pool:
+            allowed = list(pool.map(attempt, range(20)))
+        self.assertEqual(allowed.count(True), 5)
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'login_ip': '2/min'},
+    })
+    def test_login_is_limited_per_address(self):
+        client = APIClient()
+        for _ in range(2):
+            client.post('/api/login/', {'username': 'seeker', 'password': 'wrong'})
+        response = client.post('/api/login/', {'username': 'seeker', 'password': 'password'})
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(EXPENSIVE_REQUEST_CONCURRENCY=1, EXPENSIVE_REQUEST_RETRY_AFTER=3)
+    def test_sheds_load_over_the_concurrency_ceiling(self):
+        self.assertTrue(EXPENSIVE_REQUESTS.acquire())
+        try:
+            response = self.client.get('/api/job-search/')
+        finally:
+            EXPENSIVE_REQUESTS.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '3')
+        self.assertEqual(self.client.get('/api/job-search/').status_code, 200)
+        self.assertEqual(EXPENSIVE_REQUESTS.in_flight, 0)
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.seeker = User.objects.create_user('seeker', 'seeker@example.com', 'password', role='job_seeker')
+        self.job = Job.objects.create(
+            employer=self.employer, title='Backend developer', description='-', skills_required='python',
+            location_city='Pune', location_state='Maharashtra', job_type='Full-Time',
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def test_job_detail_not_modified(self):
+        client = self.client_for(self.seeker)
+        response = client.get(f'/api/jobs/{self.job.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        response = client.get(f'/api/jobs/{self.job.pk}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_new_application_changes_job_etags(self):
+        client = self.client_for(self.seeker)
+        detail_etag = client.get(f'/api/jobs/{self.job.pk}/')['ETag']
+        list_etag = client.get('/api/jobs/')['ETag']
+        JobApplication.objects.create(job=self.job, user=self.seeker)
+        response = client.get(f'/api/jobs/{self.job.pk}/', HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['application_count'], 1)
+        self.assertEqual(client.get('/api/jobs/', HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+    def test_if_match_prevents_lost_updates(self):
+        client = self.client_for(self.employer)
+        etag = client.get('/api/company-profile/')['ETag']
+        first = client.patch('/api/company-profile/', {'company_name': 'Acme'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(first.status_code, 200)
+        self.assertNotEqual(first['ETag'], etag)
+        stale = client.patch('/api/company-profile/', {'company_name': 'Other'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(stale.status_code, 412)
+        self.assertEqual(CompanyProfile.objects.get().company_name, 'Acme')
+        job = client.patch(f'/api/jobs/{self.job.pk}/', {'title': 'Lead'}, HTTP_IF_MATCH='"stale"')
+        self.assertEqual(job.status_code, 412)
+
+    def test_if_match_is_checked_against_the_locked_row(self):
+        client = self.client_for(self.employer)
+        etag = client.get('/api/company-profile/')['ETag']
+        stale = CompanyProfile.objects.get()
+        # Another request commits between this one's read and its write.
+        CompanyProfile.objects.filter(pk=stale.pk).update(
+            company_name='Concurrent', updated_at=stale.updated_at + timedelta(seconds=1),
+        )
+        with mock.patch('users.views.CompanyProfileRetrieveUpdateAPIView.get_object', return_value=stale):
+            response = client.patch('/api/company-profile/', {'company_name': 'Acme'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(CompanyProfile.objects.get().company_name, 'Concurrent')
+
+    def test_notification_list_etag_follows_reads(self):
+        client = self.client_for(self.seeker)
+        notification = Notification.objects.create(user=self.seeker, message='hello')
+        etag = client.get('/api/notifications/')['ETag']
+        self.assertEqual(client.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        client.post('/api/notifications/mark-all-read/')
+        response = client.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()[0]['is_read'])
+        self.assertEqual(response.json()[0]['id'], notification.pk)
+
+
+class ResponseEncodingTests(TestCase):
+    def test_fast_renderer_matches_drf_output(self):
+        data = {
+            'created_at': datetime(2025, 1, 2, 3, 4, 5, 600000, tzinfo=timezone.utc),
+            'gpa': Decimal('8.25'),
+            'tags': ('python', 'django'),
+            'name': 'Zoë',
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_fast_parser(self):
+        self.assertEqual(FastJSONParser().parse(BytesIO('{"a": [1, "é"]}'.encode())), {'a': [1, 'é']})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"a": '))
+
+    def test_job_list_is_compressed_above_threshold(self):
+        employer = User.objects.create_user('acme', 'acme@example.com', 'x', role='employer')
+        for i in range(5):
+            Job.objects.create(employer=employer, title=f'Job {i}', description='Build things. ' * 50)
+        plain = self.client.get('/api/jobs/')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        response = self.client.get('/api/jobs/', HTTP_ACCEPT_ENCODING='gzip;q=1, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response['ETag'], plain['ETag'][:-1] + '-gzip"')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+        # Either validator revalidates; a 304 repeats the one the client sent.
+        not_modified = self.client.get('/api/jobs/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual((not_modified.status_code, not_modified['ETag']), (304, response['ETag']))
+        not_modified = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=plain['ETag'])
+        self.assertEqual((not_modified.status_code, not_modified['ETag']), (304, plain['ETag']))
+
+        with override_settings(RESPONSE_COMPRESSION_MIN_SIZE=len(plain.content) + 1):
+            response = self.client.get('/api/jobs/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+    @skipUnless(brotli is not None, "brotli is not installed")
+    def test_brotli_preferred_when_accepted(self):
+        employer = User.objects.create_user('acme', 'acme@example.com', 'x', role='employer')
+        Job.objects.create(employer=employer, title='Job', description='Build things. ' * 200)
+        response = self.client.get('/api/jobs/?fields=description', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.client.get('/api/jobs/?fields=description').content)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.seeker = User.objects.create_user('seeker', 'seeker@example.com', 'password', role='job_seeker')
+        self.job = Job.objects.create(
+            employer=self.employer, title='Backend developer', description='Long text', skills_required='python',
+            location_city='Pune', location_state='Maharashtra', job_type='Full-Time',
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.seeker).access_token}')
+
+    def test_job_lists_default_to_compact(self):
+        for url in ('/api/jobs/', '/api/jobs/?location=Pune', '/api/job-search/'):
+            job = self.client.get(url).json()
+            job = (job['results'] if isinstance(job, dict) else job)[0]
+            self.assertEqual(set(job), set(JobSerializer.Meta.compact_fields), url)
+        full = self.client.get('/api/jobs/?fields=*').json()[0]
+        self.assertEqual(full['description'], 'Long text')
+        self.assertEqual(full['application_count'], 0)
+
+    def test_fields_drive_the_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/job-search/?fields=title')
+        self.assertEqual(response.json(), [{'id': self.job.pk, 'title': 'Backend developer'}])
+        select = [query['sql'] for query in queries if query['sql'].startswith('SELECT "users_job"."id"')]
+        self.assertEqual(len(select), 1)
+        self.assertNotIn('"description"', select[0])
+        self.assertNotIn('users_jobapplication', select[0])
+
+        detail = self.client.get(f'/api/jobs/{self.job.pk}/?omit=description,job_description_pdf')
+        self.assertNotIn('description', detail.json())
+        self.assertIn('application_count', detail.json())
+        self.assertIn('ETag', detail)
+
+    def test_message_and_notification_fieldsets(self):
+        Message.objects.create(sender=self.employer, recipient=self.seeker, content='Hi')
+        Notification.objects.create(user=self.seeker, message='hello')
+        message = self.client.get(f'/api/messages/{self.employer.pk}/?omit=content').json()['results'][0]
+        self.assertNotIn('content', message)
+        self.assertEqual(message['sender_name'], 'employer')
+        notification = self.client.get('/api/notifications/?fields=message').json()[0]
+        self.assertEqual(set(notification), {'id', 'message'})
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/jobs/?fields=title,salary')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'fields': ['Unknown field: salary.']})
+        self.assertEqual(self.client.get('/api/notifications/?omit=nope').status_code, 400)
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.seeker = User.objects.create_user('seeker', 'seeker@example.com', 'password', role='job_seeker')
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def test_notifications_since_cursor(self):
+        client = self.client_for(self.seeker)
+        first = Notification.objects.create(user=self.seeker, message='first')
+        Notification.objects.create(user=self.seeker, message='second')
+        Notification.objects.create(user=self.employer, message='not yours')
+        cursor = client.get('/api/notifications/')['Sync-Cursor']
+
+        new = Notification.objects.create(user=self.seeker, message='third')
+        client.post(f'/api/notifications/{first.pk}/read/')
+        delta = client.get(f'/api/notifications/?since={cursor}').json()
+        self.assertEqual([row['id'] for row in delta['results']], [new.pk, first.pk])
+        self.assertTrue(delta['results'][1]['is_read'])
+        self.assertFalse(delta['has_more'])
+
+        client.post('/api/notifications/mark-all-read/')
+        delta = client.get(f"/api/notifications/?since={delta['cursor']}").json()
+        self.assertEqual(len(delta['results']), 2)
+        empty = client.get(f"/api/notifications/?since={delta['cursor']}").json()
+        self.assertEqual(empty, {'results': [], 'cursor': delta['cursor'], 'has_more': False})
+
+    def test_pages_follow_change_order(self):
+        Notification.objects.bulk_create(Notification(user=self.seeker, message=str(i)) for i in range(5))
+        client = self.client_for(self.seeker)
+        seen, cursor, has_more = [], '0', True
+        with mock.patch.object(NotificationListAPIView, 'sync_page_size', 2):
+            while has_more:
+                delta = client.get(f'/api/notifications/?since={cursor}').json()
+                seen += [row['message'] for row in delta['results']]
+                cursor, has_more = delta['cursor'], delta['has_more']
+        self.assertEqual(seen, ['0', '1', '2', '3', '4'])
+        self.assertEqual(client.get('/api/notifications/?since=-1').status_code, 400)
+
+    def test_read_receipts_reach_the_sender(self):
+        employer = self.client_for(self.employer)
+        employer.post('/api/messages/create/', {'recipient': self.seeker.pk, 'content': 'Hello'})
+        cursor = employer.get(f'/api/messages/{self.seeker.pk}/')['Sync-Cursor']
+        message = Message.objects.get()
+        self.assertFalse(message.is_read)
+
+        self.client_for(self.seeker).get(f'/api/messages/{self.employer.pk}/')
+        delta = employer.get(f'/api/messages/{self.seeker.pk}/?since={cursor}').json()
+        self.assertEqual([(row['id'], row['is_read']) for row in delta['results']], [(message.pk, True)])
+        self.assertGreater(int(delta['cursor']), int(cursor))
+
+
+    def test_streams_are_per_subscriber(self):
+        client = self.client_for(self.seeker)
+        Notification.objects.create(user=self.seeker, message='yours')
+        cursor = client.get('/api/notifications/')['Sync-Cursor']
+        Notification.objects.bulk_create(Notification(user=self.employer, message=str(i)) for i in range(3))
+        # Other users' writes neither wait on nor advance this user's stream.
+        self.assertEqual(client.get('/api/notifications/')['Sync-Cursor'], cursor)
+        self.assertEqual(
+            sorted(Notification.objects.filter(user=self.employer).values_list('change_seq', flat=True)), [1, 2, 3],
+        )
+        self.assertEqual(Notification.objects.filter(user__in=[self.seeker, self.employer]).mark_read(), 4)
+        self.assertEqual(Notification.objects.get(user=self.seeker).change_seq, 2)
+        self.assertEqual(set(Notification.objects.filter(user=self.employer).values_list('change_seq', flat=True)), {4})
+
+    def test_new_streams_continue_from_the_site_wide_counter(self):
+        # Cursors handed out while streams were site-wide stay valid.
+        ChangeCounter.objects.update_or_create(stream='notifications', defaults={'value': 500})
+        client = self.client_for(self.seeker)
+        self.assertEqual(client.get('/api/notifications/')['Sync-Cursor'], '500')
+        Notification.objects.create(user=self.seeker, message='after the split')
+        delta = client.get('/api/notifications/?since=500').json()
+        self.assertEqual([row['message'] for row in delta['results']], ['after the split'])
+        self.assertEqual(delta['cursor'], '501')
+
+    def test_cross_origin_clients_can_read_the_cursor(self):
+        response = self.client_for(self.seeker).get('/api/notifications/', HTTP_ORIGIN='http://localhost:3000')
+        exposed = {name.strip().lower() for name in response['Access-Control-Expose-Headers'].split(',')}
+        self.assertLessEqual({'sync-cursor', 'etag'}, exposed)
+        preflight = self.client.options(
+            '/api/jobs/1/', HTTP_ORIGIN='http://localhost:3000',
+            HTTP_ACCESS_CONTROL_REQUEST_METHOD='PATCH', HTTP_ACCESS_CONTROL_REQUEST_HEADERS='if-match',
+        )
+        self.assertIn('if-match', preflight['Access-Control-Allow-Headers'])
+
+class NotificationFanoutTests(TestCase):
+    def setUp(self):
+        self.layer = get_channel_layer()
+        async_to_sync(self.layer.flush)()
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.job = Job.objects.create(
+            employer=self.employer, title='Backend developer', description='-', skills_required='python',
+            location_city='Pune', location_state='Maharashtra', job_type='Full-Time',
+        )
+        self.applicants = [
+            User.objects.create_user(f'seeker{i}', f'seeker{i}@example.com', 'password', role='job_seeker')
+            for i in range(5)
+        ]
+        for applicant in self.applicants:
+            JobApplication.objects.create(job=self.job, user=applicant)
+        Notification.objects.all().delete()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.employer).access_token}')
+
+    def receive(self, channel):
+        return async_to_sync(self.layer.receive)(channel)
+
+    def test_closing_a_job_enqueues_and_the_worker_fans_out(self):
+        channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(user_group(self.applicants[0].pk), channel)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/jobs/{self.job.pk}/', {'status': 'inactive'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(NotificationOutbox.objects.get().job_id, self.job.pk)
+
+        event = self.receive(FANOUT_CHANNEL)
+        self.assertEqual(event['type'], 'fanout.pending')
+        with mock.patch.object(NotificationFanoutConsumer, 'chunk_size', 2), CaptureQueriesContext(connection) as queries:
+            NotificationFanoutConsumer().fanout_pending(event)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "users_notification"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(
+            sorted(Notification.objects.values_list('user_id', flat=True)),
+            sorted(applicant.pk for applicant in self.applicants),
+        )
+        self.assertFalse(NotificationOutbox.objects.exists())
+        pushed = self.receive(channel)
+        self.assertEqual(pushed['type'], 'notification.created')
+        self.assertIn('closed', pushed['notification']['message'])
+
+    def test_deleting_a_job_stores_applicant_ids(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f'/api/jobs/{self.job.pk}/').status_code, 204)
+        self.assertEqual(NotificationOutbox.objects.get().user_ids, sorted(applicant.pk for applicant in self.applicants))
+        NotificationFanoutConsumer().fanout_pending(self.receive(FANOUT_CHANNEL))
+        self.assertEqual(Notification.objects.filter(message__contains='removed').count(), 5)
+
+    def test_other_edits_do_not_notify(self):
+        with mock.patch('users.fanout._wake') as wake, self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/jobs/{self.job.pk}/', {'title': 'Lead developer'})
+        wake.assert_not_called()
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_a_lost_wake_up_is_drained_later(self):
+        with mock.patch('users.fanout._wake'), self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/jobs/{self.job.pk}/', {'status': 'inactive'})
+        self.assertFalse(Notification.objects.exists())
+        out = StringIO()
+        call_command('drain_fanout', stdout=out)
+        self.assertIn('5 notifications created', out.getvalue())
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_an_interrupted_fanout_resumes_after_the_last_recipient(self):
+        ids = sorted(applicant.pk for applicant in self.applicants)
+        NotificationOutbox.objects.create(job_id=self.job.pk, message='closed', last_user_id=ids[1])
+        self.assertEqual(drain_outbox(chunk_size=2), 3)
+        self.assertEqual(sorted(Notification.objects.values_list('user_id', flat=True)), ids[2:])
+
+    def test_rows_are_read_back_when_bulk_insert_returns_no_ids(self):
+        Notification.objects.create(user=self.applicants[0], message='earlier')
+        features = type(connection.features)
+        with mock.patch.object(features, 'can_return_rows_from_bulk_insert', new_callable=mock.PropertyMock,
+                               return_value=False), \
+                mock.patch('users.fanout.push_notifications', new=mock.AsyncMock()) as push:
+            self.assertIsNone(Notification.objects.bulk_create([Notification(user=self.employer, message='-')])[0].pk)
+            notify_users([applicant.pk for applicant in self.applicants], 'closed')
+        pushed = push.call_args.args[1]
+        self.assertEqual(sorted(row['user'] for row in pushed), sorted(applicant.pk for applicant in self.applicants))
+        self.assertTrue(all(row['message'] == 'closed' for row in pushed))
+
+@override_settings(RETENTION_READ_NOTIFICATION_DAYS=30, RETENTION_UNREAD_NOTIFICATION_DAYS=None, RETENTION_ACTIVITY_DAYS=60)
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.seeker = User.objects.create_user('seeker', 'seeker@example.com', 'password', role='job_seeker')
+        Notification.objects.all().delete()
+        self.old = django_timezone.now() - timedelta(days=100)
+
+    def age(self, queryset, field):
+        queryset.update(**{field: self.old})
+
+    def test_prunes_old_read_notifications_in_batches(self):
+        Notification.objects.bulk_create(
+            Notification(user=self.seeker, message=f'n{i}', is_read=i % 2 == 0) for i in range(10)
+        )
+        self.age(Notification.objects.all(), 'created_at')
+        Notification.objects.create(user=self.seeker, message='fresh', is_read=True)
+        with CaptureQueriesContext(connection) as queries:
+            call_command('prune_history', '--policy', 'read_notifications', '--batch-size', '2', '--sleep', '0',
+                         stdout=StringIO())
+        deletes = [query for query in queries if query['sql'].startswith('DELETE FROM "users_notification"')]
+        self.assertEqual(len(deletes), 3)
+        self.assertFalse(Notification.objects.filter(is_read=True, message__startswith='n').exists())
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 5)
+        self.assertTrue(Notification.objects.filter(message='fresh').exists())
+
+    def test_rolls_activity_up_into_monthly_counts(self):
+        for _ in range(3):
+            EmployerActivity.objects.create(employer=self.employer, activity_type='job_posted', description='-')
+        JobSeekerActivity.objects.create(user=self.seeker, activity_type='applied')
+        self.age(EmployerActivity.objects.all(), 'timestamp')
+        self.age(JobSeekerActivity.objects.all(), 'timestamp')
+        EmployerActivity.objects.create(employer=self.employer, activity_type='job_posted', description='-')
+
+        call_command('prune_history', '--batch-size', '2', '--sleep', '0', stdout=StringIO())
+        self.assertEqual(EmployerActivity.objects.count(), 1)
+        self.assertFalse(JobSeekerActivity.objects.exists())
+        month = self.old.date().replace(day=1)
+        rollup = ActivityRollup.objects.get(user=self.employer, source='employer', activity_type='job_posted')
+        self.assertEqual((rollup.month, rollup.count), (month, 3))
+        self.assertEqual(ActivityRollup.objects.get(user=self.seeker, source='job_seeker').count, 1)
+
+    def test_dry_run_and_archive(self):
+        Notification.objects.create(user=self.seeker, message='old', is_read=True)
+        self.age(Notification.objects.all(), 'created_at')
+        out = StringIO()
+        call_command('prune_history', '--dry-run', stdout=out)
+        self.assertIn('1 rows older than 30 days', out.getvalue())
+        self.assertTrue(Notification.objects.exists())
+
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('prune_history', '--policy', 'read_notifications', '--sleep', '0',
+                         '--archive-dir', directory, stdout=StringIO())
+            [archive] = Path(directory).glob('read_notifications-*.jsonl.gz')
+            rows = [json.loads(line) for line in gzip.open(archive)]
+        self.assertEqual([row['message'] for row in rows], ['old'])
+        self.assertFalse(Notification.objects.exists())
+
+
+class RecentActivityFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.employer).access_token}')
+
+    def dashboard(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/employer-dashboard/')
+        self.assertEqual(response.status_code, 200)
+        activity_queries = [query for query in queries if 'users_employeractivity' in query['sql']]
+        return response.data['recent_activities'], activity_queries
+
+    def test_rebuilds_on_miss_then_serves_from_cache(self):
+        for i in range(7):
+            EmployerActivity.objects.create(employer=self.employer, activity_type='job_posted', description=f'job {i}')
+        activities, queries = self.dashboard()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([activity['description'] for activity in activities], [f'job {i}' for i in range(6, 1, -1)])
+        cached, queries = self.dashboard()
+        self.assertEqual(queries, [])
+        self.assertEqual(cached, activities)
+
+    def test_logging_writes_through(self):
+        self.dashboard()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/jobs/', {
+                'title': 'Backend developer', 'description': '-', 'skills_required': 'python',
+                'location_city': 'Pune', 'location_state': 'Maharashtra', 'job_type': 'Full-Time',
+            })
+        self.assertEqual(response.status_code, 201)
+        activities, queries = self.dashboard()
+        self.assertEqual(queries, [])
+        self.assertEqual(len(activities), 1)
+        self.assertIn('Backend developer', activities[0]['description'])
+
+    def test_a_rebuild_racing_a_write_cannot_hide_it(self):
+        self.dashboard()
+        # A read that missed the cache and queried the table before the
+        # write committed, storing its result only after the push.
+        version = feed_version('employer', self.employer.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            EmployerActivity.objects.create(employer=self.employer, activity_type='job_posted', description='new')
+        cache.set(feed_key('employer', self.employer.pk, version), [])
+        activities, queries = self.dashboard()
+        self.assertEqual(queries, [])
+        self.assertEqual([activity['description'] for activity in activities], ['new'])
+
+    def test_pushing_does_not_query_the_activity_table(self):
+        self.dashboard()
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            EmployerActivity.objects.create(employer=self.employer, activity_type='job_posted', description='new')
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT')])
+        activities, queries = self.dashboard()
+        self.assertEqual((queries, activities[0]['description']), ([], 'new'))
+
+    def test_interleaved_pushes_leave_the_buffer_to_a_rebuild(self):
+        self.dashboard()
+        with self.captureOnCommitCallbacks(execute=False):
+            first, second = (
+                EmployerActivity.objects.create(employer=self.employer, activity_type='job_posted', description=name)
+                for name in ('first', 'second')
+            )
+        incr = cache.incr
+
+        def racing_incr(key, *args, **kwargs):
+            # The second push runs entirely between the first one's reads and its write.
+            if racing_incr.pending:
+                racing_incr.pending = False
+                push_activity(second)
+            return incr(key, *args, **kwargs)
+        racing_incr.pending = True
+
+        with mock.patch.object(cache, 'incr', side_effect=racing_incr):
+            push_activity(first)
+        activities, queries = self.dashboard()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([activity['description'] for activity in activities], ['second', 'first'])
+
+    def test_rolled_back_activity_is_not_pushed(self):
+        self.dashboard()
+        with self.captureOnCommitCallbacks(execute=False):
+            EmployerActivity.objects.create(employer=self.employer, activity_type='job_posted', description='-')
+        activities, _ = self.dashboard()
+        self.assertEqual(activities, [])
+
+
+class ApplyTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.seeker = User.objects.create_user(
+            'seeker', 'seeker@example.com', 'password', role='job_seeker', full_name='Sam Seeker',
+        )
+        self.job, self.other_job = [
+            Job.objects.create(
+                employer=self.employer, title=title, description='-', skills_required='python',
+                location_city='Pune', location_state='Maharashtra', job_type='Full-Time',
+            )
+            for title in ('Backend developer', 'Data engineer')
+        ]
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.seeker).access_token}')
+
+    def apply(self, job, key=None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post('/api/applications/', {'job': job.pk, 'cover_letter': 'hi'}, **headers)
+
+    def test_apply_notifies_employer_in_one_transaction(self):
+        response = self.apply(self.job)
+        self.assertEqual(response.status_code, 201)
+        notification = Notification.objects.get(user=self.employer)
+        self.assertIn('Sam Seeker', notification.message)
+
+        with mock.patch('users.applications.Notification.objects.create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.apply(self.other_job)
+        self.assertFalse(JobApplication.objects.filter(job=self.other_job).exists())
+
+    def test_duplicate_is_rejected_by_the_constraint(self):
+        self.assertEqual(self.apply(self.job).status_code, 201)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.apply(self.job)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('already applied', str(response.data))
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "users_jobapplication"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(JobApplication.objects.count(), 1)
+        self.assertEqual(Notification.objects.filter(user=self.employer).count(), 1)
+
+    def test_idempotency_key_replays_the_original_application(self):
+        first = self.apply(self.job, key='attempt-1')
+        retry = self.apply(self.job, key='attempt-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.data['id'], first.data['id'])
+        self.assertEqual(Notification.objects.filter(user=self.employer).count(), 1)
+
+        self.assertEqual(self.apply(self.other_job, key='attempt-1').status_code, 422)
+        self.assertEqual(self.apply(self.job, key='attempt-2').status_code, 400)
+
+    def test_deadline_passed(self):
+        Job.objects.filter(pk=self.job.pk).update(application_deadline=date(2020, 1, 1))
+        response = self.apply(self.job)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(JobApplication.objects.exists())
+
+
+class SocketTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.seeker = User.objects.create_user('seeker', 'seeker@example.com', 'password', role='job_seeker')
+
+    async def open_socket(self, consumer, path, user, query_string=b'', **kwargs):
+        socket = ApplicationCommunicator(consumer.as_asgi(), {
+            'type': 'websocket', 'path': path, 'query_string': query_string, 'user': user,
+            'url_route': {'args': (), 'kwargs': kwargs},
+        })
+        await socket.send_input({'type': 'websocket.connect'})
+        self.assertEqual((await socket.receive_output(1))['type'], 'websocket.accept')
+        return socket
+
+    async def open_chat(self, user, other, query_string=b''):
+        return await self.open_socket(
+            ChatConsumer, f'/ws/chat/{other.pk}/', user, query_string, user_id=str(other.pk),
+        )
+
+    async def receive(self, socket):
+        return json.loads((await socket.receive_output(1))['text'])
+
+    async def send(self, socket, payload):
+        await socket.send_input({'type': 'websocket.receive', 'text': json.dumps(payload)})
+
+    async def close(self, socket):
+        await socket.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await socket.wait(1)
+
+
+class ChatPresenceTests(SocketTestCase):
+
+    async def test_pushes_presence_transitions_only(self):
+        employer = await self.open_chat(self.employer, self.seeker)
+        self.assertEqual(await self.receive(employer), {'type': 'presence', 'user_id': self.seeker.pk, 'online': False})
+
+        seeker = await self.open_chat(self.seeker, self.employer)
+        self.assertEqual(await self.receive(seeker), {'type': 'presence', 'user_id': self.employer.pk, 'online': True})
+        self.assertEqual(await self.receive(employer), {'type': 'presence', 'user_id': self.seeker.pk, 'online': True})
+
+        # A second socket of an online user is not a transition.
+        second = await self.open_chat(self.seeker, self.employer)
+        await self.receive(second)
+        self.assertTrue(await employer.receive_nothing())
+        await self.close(second)
+        self.assertTrue(await employer.receive_nothing())
+
+        await self.close(seeker)
+        self.assertEqual(await self.receive(employer), {'type': 'presence', 'user_id': self.seeker.pk, 'online': False})
+        await self.close(employer)
+
+    async def test_typing_is_rate_limited_per_connection(self):
+        employer = await self.open_chat(self.employer, self.seeker)
+        await self.receive(employer)
+        seeker = await self.open_chat(self.seeker, self.employer)
+        await self.receive(seeker)
+        await self.receive(employer)
+
+        for _ in range(3):
+            await self.send(seeker, {'type': 'typing'})
+        self.assertEqual(await self.receive(employer), {'type': 'typing', 'user_id': self.seeker.pk})
+        self.assertTrue(await employer.receive_nothing())
+        self.assertTrue(await seeker.receive_nothing())
+        await self.close(seeker)
+        await self.close(employer)
+
+    async def test_heartbeats_are_coalesced(self):
+        socket = await self.open_chat(self.seeker, self.employer)
+        await self.receive(socket)
+        with mock.patch.object(presence, 'join', wraps=presence.join) as join:
+            for _ in range(5):
+                await self.send(socket, {'type': 'heartbeat'})
+            await socket.receive_nothing()
+            self.assertEqual(join.call_count, 0)
+            with mock.patch.object(presence, 'PRESENCE_REFRESH_INTERVAL', 0):
+                await self.send(socket, {'type': 'heartbeat'})
+                await socket.receive_nothing()
+            self.assertEqual(join.call_count, 1)
+        await self.close(socket)
+
+    async def test_concurrent_joins_and_leaves_report_one_transition(self):
+        user_id = self.seeker.pk
+        joined = await asyncio.gather(*(presence.join(user_id, f'socket{i}') for i in range(3)))
+        self.assertEqual(sorted(joined), [False, False, True])
+        self.assertFalse(await presence.join(user_id, 'socket0'))
+        left = await asyncio.gather(*(presence.leave(user_id, f'socket{i}') for i in range(2)))
+        self.assertEqual(left, [False, False])
+        self.assertTrue(await presence.is_online(user_id))
+        self.assertTrue(await presence.leave(user_id, 'socket2'))
+        self.assertFalse(await presence.leave(user_id, 'socket2'))
+        self.assertFalse(await presence.is_online(user_id))
+
+    def test_conversation_list_reports_presence_in_one_lookup(self):
+        other = User.objects.create_user('other', 'other@example.com', 'password', role='employer')
+        Message.objects.create(sender=self.employer, recipient=self.seeker, content='hello')
+        Message.objects.create(sender=other, recipient=self.seeker, content='hi')
+        async_to_sync(presence.join)(self.employer.pk, 'socket')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.seeker).access_token}')
+        with mock.patch.object(presence.cache, 'get_many', wraps=presence.cache.get_many) as get_many:
+            response = client.get('/api/conversations/')
+        self.assertEqual(get_many.call_count, 1)
+        online = {conversation['user']['id']: conversation['online'] for conversation in response.data}
+        self.assertEqual(online, {self.employer.pk: True, other.pk: False})
+
+
+class UserSocketTests(SocketTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user('other', 'other@example.com', 'password', role='employer')
+
+    async def open_user_socket(self, user):
+        return await self.open_socket(UserSocketConsumer, '/ws/user/', user)
+
+    async def test_subscriptions_multiplex_conversations_without_lookups(self):
+        socket = await self.open_user_socket(self.seeker)
+        with mock.patch.object(User.objects, 'get', side_effect=AssertionError("looked up a partner")):
+            for partner in (self.employer, self.other):
+                await self.send(socket, {'type': 'subscribe', 'user_id': partner.pk})
+                self.assertEqual(
+                    await self.receive(socket), {'type': 'subscribed', 'user_id': partner.pk, 'online': False},
+                )
+
+        # A per-pair chat socket and the multiplexed socket share the room.
+        employer = await self.open_chat(self.employer, self.seeker)
+        await self.receive(employer)
+        self.assertEqual(await self.receive(socket), {'type': 'presence', 'user_id': self.employer.pk, 'online': True})
+        await self.send(employer, {'message': 'Hello'})
+        frame = await self.receive(socket)
+        self.assertEqual((frame['type'], frame['message']['content']), ('chat_message', 'Hello'))
+        await self.receive(employer)  # its own echo
+
+        await self.send(socket, {'type': 'message', 'user_id': self.employer.pk, 'message': 'Hi there'})
+        self.assertEqual((await self.receive(employer))['message']['content'], 'Hi there')
+        self.assertEqual((await self.receive(socket))['message']['recipient'], self.employer.pk)
+
+        await self.send(socket, {'type': 'unsubscribe', 'user_id': self.employer.pk})
+        self.assertEqual(await self.receive(socket), {'type': 'unsubscribed', 'user_id': self.employer.pk})
+        await self.send(employer, {'message': 'Still there?'})
+        await self.receive(employer)
+        self.assertTrue(await socket.receive_nothing())
+        await self.close(employer)
+        await self.close(socket)
+
+    async def test_rejects_messages_outside_subscriptions(self):
+        socket = await self.open_user_socket(self.seeker)
+        await self.send(socket, {'type': 'message', 'user_id': self.employer.pk, 'message': 'Hi'})
+        self.assertEqual((await self.receive(socket))['type'], 'error')
+        await self.send(socket, {'type': 'subscribe', 'user_id': 'nobody'})
+        self.assertEqual(await self.receive(socket), {'type': 'error', 'detail': 'Malformed frame.'})
+        await self.send(socket, {'type': 'subscribe', 'user_id': 999999})
+        await self.receive(socket)
+        await self.send(socket, {'type': 'message', 'user_id': 999999, 'message': 'Hi'})
+        self.assertEqual(await self.receive(socket), {'type': 'error', 'detail': 'User 999999 does not exist.'})
+        self.assertFalse(await Message.objects.aexists())
+        await self.close(socket)
+
+    async def test_receives_own_notifications(self):
+        socket = await self.open_user_socket(self.seeker)
+        await get_channel_layer().group_send(user_group(self.seeker.pk), {
+            'type': 'notification.created', 'notification': {'id': 1, 'message': 'Job closed'},
+        })
+        self.assertEqual(
+            await self.receive(socket), {'type': 'notification', 'notification': {'id': 1, 'message': 'Job closed'}},
+        )
+        await self.close(socket)
+
+
+class ChatResumeTests(SocketTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user('other', 'other@example.com', 'password', role='employer')
+
+    def test_numbers_messages_per_conversation(self):
+        Message.objects.create(sender=self.employer, recipient=self.seeker, content='1')
+        Message.objects.create(sender=self.other, recipient=self.seeker, content='1')
+        Message.objects.create(sender=self.seeker, recipient=self.employer, content='2')
+        Message.objects.bulk_create([
+            Message(sender=self.seeker, recipient=self.other, content='2'),
+            Message(sender=self.employer, recipient=self.seeker, content='3'),
+            Message(sender=self.other, recipient=self.seeker, content='3'),
+        ])
+        for message in Message.objects.all():
+            self.assertEqual(message.conversation_seq, int(message.content))
+
+    def test_thread_is_one_equality_on_conversation_key(self):
+        Message.objects.create(sender=self.employer, recipient=self.seeker, content='saved')
+        Message.objects.bulk_create([Message(sender=self.seeker, recipient=self.employer, content='bulk')])
+        Message.objects.create(sender=self.other, recipient=self.seeker, content='elsewhere')
+        key = f'{min(self.employer.pk, self.seeker.pk)}_{max(self.employer.pk, self.seeker.pk)}'
+        self.assertEqual(Message.objects.filter(conversation_key=key).count(), 2)
+
+        client = APIClient()
+        client.force_authenticate(self.seeker)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('api_messages_list', args=[self.employer.pk]))
+        self.assertEqual([message['content'] for message in response.json()['results']], ['saved', 'bulk'])
+        thread_sql = [query['sql'] for query in queries if 'users_message' in query['sql']]
+        self.assertTrue(thread_sql)
+        self.assertFalse(any(' OR ' in sql for sql in thread_sql))
+
+    async def test_chat_socket_replays_missed_messages_in_batches(self):
+        await Message.objects.abulk_create(
+            Message(sender=self.employer, recipient=self.seeker, content=f'message {i}') for i in range(1, 251)
+        )
+        socket = await self.open_chat(self.seeker, self.employer, b'token=x&last_seq=120')
+        self.assertEqual((await self.receive(socket))['type'], 'presence')
+        first, second = await self.receive(socket), await self.receive(socket)
+        self.assertEqual((first['type'], len(first['messages']), first['has_more']), ('replay', 100, True))
+        self.assertEqual((len(second['messages']), second['has_more']), (30, False))
+        self.assertEqual(first['messages'][0]['conversation_seq'], 121)
+        self.assertEqual(second['messages'][-1]['content'], 'message 250')
+        self.assertTrue(await socket.receive_nothing())
+
+        # Live traffic continues after the replay.
+        employer = await self.open_chat(self.employer, self.seeker)
+        await self.receive(employer)
+        await self.send(employer, {'message': 'live'})
+        frame = await self.receive(socket)
+        while frame['type'] != 'chat_message':
+            frame = await self.receive(socket)
+        self.assertEqual(frame['message']['conversation_seq'], 251)
+        await self.close(employer)
+        await self.close(socket)
+
+    async def test_user_socket_replays_on_subscribe(self):
+        await Message.objects.acreate(sender=self.employer, recipient=self.seeker, content='seen')
+        await Message.objects.acreate(sender=self.employer, recipient=self.seeker, content='missed')
+        socket = await self.open_socket(UserSocketConsumer, '/ws/user/', self.seeker)
+        await self.send(socket, {'type': 'subscribe', 'user_id': self.employer.pk, 'last_seq': 1})
+        self.assertEqual((await self.receive(socket))['type'], 'subscribed')
+        replay = await self.receive(socket)
+        self.assertEqual([message['content'] for message in replay['messages']], ['missed'])
+        self.assertFalse(replay['has_more'])
+        await self.close(socket)
+
+
+@mock.patch.object(consumers, 'READ_RECEIPT_WINDOW', 0.05)
+class ReadReceiptTests(SocketTestCase):
+    def setUp(self):
+        super().setUp()
+        Message.objects.bulk_create(
+            Message(sender=self.employer, recipient=self.seeker, content=f'message {i}') for i in range(5)
+        )
+        self.ids = list(Message.objects.order_by('pk').values_list('pk', flat=True))
+
+    async def test_receipts_are_coalesced_into_one_update_and_broadcast(self):
+        employer = await self.open_chat(self.employer, self.seeker)
+        await self.receive(employer)
+        seeker = await self.open_chat(self.seeker, self.employer)
+        await self.receive(seeker)
+        await self.receive(employer)
+
+        for message_id in self.ids[:3]:
+            await self.send(seeker, {'type': 'read', 'up_to': message_id})
+        self.assertEqual(
+            await self.receive(employer), {'type': 'read', 'user_id': self.seeker.pk, 'up_to': self.ids[2]},
+        )
+        # One flush, hence one UPDATE and one broadcast, for the three receipts.
+        self.assertTrue(await employer.receive_nothing(0.2))
+        read = [message.is_read async for message in Message.objects.order_by('pk')]
+        self.assertEqual(read, [True, True, True, False, False])
+        await self.close(seeker)
+        await self.close(employer)
+
+    async def test_pending_receipts_are_written_on_disconnect(self):
+        with mock.patch.object(consumers, 'READ_RECEIPT_WINDOW', 60):
+            socket = await self.open_socket(UserSocketConsumer, '/ws/user/', self.seeker)
+            await self.send(socket, {'type': 'subscribe', 'user_id': self.employer.pk})
+            await self.receive(socket)
+            await self.send(socket, {'type': 'read', 'user_id': self.employer.pk, 'up_to': self.ids[-1]})
+            await socket.receive_nothing()
+            self.assertFalse(await Message.objects.filter(is_read=True).aexists())
+            await self.close(socket)
+        self.assertEqual(await Message.objects.filter(is_read=True).acount(), 5)
+
+
+@override_settings(CHAT_ARCHIVE_DAYS=365, CHAT_ARCHIVE_BLOCK_SIZE=10)
+class MessageArchiveTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.seeker = User.objects.create_user('seeker', 'seeker@example.com', 'password', role='job_seeker')
+        Message.objects.bulk_create(
+            Message(sender=self.employer, recipient=self.seeker, content=f'message {i}', is_read=True)
+            for i in range(1, 36)
+        )
+        Message.objects.filter(conversation_seq__lte=30).update(timestamp=django_timezone.now() - timedelta(days=400))
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def archive(self):
+        call_command('archive_messages', '--sleep', '0', stdout=StringIO())
+
+    def page(self, before_seq=None):
+        params = {'fields': 'content'} if before_seq is None else {'before_seq': before_seq, 'fields': 'content'}
+        response = self.client.get(reverse('api_messages_list', args=[self.employer.pk]), params)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return [message['content'] for message in body['results']], body['has_more']
+
+    def test_archives_whole_blocks_of_old_read_messages(self):
+        Message.objects.filter(conversation_seq=25).update(is_read=False)
+        self.archive()
+        self.assertEqual(
+            list(MessageArchive.objects.order_by('first_seq').values_list('first_seq', 'last_seq', 'message_count')),
+            [(1, 10, 10), (11, 20, 10)],
+        )
+        self.assertEqual(Message.objects.order_by('conversation_seq').first().conversation_seq, 21)
+
+        # Nothing left to close out: the next run changes nothing.
+        self.archive()
+        self.assertEqual(MessageArchive.objects.count(), 2)
+
+    def test_keeps_the_newest_message_live(self):
+        Message.objects.filter(conversation_seq__gt=30).delete()
+        self.archive()
+        self.assertEqual(list(MessageArchive.objects.values_list('last_seq', flat=True).order_by('last_seq')), [10, 20])
+        self.assertEqual(list(Message.objects.values_list('conversation_seq', flat=True).order_by('conversation_seq')),
+                         list(range(21, 31)))
+
+    def test_paging_back_reads_through_the_archive(self):
+        self.archive()
+        self.assertEqual(Message.objects.count(), 5)
+        response = self.client.get(reverse('api_messages_list', args=[self.employer.pk])).json()
+        self.assertEqual([message['conversation_seq'] for message in response['results']], list(range(1, 36)))
+        self.assertEqual((response['has_more'], response['hot_horizon']), (False, 31))
+
+        with mock.patch.object(MessageListAPIView, 'history_page_size', 14):
+            # The default page is the newest one.
+            self.assertEqual(self.page(), ([f'message {i}' for i in range(22, 36)], True))
+            # Straddles the hot horizon: 31-32 are live, 19-30 archived.
+            self.assertEqual(self.page(33), ([f'message {i}' for i in range(19, 33)], True))
+            self.assertEqual(self.page(19), ([f'message {i}' for i in range(5, 19)], True))
+            self.assertEqual(self.page(5), ([f'message {i}' for i in range(1, 5)], False))
+        archived = self.client.get(
+            reverse('api_messages_list', args=[self.employer.pk]), {'before_seq': 3},
+        ).json()['results']
+        self.assertEqual([message['conversation_seq'] for message in archived], [1, 2])
+        self.assertEqual((archived[0]['sender_name'], archived[0]['is_read']), ('employer', True))
+
+    def test_deleting_a_user_drops_their_archive(self):
+        self.archive()
+        self.employer.delete()
+        self.assertFalse(MessageArchive.objects.exists())
+
+
+
+class UserSearchTests(TestCase):
+    def setUp(self):
+        for username, full_name, email in [
+            ('annabel', 'Bel Smith', 'a@example.com'),
+            ('zed', 'Ann Smith', 'z@example.com'),
+            ('joanna', 'Jo Jones', 'j@example.com'),
+            ('quiet', 'Q Person', 'secretword@example.com'),
+        ]:
+            User.objects.create_user(username, email, 'password', full_name=full_name)
+
+    def usernames(self, query, **kwargs):
+        return [user.username for user in search_users(query, **kwargs)]
+
+    def test_username_prefix_outranks_full_name_prefix_and_trigrams(self):
+        self.assertEqual(self.usernames('ann'), ['annabel', 'zed', 'joanna'])
+
+    def test_matches_inside_words_through_trigrams(self):
+        self.assertEqual(self.usernames('anna'), ['annabel', 'joanna'])
+        self.assertEqual(self.usernames('Jón'), ['joanna'])
+
+    def test_email_is_not_searched(self):
+        self.assertEqual(self.usernames('secretword'), [])
+
+    def test_scores_every_match_in_one_query(self):
+        # Plenty of weaker matches ahead of the strong one in id order.
+        User.objects.bulk_create(
+            User(username=f'user{i}', email=f'u{i}@example.com', full_name=f'Anna Strongman {i}') for i in range(30)
+        )
+        index_users(User.objects.filter(username__startswith='user'))
+        User.objects.create_user('annastrong', 'strong@example.com', 'password', full_name='Anna Strong')
+        with CaptureQueriesContext(connection) as queries:
+            results = self.usernames('anna strong', limit=3)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(results, ['annastrong', 'user0', 'user1'])
+
+
+class LocationTests(TestCase):
+    def setUp(self):
+        locations._found.clear()
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+        for title, city in [('pune', 'Pune'), ('mumbai', 'Mumbai'), ('nagpur', 'Nagpur'), ('nowhere', 'Atlantis')]:
+            Job.objects.create(
+                employer=self.employer, title=title, description='-', skills_required='-',
+                location_city=city, location_state='Maharashtra', job_type='Full-Time',
+            )
+
+    def titles(self, **params):
+        return sorted(job['title'] for job in self.client.get('/api/job-search/', params).json())
+
+    def test_location_is_assigned_on_save(self):
+        job = Job.objects.get(title='pune')
+        self.assertEqual(job.location.name, 'Pune')
+        self.assertAlmostEqual(job.latitude, 18.5204)
+        self.assertIsNone(Job.objects.get(title='nowhere').location_id)
+        job.location_city = 'Mumbai'
+        job.save()
+        self.assertEqual(Job.objects.get(title='pune').location.name, 'Mumbai')
+
+    def test_radius_search_uses_great_circle_distance(self):
+        # Pune to Mumbai is about 120 km, to Nagpur about 620 km.
+        self.assertEqual(self.titles(near='Pune', radius_km=100), ['pune'])
+        self.assertEqual(self.titles(near='18.5204,73.8567', radius_km=200), ['mumbai', 'pune'])
+        response = self.client.get('/api/job-search/', {'near': 'Pune', 'radius_km': 500, 'sort_by': 'distance'})
+        self.assertEqual([job['title'] for job in response.json()], ['pune', 'mumbai'])
+        self.assertEqual(self.titles(near='Atlantis'), [])
+
+    def test_bounding_box_encloses_the_circle(self):
+        min_lat, max_lat, min_lng, max_lng = locations.bounding_box(18.5, 73.8, 100)
+        self.assertAlmostEqual(max_lat - 18.5, 100 / locations.KM_PER_DEGREE_LATITUDE)
+        self.assertGreater(max_lng - 73.8, max_lat - 18.5)
+        # Across the antimeridian and at the pole.
+        self.assertGreater(locations.bounding_box(0, 179.9, 50)[3], 180)
+        self.assertEqual(locations.bounding_box(90, 0, 50)[2:], (-180, 180))
+
+    def test_place_filter_matches_linked_and_unlinked_jobs(self):
+        # 'nowhere' is not in the gazetteer and only matches on its free text.
+        self.assertEqual(self.titles(location='Maharashtra'), ['mumbai', 'nagpur', 'nowhere', 'pune'])
+        self.assertEqual(self.titles(location='pune'), ['pune'])
+        self.assertEqual(self.titles(location='atlan'), ['nowhere'])
+        response = self.client.get('/api/jobs/', {'location': 'Maharashtra'})
+        self.assertEqual(sorted(job['title'] for job in response.json()), ['mumbai', 'nagpur', 'nowhere', 'pune'])
+
+    def test_misses_are_not_cached(self):
+        self.assertIsNone(locations.resolve_location('Atlantis', 'Maharashtra'))
+        # Loaded by another process.
+        Location.objects.create(
+            name='Atlantis', state='Maharashtra', country='India', name_key='atlantis',
+            state_key='maharashtra', country_key='india', latitude=18.6, longitude=73.9,
+        )
+        self.assertIsNotNone(locations.resolve_location('Atlantis', 'Maharashtra'))
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+        for title, job_type, city, salary_min in [
+            ('Python developer', 'Full-Time', 'Pune', 400000),
+            ('Python intern', 'Internship', 'Pune', None),
+            ('Python lead', 'Full-Time', 'Mumbai', 1500000),
+            ('Java developer', 'Full-Time', 'Pune', 400000),
+        ]:
+            Job.objects.create(
+                employer=self.employer, title=title, description='-', skills_required='-',
+                location_city=city, location_state='Maharashtra', job_type=job_type, salary_min=salary_min,
+            )
+
+    def search(self, **params):
+        return self.client.get('/api/job-search/', {'facets': 'job_type,location,salary,posted', **params}).json()
+
+    def test_counts_match_the_filtered_results(self):
+        body = self.search(keyword='python')
+        self.assertEqual(len(body['results']), 3)
+        counts = body['facets']
+        self.assertEqual(counts['job_type'], {'Full-Time': 2, 'Internship': 1})
+        self.assertEqual(counts['location'], {'Pune, Maharashtra': 2, 'Mumbai, Maharashtra': 1})
+        self.assertEqual(
+            {band: count for band, count in counts['salary'].items() if count},
+            {'300000-600000': 1, '1200000-2400000': 1, 'unspecified': 1},
+        )
+        self.assertEqual(counts['posted'], {'last_24_hours': 3, 'last_7_days': 3, 'last_30_days': 3, 'older': 0})
+        for facet in ('job_type', 'location'):
+            self.assertEqual(sum(counts[facet].values()), len(body['results']))
+
+    def test_saving_a_job_invalidates_cached_facets(self):
+        generation = facets.jobs_generation()
+        self.assertEqual(self.search(keyword='python')['facets']['job_type'], {'Full-Time': 2, 'Internship': 1})
+        job = Job.objects.get(title='Python intern')
+        job.job_type = 'Full-Time'
+        job.save()
+        self.assertGreater(facets.jobs_generation(), generation)
+        self.assertEqual(self.search(keyword='python')['facets']['job_type'], {'Full-Time': 3})
+
+    def test_deleting_a_job_invalidates_cached_facets(self):
+        self.assertEqual(self.search(keyword='python')['facets']['location']['Pune, Maharashtra'], 2)
+        generation = facets.jobs_generation()
+        Job.objects.get(title='Python developer').delete()
+        self.assertGreater(facets.jobs_generation(), generation)
+        self.assertEqual(self.search(keyword='python')['facets']['location'], {
+            'Pune, Maharashtra': 1, 'Mumbai, Maharashtra': 1,
+        })
+
+    def test_page_and_facets_are_cached_together(self):
+        first = self.search(keyword='python')
+        with mock.patch.object(facets, 'compute_facets', side_effect=AssertionError("recomputed")), \
+                mock.patch.object(JobSerializer, 'to_representation', side_effect=AssertionError("re-serialized")):
+            self.assertEqual(self.search(keyword='python'), first)
+        # A different page or sort order is a different response.
+        by_date = self.search(keyword='python', sort_by='date')
+        self.assertEqual(by_date['facets'], first['facets'])
+
+    def test_location_buckets_follow_the_gazetteer(self):
+        for city in ('pune', 'PUNE '):
+            Job.objects.create(
+                employer=self.employer, title='Python tester', description='-', skills_required='-',
+                location_city=city, location_state='maharashtra', job_type='Full-Time',
+            )
+        Job.objects.create(
+            employer=self.employer, title='Python remote', description='-', skills_required='-',
+            location_city='Atlantis', location_state='Maharashtra', job_type='Full-Time',
+        )
+        counts = self.search(keyword='python')['facets']['location']
+        self.assertEqual(counts, {'Pune, Maharashtra': 4, 'Mumbai, Maharashtra': 1, 'Atlantis, Maharashtra': 1})
+        self.assertEqual(len(self.search(keyword='python', location='Pune')['results']), counts['Pune, Maharashtra'])
+
+
+class AsyncViewParityTests(TestCase):
+    """The async endpoints must answer exactly like the DRF views they shadow."""
+    HEADERS = ('ETag', 'Last-Modified', 'Sync-Cursor', 'WWW-Authenticate')
+
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user('employer', 'employer@example.com', 'password', role='employer')
+        self.seeker = User.objects.create_user('seeker', 'seeker@example.com', 'password', role='job_seeker')
+        self.job = Job.objects.create(
+            employer=self.employer, title='Python developer', description='-', skills_required='python',
+            location_city='Pune', location_state='Maharashtra', job_type='Full-Time', salary_min=500000,
+        )
+        Job.objects.create(
+            employer=self.employer, title='Java intern', description='-', skills_required='java',
+            location_city='Pune', location_state='Maharashtra', job_type='Internship',
+        )
+        JobApplication.objects.create(job=self.job, user=self.seeker)
+        Message.objects.create(sender=self.employer, recipient=self.seeker, content='hello')
+        Notification.objects.create(user=self.seeker, message='welcome')
+
+    def get(self, url, user, sync, **headers):
+        client = APIClient()
+        if user is not None:
+            token = RefreshToken.for_user(user).access_token
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        if sync:
+            view = resolve(url.partition('?')[0]).func.view_class
+            self.assertTrue(issubclass(view, AsyncAPIView))
+            with mock.patch.object(view, 'handles', lambda view, request: False), \
+                    mock.patch.object(view, 'respond', side_effect=AssertionError("answered natively")):
+                return client.get(url, **headers)
+        return client.get(url, **headers)
+
+    def assertSameResponse(self, url, user, **headers):
+        native, drf = self.get(url, user, False, **headers), self.get(url, user, True, **headers)
+        self.assertEqual(native.status_code, drf.status_code)
+        if native.content or drf.content:
+            self.assertEqual(json.loads(native.content), json.loads(drf.content))
+        for header in self.HEADERS:
+            self.assertEqual(native.get(header), drf.get(header), header)
+        return native
+
+    def test_job_list(self):
+        for query in ('', '?fields=id,title', '?omit=description', '?job_type=Full-Time', '?salary_min=abc'):
+            with self.subTest(query):
+                self.assertSameResponse(f'/api/jobs/{query}', None)
+        etag = self.get('/api/jobs/', None, False)['ETag']
+        self.assertEqual(self.assertSameResponse('/api/jobs/', None, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_job_detail(self):
+        url = f'/api/jobs/{self.job.pk}/'
+        for user, query in ((self.seeker, ''), (self.seeker, '?fields=title,application_count'), (None, '')):
+            with self.subTest(user=user, query=query):
+                self.assertSameResponse(url + query, user)
+        self.assertSameResponse('/api/jobs/999999/', self.seeker)
+        etag = self.get(url, self.seeker, False)['ETag']
+        self.assertEqual(self.assertSameResponse(url, self.seeker, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Counted with the shared subquery, like the DRF view, not a join.
+        with CaptureQueriesContext(connection) as queries:
+            self.get(url, self.seeker, False)
+        job_sql = [query['sql'] for query in queries if query['sql'].startswith('SELECT "users_job"')]
+        self.assertTrue(job_sql)
+        self.assertFalse(any('JOIN "users_jobapplication"' in sql for sql in job_sql))
+
+    def test_notification_list(self):
+        for user, query in ((self.seeker, ''), (self.seeker, '?fields=message'), (None, '')):
+            with self.subTest(user=user, query=query):
+                self.assertSameResponse(f'/api/notifications/{query}', user)
+        etag = self.get('/api/notifications/', self.seeker, False)['ETag']
+        response = self.assertSameResponse('/api/notifications/', self.seeker, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unread_counts(self):
+        for url in ('/api/messages/unread-count/', '/api/notifications/unread-count/'):
+            for user in (self.seeker, self.employer, None):
+                with self.subTest(url=url, user=user):
+                    self.assertSameResponse(url, user)
@@ -0,0 +1,191 @@
+"""
+Rate limits and load shedding for the CPU-heavy endpoints.
+
+Throttles are sliding-window counters kept in the Django cache, so every
+worker sees the same counts. A view names its endpoint class with
+``throttle_scope``; rates come from
+``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']`` under ``<scope>_user`` and
+``<scope>_ip``. A rate of ``"N/period"`` admits at most N requests in any
+period: the count of the current fixed window is added to the previous
+window's, weighted by how much of it still overlaps the last period, so
+clients may burst up to N requests but not 2N across a window boundary. A
+scope without a configured rate is not throttled.
+
+Each request is counted with an atomic ``incr`` before it is admitted, and
+handed back with ``decr`` if that took the count over the limit.
+Concurrent requests from one client therefore get distinct counts, and no
+more than N get through however many workers they reach at once.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """``"10/min"`` -> ``(10, 60)``, as DRF's SimpleRateThrottle reads rates."""
+    if rate is None:
+        return None
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Sliding-window request counter keyed by ``get_bucket_ident``; subclasses pick the identity."""
+    kind = None
+    cache = cache
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None:
+            return None, None
+        name = f'{scope}_{self.kind}'
+        return name, parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(name))
+
+    def get_bucket_ident(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        name, rate = self.get_rate(view)
+        if rate is None:
+            return True
+        ident = self.get_bucket_ident(request)
+        if ident is None:
+            return True
+        capacity, period = rate
+        now = time.time()
+        window = int(now // period)
+        # Seconds into the current window.
+        offset = now - window * period
+        key = f'throttle:{name}:{ident}:{window}'
+
+        # Windows live for two periods, so the next one can still weigh this one.
+        self.cache.add(key, 0, 2 * period)
+        try:
+            count = self.cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr; count this request alone.
+            self.cache.set(key, 1, 2 * period)
+            count = 1
+        previous = self.cache.get(f'throttle:{name}:{ident}:{window - 1}', 0)
+        # The previous window's count, weighted by its overlap with the last
+        # period; compared multiplied through by the period.
+        if previous * (period - offset) + count * period <= capacity * period:
+            return True
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            pass
+        self.wait_seconds = self.retry_after(capacity, period, offset / period, previous, count - 1)
+        return False
+
+    @staticmethod
+    def retry_after(capacity, period, elapsed, previous, count):
+        """Seconds until one more request fits, if nobody else sends any."""
+        if count < capacity and previous:
+            # The previous window's share shrinks enough within this one.
+            windows = 1 - (capacity - count - 1) / previous - elapsed
+        else:
+            # Only once this window becomes the previous one and shrinks in turn.
+            windows = 1 - elapsed + max(0.0, 1 - (capacity - 1) / count)
+        # Rounded, so float noise does not add a second to Retry-After.
+        return round(windows * period, 3)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserWindowThrottle(SlidingWindowThrottle):
+    """Per authenticated user; anonymous requests are left to the per-address count."""
+    kind = 'user'
+
+    def get_bucket_ident(self, request):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class IPWindowThrottle(SlidingWindowThrottle):
+    """Per client address, honouring ``NUM_PROXIES`` like DRF's throttles."""
+    kind = 'ip'
+
+    def get_bucket_ident(self, request):
+        return self.get_ident(request)
+
+
+class Overloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Server is busy, please retry shortly.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait, detail=None, code=None):
+        super().__init__(detail, code)
+        # DRF's exception handler turns this into a Retry-After header.
+        self.wait = wait
+
+
+class ConcurrencyLimiter:
+    """Counts in-flight requests in this process against a ceiling.
+
+    The ceiling is read from settings on every acquire, ``None`` disables the
+    limit. Load shedding is deliberately per process: each worker protects its
+    own CPU, and a crashed worker cannot leak slots.
+    """
+
+    def __init__(self, setting_name):
+        self.setting_name = setting_name
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ceiling(self):
+        return getattr(settings, self.setting_name, None)
+
+    def acquire(self):
+        ceiling = self.ceiling
+        with self._lock:
+            if ceiling is not None and self.in_flight >= ceiling:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+EXPENSIVE_REQUESTS = ConcurrencyLimiter('EXPENSIVE_REQUEST_CONCURRENCY')
+
+
+class LoadSheddingMixin:
+    """Answer 503 with ``Retry-After`` when too many expensive requests are running.
+
+    The slot is taken after authentication and throttling, so rejected
+    requests never occupy one, and is released once the response is built.
+    """
+    concurrency_limiter = EXPENSIVE_REQUESTS
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not self.concurrency_limiter.acquire():
+            raise Overloaded(wait=getattr(settings, 'EXPENSIVE_REQUEST_RETRY_AFTER', 1))
+        self._holds_concurrency_slot = True
+
+    def dispatch(self, request, *args, **kwargs):
+        self._holds_concurrency_slot = False
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._holds_concurrency_slot:
+                self.concurrency_limiter.release()
+
+
+TIERED_THROTTLES = [UserWindowThrottle, IPWindowThrottle]
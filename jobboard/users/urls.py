@@ -1,6 +1,13 @@
 from django.urls import path
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from .async_views import (
+    AsyncJobDetailView,
+    AsyncJobListView,
+    AsyncNotificationListView,
+    AsyncUnreadMessageCountView,
+    AsyncUnreadNotificationCountView,
+)
 from .views import (
     UserRegisterAPIView,
     UserProfileAPIView,
@@ -8,8 +15,7 @@ from .views import (
     JobSeekerOnlyAPIView,
     AdminOnlyAPIView,
     JobSeekerProfileRetrieveUpdateAPIView,
-    JobListCreateAPIView,
-    JobRetrieveUpdateDestroyAPIView,
+    JobSalaryHistogramAPIView,
     EmployerJobsAPIView,
     CompanyProfileRetrieveUpdateAPIView,
     JobApplicationListCreateAPIView,
@@ -21,14 +27,12 @@ from .views import (
     ConversationListAPIView,
     MessageListAPIView,
     MessageCreateAPIView,
-    UnreadMessageCountAPIView,
-    NotificationListAPIView,
     NotificationMarkReadAPIView,
     NotificationMarkAllReadAPIView,
-    UnreadNotificationCountAPIView,
     EmployerDashboardAPIView,
     JobSeekerDashboardAPIView,
     AdminDashboardAPIView,
+    MetricsAPIView,
     custom_token_view,
     RequestPasswordResetAPIView,
     PasswordResetConfirmAPIView,
@@ -54,8 +58,9 @@ urlpatterns = [
     path('jobseeker-profile/', JobSeekerProfileRetrieveUpdateAPIView.as_view(), name='api_jobseeker_profile'),
 
     # Job and company profile API endpoints
-    path('jobs/', JobListCreateAPIView.as_view(), name='api_jobs_list_create'),
-    path('jobs/<int:pk>/', JobRetrieveUpdateDestroyAPIView.as_view(), name='api_job_rud'),
+    path('jobs/', AsyncJobListView.as_view(), name='api_jobs_list_create'),
+    path('jobs/<int:pk>/', AsyncJobDetailView.as_view(), name='api_job_rud'),
+    path('jobs/salary-histogram/', JobSalaryHistogramAPIView.as_view(), name='api_job_salary_histogram'),
     path('employer/jobs/', EmployerJobsAPIView.as_view(), name='api_employer_jobs_list'),
     path('company-profile/', CompanyProfileRetrieveUpdateAPIView.as_view(), name='api_company_profile'),
 
@@ -72,18 +77,19 @@ urlpatterns = [
     path('conversations/', ConversationListAPIView.as_view(), name='api_conversations_list'),
     path('messages/<int:user_id>/', MessageListAPIView.as_view(), name='api_messages_list'),
     path('messages/create/', MessageCreateAPIView.as_view(), name='api_messages_create'),
-    path('messages/unread-count/', UnreadMessageCountAPIView.as_view(), name='api_messages_unread_count'),
+    path('messages/unread-count/', AsyncUnreadMessageCountView.as_view(), name='api_messages_unread_count'),
     
     # Notification API endpoints
-    path('notifications/', NotificationListAPIView.as_view(), name='api_notifications_list'),
+    path('notifications/', AsyncNotificationListView.as_view(), name='api_notifications_list'),
     path('notifications/<int:pk>/read/', NotificationMarkReadAPIView.as_view(), name='api_notifications_mark_read'),
     path('notifications/mark-all-read/', NotificationMarkAllReadAPIView.as_view(), name='api_notifications_mark_all_read'),
-    path('notifications/unread-count/', UnreadNotificationCountAPIView.as_view(), name='api_notifications_unread_count'),
+    path('notifications/unread-count/', AsyncUnreadNotificationCountView.as_view(), name='api_notifications_unread_count'),
 
     # Dashboard and analytics API endpoints
     path('employer-dashboard/', EmployerDashboardAPIView.as_view(), name='api_employer_dashboard'),
     path('jobseeker-dashboard/', JobSeekerDashboardAPIView.as_view(), name='api_jobseeker_dashboard'),
     path('admin-dashboard/', AdminDashboardAPIView.as_view(), name='api_admin_dashboard'),
+    path('metrics/', MetricsAPIView.as_view(), name='api_metrics'),
 
     # Password reset API endpoints
     path('request-password-reset/', RequestPasswordResetAPIView.as_view(), name='request_password_reset'),
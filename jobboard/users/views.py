@@ -4,22 +4,25 @@ from rest_framework.permissions import IsAuthenticated, AllowAny, BasePermission
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError, PermissionDenied
 from django.shortcuts import get_object_or_404
+from datetime import date
 from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.conf import settings
-from django.http import FileResponse, Http404
+from django.http import FileResponse, Http404, HttpResponse
 from rest_framework import generics, mixins
 from .models import (
     User, Job, JobApplication, CompanyProfile, Message, Notification, 
-    EmployerActivity, JobSeekerActivity, JobSeekerProfile
+    EmployerActivity, JobSeekerActivity, JobSeekerProfile, conversation_key_expression,
 )
 from django.db.models import Q
 from .serializers import (
@@ -35,7 +38,22 @@ from .serializers import (
     JobSeekerProfileSerializer,
 )
 from rest_framework.response import Response
+from .activity_feed import recent_activities
+from .applications import REPLAYED_HEADER, apply_for_job, idempotency_key
+from .chat_archive import ArchivedHistoryMixin
+from .conditional import (
+    ConditionalListMixin, ConditionalRetrieveUpdateMixin, object_validators,
+)
+from .facets import FacetedListMixin
+from .fanout import enqueue_applicant_fanout, enqueue_user_fanout
+from .fieldsets import SparseFieldsetMixin
 from .filters import JobFilter
+from .locations import filter_by_place, parse_point, parse_radius, within_radius
+from .metrics import render_prometheus
+from .salary import DEFAULT_BUCKET_SIZE, filter_by_salary, order_by_salary, salary_histogram
+from .search import search_users, DEFAULT_RESULT_LIMIT as DEFAULT_SEARCH_LIMIT
+from .sync import DeltaSyncMixin
+from .throttling import TIERED_THROTTLES, LoadSheddingMixin
 
 # Custom permissions for role-based access
 class IsAdmin(BasePermission):
@@ -54,9 +72,56 @@ class IsJobOwner(BasePermission):
     def has_object_permission(self, request, view, obj):
         return obj.employer == request.user
 
+
+def with_application_count(queryset):
+    """Annotate ``application_count`` for JobSerializer without a query per job.
+
+    A correlated subquery rather than ``Count('applications')`` keeps the job
+    rows un-joined, so facet counts over the same queryset stay correct.
+    """
+    applications = (
+        JobApplication.objects.filter(job=OuterRef('pk')).order_by()
+        .values('job').annotate(total=Count('id')).values('total')
+    )
+    return queryset.annotate(application_count=Coalesce(Subquery(applications), 0))
+
+
+def jobs_with_counts_if_rendered(view, queryset):
+    """Skip the application count subquery when the fieldset leaves it out."""
+    if view.renders_field('application_count'):
+        return with_application_count(queryset)
+    return queryset
+
+
+def job_etag_parts(request):
+    # current_status of a job flips when its deadline passes, without a save.
+    return (request.get_full_path(), request.user.pk, date.today())
+
+
+def conversation_partners(user):
+    """Users ``user`` has exchanged messages with, annotated for ConversationSerializer."""
+    thread = Message.objects.filter(
+        conversation_key=conversation_key_expression(Value(user.pk), OuterRef('pk'))
+    ).order_by('-timestamp')
+    unread = (
+        Message.objects.filter(sender=OuterRef('pk'), recipient=user, is_read=False).order_by()
+        .values('sender').annotate(total=Count('id')).values('total')
+    )
+    return User.objects.filter(
+        Q(id__in=Message.objects.filter(recipient=user).values('sender_id'))
+        | Q(id__in=Message.objects.filter(sender=user).values('recipient_id'))
+    ).annotate(
+        last_message_content=Subquery(thread.values('content')[:1]),
+        last_message_timestamp=Subquery(thread.values('timestamp')[:1]),
+        last_message_sender_id=Subquery(thread.values('sender_id')[:1]),
+        unread_message_count=Coalesce(Subquery(unread), 0),
+    )
+
 # DRF APIView for registration
-class UserRegisterAPIView(APIView):
+class UserRegisterAPIView(LoadSheddingMixin, APIView):
     permission_classes = [AllowAny]
+    throttle_classes = TIERED_THROTTLES
+    throttle_scope = 'register'
 
     def post(self, request, *args, **kwargs):
         serializer = UserSerializer(data=request.data)
@@ -82,7 +147,7 @@ class UserProfileAPIView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
-class JobSeekerProfileRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
+class JobSeekerProfileRetrieveUpdateAPIView(ConditionalRetrieveUpdateMixin, generics.RetrieveUpdateAPIView):
     serializer_class = JobSeekerProfileSerializer
     permission_classes = [IsAuthenticated, IsJobSeeker]
 
@@ -90,7 +155,7 @@ class JobSeekerProfileRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
         profile, created = JobSeekerProfile.objects.get_or_create(user=self.request.user)
         return profile
 
-class CompanyProfileRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
+class CompanyProfileRetrieveUpdateAPIView(ConditionalRetrieveUpdateMixin, generics.RetrieveUpdateAPIView):
     serializer_class = CompanyProfileSerializer
     permission_classes = [IsAuthenticated, IsEmployer]
 
@@ -123,42 +188,38 @@ class ConversationListView(generics.ListAPIView):
         # Return User objects for these IDs
         return User.objects.filter(id__in=user_ids)
 
-class MessageListView(generics.ListAPIView):
+class MessageListView(ArchivedHistoryMixin, generics.ListAPIView):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        other_user_id = self.kwargs['user_id']
-        user = self.request.user
-        # Get all messages between the current user and the other user
-        return Message.objects.filter(
-            (Q(sender=user, recipient_id=other_user_id)) |
-            (Q(sender_id=other_user_id, recipient=user))
-        ).order_by('timestamp')
+        # Get the live messages between the current user and the other user;
+        # the list is paged and reaches into the archive (users/chat_archive.py)
+        return Message.objects.filter(conversation_key=self.get_conversation_key()).order_by('timestamp')
 
     def list(self, request, *args, **kwargs):
         # Mark messages from the other user as read
         other_user_id = self.kwargs['user_id']
-        Message.objects.filter(sender_id=other_user_id, recipient=request.user, is_read=False).update(is_read=True)
-        
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        Message.objects.filter(sender_id=other_user_id, recipient=request.user).mark_read()
+        return super().list(request, *args, **kwargs)
 
 
-class UserSearchView(generics.ListAPIView):
+class UserSearchView(LoadSheddingMixin, generics.ListAPIView):
     serializer_class = UserSearchSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = TIERED_THROTTLES
+    throttle_scope = 'user_search'
 
     def get_queryset(self):
         query = self.request.query_params.get('search', None)
-        if query:
-            return User.objects.filter(
-                Q(username__icontains=query) |
-                Q(full_name__icontains=query) |
-                Q(email__icontains=query)
-            ).exclude(id=self.request.user.id)
-        return User.objects.none()
+        if not query:
+            return User.objects.none()
+        try:
+            limit = int(self.request.query_params.get('limit', DEFAULT_SEARCH_LIMIT))
+        except ValueError:
+            limit = DEFAULT_SEARCH_LIMIT
+        # Ranked lookup against the typeahead token index; see users/search.py
+        return search_users(query, exclude_user=self.request.user, limit=limit)
 
 
 class EmployerOnlyAPIView(APIView):
@@ -178,12 +239,25 @@ class AdminOnlyAPIView(APIView):
     def get(self, request):
         return Response({'message': 'Hello Admin!'})
 
-custom_token_view = TokenObtainPairView.as_view(serializer_class=CustomTokenObtainPairSerializer)
+class CustomTokenObtainPairView(LoadSheddingMixin, TokenObtainPairView):
+    # Every attempt runs the password hasher, so logins are rate limited
+    # per client address and count towards the expensive request ceiling.
+    serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = TIERED_THROTTLES
+    throttle_scope = 'login'
 
-class JobListCreateAPIView(generics.ListCreateAPIView):
-    queryset = Job.objects.all()
+custom_token_view = CustomTokenObtainPairView.as_view()
+
+class JobListCreateAPIView(ConditionalListMixin, FacetedListMixin, SparseFieldsetMixin, generics.ListCreateAPIView):
     serializer_class = JobSerializer
     filterset_class = JobFilter
+    compact_list = True
+
+    def get_queryset(self):
+        return jobs_with_counts_if_rendered(self, Job.objects.all())
+
+    def get_etag_parts(self, request):
+        return job_etag_parts(request)
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -198,29 +272,61 @@ class JobListCreateAPIView(generics.ListCreateAPIView):
             description=f"Posted a new job: '{job.title}'"
         )
 
-class EmployerJobsAPIView(generics.ListAPIView):
+class JobSalaryHistogramAPIView(generics.GenericAPIView):
+    queryset = Job.objects.all()
+    filterset_class = JobFilter
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            bucket_size = max(1, int(request.query_params.get('bucket_size', DEFAULT_BUCKET_SIZE)))
+        except ValueError:
+            bucket_size = DEFAULT_BUCKET_SIZE
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response({
+            'bucket_size': bucket_size,
+            'buckets': salary_histogram(queryset, bucket_size),
+        })
+
+class EmployerJobsAPIView(ConditionalListMixin, SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated, IsEmployer]
 
+    def get_etag_parts(self, request):
+        return job_etag_parts(request)
+
     def get_queryset(self):
-        return Job.objects.filter(employer=self.request.user).order_by('-created_at')
+        return jobs_with_counts_if_rendered(self, Job.objects.filter(employer=self.request.user)).order_by('-created_at')
 
 
-class JobRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Job.objects.all()
+class JobRetrieveUpdateDestroyAPIView(ConditionalRetrieveUpdateMixin, SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = JobSerializer
+    required_columns = ('updated_at',)
+
+    def get_queryset(self):
+        return jobs_with_counts_if_rendered(self, Job.objects.all())
+
+    def get_validators(self, instance):
+        return object_validators(instance, date.today())
     def get_permissions(self):
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
             return [IsAuthenticated(), IsJobOwner()]
         return [IsAuthenticated()]
 
     def perform_update(self, serializer):
+        previous_status = serializer.instance.status
         job = serializer.save()
         EmployerActivity.objects.create(
             employer=self.request.user,
             activity_type='job_edited',
             description=f"Updated job posting: '{job.title}'"
         )
+        if job.status != previous_status:
+            # Applicants are notified by the fan-out worker; see users/fanout.py
+            change = 'closed' if job.status == 'inactive' else 'reopened'
+            enqueue_applicant_fanout(
+                job, f"The job '{job.title}' you applied for has been {change}.", link=f"/job/{job.id}",
+            )
 
     def perform_destroy(self, instance):
         EmployerActivity.objects.create(
@@ -228,79 +334,38 @@ class JobRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
             activity_type='job_deleted',
             description=f"Deleted job posting: '{instance.title}'"
         )
-        instance.delete()
+        # The applications go with the job, so collect who to tell first.
+        with transaction.atomic():
+            applicants = list(instance.applications.values_list('user_id', flat=True).distinct())
+            instance.delete()
+            enqueue_user_fanout(
+                applicants, f"The job '{instance.title}' you applied for has been removed by the employer.",
+                link="/job-seeker/applications",
+            )
 
-class JobApplicationListCreateAPIView(generics.ListCreateAPIView):
+class JobApplicationListCreateAPIView(SparseFieldsetMixin, generics.ListCreateAPIView):
     serializer_class = JobApplicationSerializer
     permission_classes = [IsAuthenticated]
+    compact_list = True
 
     def get_queryset(self):
         user = self.request.user
         if user.role == 'job_seeker':
-            return JobApplication.objects.filter(user=user).select_related('job')
+            return JobApplication.objects.filter(user=user).select_related('user')
         elif user.role == 'employer':
             # Employers see applications for their jobs
-            return JobApplication.objects.filter(job__employer=user).select_related('job', 'user')
+            return JobApplication.objects.filter(job__employer=user).select_related('user')
         return JobApplication.objects.none() # Or handle other roles as needed
 
-    def perform_create(self, serializer):
-        if self.request.user.role != 'job_seeker':
-            raise PermissionDenied("Only job seekers can apply for jobs.")
-
-        job = serializer.validated_data.get('job')
-        if job.application_deadline and job.application_deadline < timezone.now().date():
-            raise ValidationError("The application deadline for this job has passed.")
-
-        # Check if the user has already applied for this job
-        if JobApplication.objects.filter(user=self.request.user, job=job).exists():
-            raise ValidationError("You have already applied for this job.")
-        
-        application = serializer.save(user=self.request.user)
-
-        # Notify the employer about the new application
-        employer = application.job.employer
-        applicant_name = application.user.full_name
-        job_title = application.job.title
-
-        Notification.objects.create(
-            user=employer,
-            message=f"You have a new application from {applicant_name} for the job '{job_title}'.",
-            link=f"/employer/jobs/{application.job.id}/applications"
-        )
-
-class JobApplicationListCreateAPIView(generics.ListCreateAPIView):
-    serializer_class = JobApplicationSerializer
-    permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        # Job seekers see their own applications
-        if self.request.user.role == 'job_seeker':
-            return JobApplication.objects.filter(user=self.request.user)
-        # Employers see applications to their jobs
-        elif self.request.user.role == 'employer':
-            return JobApplication.objects.filter(job__employer=self.request.user)
-        return JobApplication.objects.none()
-
-    def perform_create(self, serializer):
-        if self.request.user.role != 'job_seeker':
-            raise PermissionDenied('Only job seekers can apply for jobs.')
-        serializer.save(user=self.request.user)
-
-class JobApplicationRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
-    queryset = JobApplication.objects.all()
-    serializer_class = JobApplicationSerializer
-    permission_classes = [IsAuthenticated] # Permissions handled in get_object
-
-    def get_object(self):
-        application = super().get_object()
-        user = self.request.user
-
-        # Allow job seeker to see their own application
-        # Allow employer to see applications for their jobs
-        if application.user == user or application.job.employer == user:
-            return application
-        
-        raise PermissionDenied("You do not have permission to view this application.")
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        application, replayed = apply_for_job(serializer, request.user, idempotency_key(request))
+        data = self.get_serializer(application).data
+        response = Response(data, status=status.HTTP_201_CREATED, headers=self.get_success_headers(data))
+        if replayed:
+            response[REPLAYED_HEADER] = 'true'
+        return response
 
 class DownloadResumeAPIView(APIView):
     permission_classes = [IsAuthenticated, IsEmployer]
@@ -321,7 +386,7 @@ class DownloadResumeAPIView(APIView):
             raise Http404("Resume file not found on disk.")
 
 
-class JobApplicationsForJobAPIView(generics.ListAPIView):
+class JobApplicationsForJobAPIView(SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = JobApplicationSerializer
     permission_classes = [IsAuthenticated, IsEmployer]
 
@@ -339,18 +404,25 @@ class JobApplicationsForJobAPIView(generics.ListAPIView):
             description=f"Viewed applications for job: '{job.title}'"
         )
 
-        return JobApplication.objects.filter(job=job)
+        return JobApplication.objects.filter(job=job).select_related('user')
 
-class JobSearchAPIView(generics.ListAPIView):
+class JobSearchAPIView(LoadSheddingMixin, ConditionalListMixin, FacetedListMixin, SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated]
+    compact_list = True
+    throttle_classes = TIERED_THROTTLES
+    throttle_scope = 'job_search'
+
+    def get_etag_parts(self, request):
+        return job_etag_parts(request)
 
     def get_queryset(self):
-        queryset = Job.objects.all()
+        queryset = jobs_with_counts_if_rendered(self, Job.objects.all())
         keyword = self.request.query_params.get('keyword')
         title = self.request.query_params.get('title')
         company = self.request.query_params.get('company')
         location = self.request.query_params.get('location')
+        near = self.request.query_params.get('near')
         job_type = self.request.query_params.get('job_type')
         salary = self.request.query_params.get('salary')
         experience_level = self.request.query_params.get('experience_level')
@@ -368,21 +440,33 @@ class JobSearchAPIView(generics.ListAPIView):
         if company:
             queryset = queryset.filter(employer__company_profile__company_name__icontains=company)
         if location:
-            queryset = queryset.filter(Q(location_city__icontains=location) | Q(location_state__icontains=location))
+            queryset = filter_by_place(queryset, location)
+        if near:
+            point = parse_point(near)
+            if point is None:
+                return queryset.none()
+            queryset = within_radius(queryset, *point, parse_radius(self.request.query_params.get('radius_km')))
         if job_type:
             queryset = queryset.filter(job_type__iexact=job_type)
         if salary:
-            queryset = queryset.filter(salary__icontains=salary)
+            queryset = filter_by_salary(
+                queryset, salary,
+                mode=self.request.query_params.get('salary_mode'),
+                currency=self.request.query_params.get('salary_currency'),
+                period=self.request.query_params.get('salary_period'),
+            )
         if experience_level:
             queryset = queryset.filter(skills_required__icontains=experience_level)
         if posting_date:
             queryset = queryset.filter(created_at__date=posting_date)
         if sort_by:
-            if sort_by in ['relevance', 'date', 'salary']:
-                if sort_by == 'date':
+            if sort_by in ['relevance', 'date', 'salary', 'distance']:
+                if sort_by == 'distance' and near:
+                    queryset = queryset.order_by('distance_km')
+                elif sort_by == 'date':
                     queryset = queryset.order_by('-created_at')
                 elif sort_by == 'salary':
-                    queryset = queryset.order_by('-salary')
+                    queryset = order_by_salary(queryset)
                 # 'relevance' can be custom, for now just order by views
                 elif sort_by == 'relevance':
                     queryset = queryset.order_by('-views')
@@ -393,21 +477,22 @@ class ConversationListAPIView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        user = self.request.user
-        # Find all users that have exchanged messages with the current user
-        message_partners = User.objects.filter(
-            Q(sent_messages__recipient=user) | Q(received_messages__sender=user)
-        ).distinct()
-        return message_partners
+        # Everyone the current user has exchanged messages with, with the
+        # latest message and unread count of each thread annotated.
+        return conversation_partners(self.request.user)
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
         return context
 
-class MessageListAPIView(generics.ListAPIView):
+class MessageListAPIView(DeltaSyncMixin, ArchivedHistoryMixin, SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
+    compact_list = True
+
+    def get_change_stream(self):
+        return Message.change_stream_for(self.get_conversation_key())
     
     def get_queryset(self):
         user = self.request.user
@@ -416,18 +501,19 @@ class MessageListAPIView(generics.ListAPIView):
         try:
             other_user = User.objects.get(id=other_user_id)
             # Mark messages from other user as read
-            Message.objects.filter(sender=other_user, recipient=user, is_read=False).update(is_read=True)
-            # Return all messages between these two users
+            Message.objects.filter(sender=other_user, recipient=user).mark_read()
+            # Return the live messages between these two users
             return Message.objects.filter(
-                (Q(sender=user) & Q(recipient=other_user)) | 
-                (Q(sender=other_user) & Q(recipient=user))
-            ).order_by('timestamp')
+                conversation_key=self.get_conversation_key()
+            ).select_related('sender', 'recipient').order_by('timestamp')
         except User.DoesNotExist:
             return Message.objects.none()
 
 class MessageCreateAPIView(generics.CreateAPIView):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = TIERED_THROTTLES
+    throttle_scope = 'message_create'
     
     def perform_create(self, serializer):
         recipient_id = self.request.data.get('recipient')
@@ -452,9 +538,13 @@ class UnreadMessageCountAPIView(generics.GenericAPIView):
         unread_count = Message.objects.filter(recipient=request.user, is_read=False).count()
         return Response({'unread_count': unread_count})
 
-class NotificationListAPIView(generics.ListAPIView):
+class NotificationListAPIView(DeltaSyncMixin, ConditionalListMixin, SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    compact_list = True
+
+    def get_change_stream(self):
+        return Notification.change_stream_for(self.request.user.pk)
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user).order_by('-created_at')
@@ -473,7 +563,7 @@ class NotificationMarkReadAPIView(APIView):
 class NotificationMarkAllReadAPIView(APIView):
     permission_classes = [IsAuthenticated]
     def post(self, request):
-        Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        Notification.objects.filter(user=request.user).mark_read()
         return Response({'status': 'all notifications marked as read'})
 
 class UnreadNotificationCountAPIView(generics.GenericAPIView):
@@ -489,11 +579,10 @@ class EmployerDashboardAPIView(APIView):
         user = request.user
         jobs = Job.objects.filter(employer=user)
         applications = JobApplication.objects.filter(job__employer=user)
-        recent_activities = EmployerActivity.objects.filter(employer=user)[:5]
         return Response({
             'job_count': jobs.count(),
             'application_count': applications.count(),
-            'recent_activities': EmployerActivitySerializer(recent_activities, many=True).data,
+            'recent_activities': recent_activities('employer', user.pk),
         })
 
 class JobSeekerDashboardAPIView(APIView):
@@ -502,11 +591,12 @@ class JobSeekerDashboardAPIView(APIView):
         user = request.user
         applications = JobApplication.objects.filter(user=user)
         saved_jobs = []  # Placeholder for saved jobs logic
-        activities = JobSeekerActivity.objects.filter(user=user)[:5]
         return Response({
             'application_count': applications.count(),
-            'recent_applications': JobApplicationSerializer(applications.order_by('-created_at')[:5], many=True).data,
-            'recent_activities': JobSeekerActivitySerializer(activities, many=True).data,
+            'recent_applications': JobApplicationSerializer(
+                applications.select_related('user').order_by('-created_at')[:5], many=True
+            ).data,
+            'recent_activities': recent_activities('job_seeker', user.pk),
             'saved_jobs': saved_jobs,
         })
 
@@ -525,6 +615,13 @@ class AdminDashboardAPIView(APIView):
         })
 
 
+class MetricsAPIView(APIView):
+    """Request metrics in the Prometheus text exposition format."""
+    permission_classes = [IsAuthenticated, IsAdmin]
+    def get(self, request):
+        return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 class RequestPasswordResetAPIView(APIView):
     permission_classes = [AllowAny]
 
@@ -549,10 +646,12 @@ class RequestPasswordResetAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class JobApplicationRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
-    queryset = JobApplication.objects.all()
+class JobApplicationRetrieveUpdateAPIView(SparseFieldsetMixin, generics.RetrieveUpdateAPIView):
+    queryset = JobApplication.objects.select_related('job', 'user')
     serializer_class = JobApplicationSerializer
     permission_classes = [IsAuthenticated]
+    # get_object checks both against the requesting user.
+    required_columns = ('job', 'user')
 
     def get_object(self):
         obj = super().get_object()